@@ -0,0 +1,64 @@
+"""Measure compiling the middleware of a spec of about 3,000 operations.
+
+Compares compiling the operations serially and in a thread pool, and
+prints the operations slowest to compile serially.  Only the distinct
+schemas are sent to the pool, so both compile the same schemas, and
+the threads contend for the GIL.
+
+Usage: python benchmarks/bench_compile.py [--workers 8]
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+
+from oas import create_spec_from_dict
+from specs import generate_spec
+
+import falcon_oas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--paths', type=int, default=1200)
+    args = parser.parse_args(argv)
+
+    spec = create_spec_from_dict(generate_spec(n_paths=args.paths))
+    executors = [('serial', None)]
+    executors.append(('threads', ThreadPoolExecutor(max_workers=args.workers)))
+    reports = {}
+    for name, executor in executors:
+        middlewares = []
+
+        def create():
+            middlewares.append(
+                falcon_oas.Middleware(spec, compiled=True, executor=executor)
+            )
+
+        seconds = min(timeit.repeat(create, number=1, repeat=3))
+        middleware = middlewares[-1]
+        print(
+            '{:<8} {:8.3f} s {:6d} operations {:6d} distinct schemas'.format(
+                name,
+                seconds,
+                len(middleware.compile_report()),
+                len(middleware.schema_unmarshaler.schema_report()),
+            )
+        )
+        reports[name] = middleware.compile_report()
+
+    for uri_template, method, seconds in reports['serial'][:3]:
+        print(
+            '{:10.3f} ms  {} {}'.format(
+                seconds * 1e3, method.upper(), uri_template
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
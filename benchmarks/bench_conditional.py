@@ -0,0 +1,74 @@
+"""Compare GET with and without ETag and If-None-Match.
+
+Usage: python benchmarks/bench_conditional.py
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import timeit
+
+from falcon import testing
+
+import falcon_oas
+from falcon_oas import extensions
+
+SPEC_DICT = {
+    'openapi': '3.0.2',
+    'info': {'title': 'conditional', 'version': '1.0.0'},
+    'paths': {
+        '/items': {
+            'get': {
+                extensions.HTTP_CACHE: {'etag': True},
+                'responses': {'200': {'description': 'OK'}},
+            }
+        }
+    },
+}
+
+
+class Items(object):
+    def __init__(self, size):
+        self.items = [{'id': i, 'name': 'item'} for i in range(size // 24)]
+
+    def on_get(self, req, resp):
+        resp.media = self.items
+
+
+def bench(size, conditional, if_none_match, number):
+    oas = falcon_oas.OAS(SPEC_DICT, compiled=True, conditional=conditional)
+    oas.resolve_path_item('/items', Items(size))
+    client = testing.TestClient(oas.create_api())
+
+    headers = {}
+    if if_none_match:
+        etag = client.simulate_get('/items').headers['ETag']
+        headers[str('If-None-Match')] = str(etag)
+
+    def request():
+        return client.simulate_get('/items', headers=headers)
+
+    length = len(request().content)
+    seconds = min(timeit.repeat(request, number=number, repeat=5))
+    return number / seconds, length
+
+
+def main():
+    cases = [
+        ('plain', False, False),
+        ('etag', True, False),
+        ('not_modified', True, True),
+    ]
+    for size in (1000, 10000, 100000):
+        for name, conditional, if_none_match in cases:
+            rps, length = bench(size, conditional, if_none_match, 200)
+            print(
+                '{:>6} B {:<14} {:8.0f} requests/s {:8d} bytes sent'.format(
+                    size, name, rps, length
+                )
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""Compare eager and lazy unmarshalling of a GET with many headers.
+
+The responder reads only the query parameter.  Lazy unmarshalling works
+per location, so the header parameters are never unmarshaled.
+
+Usage: python benchmarks/bench_lazy.py
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import timeit
+
+from falcon import testing
+
+import falcon_oas
+
+NUMBER = 2000
+N_HEADERS = 32
+
+
+def create_spec_dict():
+    parameters = [
+        {
+            'name': 'X-Header-{}'.format(i),
+            'in': 'header',
+            'required': True,
+            'schema': {'type': 'string', 'pattern': '^[a-z]+$'},
+        }
+        for i in range(N_HEADERS)
+    ]
+    parameters.append(
+        {'name': 'verbose', 'in': 'query', 'schema': {'type': 'boolean'}}
+    )
+    return {
+        'openapi': '3.0.2',
+        'info': {'title': 'headers', 'version': '1.0.0'},
+        'paths': {
+            '/health': {
+                'get': {
+                    'parameters': parameters,
+                    'responses': {'200': {'description': 'OK'}},
+                }
+            }
+        },
+    }
+
+
+class Health(object):
+    def on_get(self, req, resp):
+        resp.media = {'verbose': req.oas_query.get('verbose', False)}
+
+
+def bench(label, lazy):
+    oas = falcon_oas.OAS(create_spec_dict(), lazy=lazy)
+    oas.resolve_path_item('/health', Health())
+    client = testing.TestClient(
+        oas.create_api(request_type=falcon_oas.Request)
+    )
+    headers = {
+        str('X-Header-{}'.format(i)): str('ok') for i in range(N_HEADERS)
+    }
+
+    def request():
+        return client.simulate_get(path='/health', headers=headers)
+
+    assert request().json == {'verbose': False}
+
+    seconds = min(timeit.repeat(request, number=NUMBER, repeat=3))
+    print('{:<6} {:8.1f} us/request'.format(label, seconds / NUMBER * 1e6))
+
+
+def main():
+    bench('eager', False)
+    bench('lazy', True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Compare the throughput of POST with the JSON libraries.
+
+Usage: python benchmarks/bench_media.py
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import importlib
+import json
+import timeit
+
+import falcon
+from falcon import testing
+
+import falcon_oas
+from falcon_oas.media import LIBRARIES
+
+SPEC_DICT = {
+    'openapi': '3.0.2',
+    'info': {'title': 'media', 'version': '1.0.0'},
+    'paths': {
+        '/items': {
+            'post': {
+                'requestBody': {
+                    'required': True,
+                    'content': {
+                        'application/json': {
+                            # Do not validate the items to measure the
+                            # JSON libraries rather than the validation.
+                            'schema': {'type': 'array', 'items': {}}
+                        }
+                    },
+                },
+                'responses': {'201': {'description': 'Created'}},
+            }
+        }
+    },
+}
+
+
+class Items(object):
+    def on_post(self, req, resp):
+        resp.status = falcon.HTTP_CREATED
+        resp.media = {'count': len(req.media)}
+
+
+def create_body(size):
+    item = {'id': 1, 'name': 'item'}
+    n = size // len(json.dumps(item)) + 1
+    return json.dumps([dict(item, id=i) for i in range(n)]).encode('utf-8')
+
+
+def bench(library, body, number):
+    oas = falcon_oas.OAS(SPEC_DICT, compiled=True, json_handler=library)
+    oas.resolve_path_item('/items', Items())
+    client = testing.TestClient(oas.create_api())
+    headers = {str('Content-Type'): str('application/json')}
+
+    def request():
+        return client.simulate_post(path='/items', body=body, headers=headers)
+
+    assert request().status == falcon.HTTP_CREATED
+
+    seconds = min(timeit.repeat(request, number=number, repeat=3)) / number
+    print(
+        '{:>8} KB {:<10} {:10.1f} requests/s'.format(
+            len(body) // 1024, library or 'default', 1 / seconds
+        )
+    )
+
+
+def main():
+    libraries = [None]
+    for library in LIBRARIES:
+        try:
+            importlib.import_module(library)
+        except ImportError:
+            continue
+        libraries.append(library)
+
+    for size, number in ((10 * 1024, 500), (1024 * 1024, 5)):
+        body = create_body(size)
+        for library in libraries:
+            bench(library, body, number)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""Compare serving three spec versions separately and with MultiOAS.
+
+Reports the memory allocated for the specs and the middlewares, the
+number of the compiled schemas and the requests per second to the last
+version.
+
+Usage: python benchmarks/bench_multispec.py
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import copy
+import gc
+import timeit
+import tracemalloc
+
+import falcon
+from falcon import testing
+from specs import generate_spec
+
+import falcon_oas
+from falcon_oas import extensions
+
+VERSIONS = ('v1', 'v2', 'v3')
+
+
+class Resource(object):
+    def on_get(self, req, resp, **params):
+        resp.media = {}
+
+
+def create_versions(n_paths):
+    """Return the spec dicts of the versions which differ slightly."""
+    base = generate_spec(n_paths=n_paths)
+    for path_item in base['paths'].values():
+        path_item[extensions.IMPLEMENTATION] = Resource
+    spec_dicts = []
+    for version in VERSIONS:
+        spec_dict = copy.deepcopy(base)
+        spec_dict['servers'] = [{'url': '/api/' + version}]
+        if version == 'v3':
+            properties = spec_dict['components']['schemas']['PetUpdate'][
+                'properties'
+            ]
+            properties['tag'] = {'type': 'string'}
+        spec_dicts.append(spec_dict)
+    return spec_dicts
+
+
+def create_separate(spec_dicts):
+    oases = [falcon_oas.OAS(d, compiled=True) for d in spec_dicts]
+    api = falcon.API(middleware=[oas.middleware for oas in oases])
+    for oas in oases:
+        oas.setup(api)
+    compiled = sum(
+        len(oas.middleware._schema_unmarshaler._compiled) for oas in oases
+    )
+    return api, compiled
+
+
+def create_multi(spec_dicts):
+    oases = [falcon_oas.OAS(d, compiled=True) for d in spec_dicts]
+    multi_oas = falcon_oas.MultiOAS(oases)
+    api = multi_oas.create_api()
+    compiled = len(oases[0].middleware._schema_unmarshaler._compiled)
+    return api, compiled
+
+
+def measure(create, spec_dicts):
+    gc.collect()
+    tracemalloc.start()
+    api, compiled = create(copy.deepcopy(spec_dicts))
+    gc.collect()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return api, compiled, allocated
+
+
+def main():
+    spec_dicts = create_versions(n_paths=60)
+    for name, create in (
+        ('separate', create_separate),
+        ('multi', create_multi),
+    ):
+        api, compiled, allocated = measure(create, spec_dicts)
+        client = testing.TestClient(api)
+        path = '/api/v3/v1/r29/pets/1'
+        assert client.simulate_get(path).status == falcon.HTTP_OK
+        seconds = min(
+            timeit.repeat(
+                lambda: client.simulate_get(path), number=1000, repeat=5
+            )
+        )
+        print(
+            '{:<10} {:8.1f} MiB {:6d} compiled schemas '
+            '{:8.0f} requests/s'.format(
+                name, allocated / 2 ** 20, compiled, 1000 / seconds
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""Compare operation lookup latency of Spec and OperationTable.
+
+Usage: python benchmarks/bench_operations.py
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import timeit
+
+from oas import create_spec_from_dict
+from specs import generate_spec
+from specs import load_petstore
+
+from falcon_oas.operations import OperationTable
+
+NUMBER = 200000
+
+
+def bench(name, spec_dict, uri_template, method, media_type):
+    spec = create_spec_from_dict(spec_dict)
+    table = OperationTable(spec)
+    args = (uri_template, method, media_type)
+
+    for label, stmt in (
+        ('Spec.get_operation', lambda: spec.get_operation(*args)),
+        ('OperationTable', lambda: table[args]),
+    ):
+        assert stmt() is not None
+        seconds = min(timeit.repeat(stmt, number=NUMBER, repeat=5))
+        print(
+            '{:<10} {:<20} {:8.1f} ns/lookup'.format(
+                name, label, seconds / NUMBER * 1e9
+            )
+        )
+
+
+def main():
+    bench(
+        'petstore',
+        load_petstore(),
+        '/api/v1/pets/{pet_id}',
+        'patch',
+        'application/json',
+    )
+    bench(
+        '500 paths',
+        generate_spec(500),
+        '/api/v1/r123/pets/{pet_id}',
+        'patch',
+        'application/json',
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Report the unique memory (USS) of forked workers with and without
+``OAS.preload()``.
+
+The master creates the API of a large spec and forks the workers.  Each
+worker serves requests and collects garbage as a long running worker
+does, and then reports the memory which is not shared with the others.
+Linux only since USS is read from ``/proc/self/smaps_rollup``.
+
+Usage: python benchmarks/bench_preload.py
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import gc
+import os
+
+from falcon import testing
+from specs import generate_spec
+
+import falcon_oas
+
+N_WORKERS = 4
+N_PATHS = 1000
+
+
+class Resource(object):
+    def on_get(self, req, resp, **params):
+        resp.media = {}
+
+
+def read_uss():
+    """Return the private memory of the process in KiB."""
+    uss = 0
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            if line.startswith(('Private_Clean:', 'Private_Dirty:')):
+                uss += int(line.split()[1])
+    return uss
+
+
+def work(client):
+    for i in range(0, N_PATHS // 2, 10):
+        client.simulate_get(path='/api/v1/r{}/pets/1'.format(i))
+    gc.collect()
+
+
+def bench(label, preload):
+    oas = falcon_oas.OAS(generate_spec(n_paths=N_PATHS), compiled=True)
+    for path in oas.spec['paths']:
+        oas.resolve_path_item(path, Resource())
+    if preload:
+        oas.preload()
+    client = testing.TestClient(oas.create_api())
+
+    pids = []
+    read_fd, write_fd = os.pipe()
+    for _ in range(N_WORKERS):
+        pid = os.fork()
+        if pid == 0:  # pragma: no cover
+            work(client)
+            os.write(write_fd, '{}\n'.format(read_uss()).encode('ascii'))
+            os._exit(0)
+        pids.append(pid)
+
+    for pid in pids:
+        os.waitpid(pid, 0)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        usses = [int(line) for line in f]
+
+    print(
+        '{:<8} {:8.0f} KiB USS/worker (min {}, max {})'.format(
+            label, sum(usses) / len(usses), min(usses), max(usses)
+        )
+    )
+
+    if preload and hasattr(gc, 'unfreeze'):
+        gc.unfreeze()
+
+
+def main():
+    bench('default', False)
+    bench('preload', True)
+
+
+if __name__ == '__main__':
+    main()
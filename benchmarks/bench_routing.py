@@ -0,0 +1,120 @@
+"""Compare deep, parameter-heavy routes with and without path converters.
+
+Each path has five path parameters: bounded integers, a UUID and an
+enum.  Without converters, the router matches strings and the middleware
+unmarshals and validates the path parameters.  With converters, the
+router checks them and the middleware skips them.  Invalid parameters
+respond 400 Bad Request without converters and 404 Not Found with them.
+
+Usage: python benchmarks/bench_routing.py [--paths 100]
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import timeit
+import uuid
+
+import falcon
+from falcon import testing
+
+import falcon_oas
+
+TEMPLATE = (
+    '/r{}/orgs/{{org_id}}/teams/{{team_id}}/projects/{{project_id}}'
+    '/tasks/{{kind}}/{{task_id}}'
+)
+
+PARAMETERS = [
+    ('org_id', {'type': 'integer', 'minimum': 1}),
+    ('team_id', {'type': 'integer', 'format': 'int32', 'minimum': 1}),
+    ('project_id', {'type': 'string', 'format': 'uuid'}),
+    ('kind', {'type': 'string', 'enum': ['bug', 'feature', 'chore']}),
+    ('task_id', {'type': 'integer', 'minimum': 1, 'maximum': 1000000}),
+]
+
+
+def generate_spec(n_paths):
+    parameters = [
+        {'name': name, 'in': 'path', 'required': True, 'schema': schema}
+        for name, schema in PARAMETERS
+    ]
+    paths = {
+        TEMPLATE.format(i): {
+            'parameters': parameters,
+            'get': {'responses': {'200': {'description': 'Task'}}},
+        }
+        for i in range(n_paths)
+    }
+    return {
+        'openapi': '3.0.2',
+        'info': {'title': 'routing', 'version': '1.0.0'},
+        'paths': paths,
+    }
+
+
+class Task(object):
+    def on_get(self, req, resp, org_id, team_id, project_id, kind, task_id):
+        resp.media = {'task_id': task_id}
+
+
+def create_client(n_paths, **options):
+    oas = falcon_oas.OAS(generate_spec(n_paths), **options)
+    resource = Task()
+    for path in oas.spec.data['paths']:
+        oas.resolve_path_item(path, resource)
+    return testing.TestClient(oas.create_api())
+
+
+def bench(client, path, status, number):
+    def request():
+        return client.simulate_get(path)
+
+    assert request().status == status, (path, request().status)
+    seconds = min(timeit.repeat(request, number=number, repeat=5)) / number
+    return seconds * 1e6
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--paths', type=int, default=100)
+    parser.add_argument('--number', type=int, default=2000)
+    args = parser.parse_args(argv)
+
+    # Requests to the last path.
+    prefix = '/r{}/orgs/12/teams/34/projects/{}/tasks/'.format(
+        args.paths - 1, uuid.uuid4()
+    )
+    valid = prefix + 'bug/56'
+    invalid = prefix + 'bug/0'
+
+    print('{} paths'.format(args.paths))
+    for compiled in (False, True):
+        for converters in (False, True):
+            client = create_client(
+                args.paths, compiled=compiled, converters=converters
+            )
+            name = '{} {}'.format(
+                'compiled' if compiled else 'jsonschema',
+                'converters' if converters else 'strings',
+            )
+            print(
+                '{:<24} {:8.1f} us valid {:8.1f} us invalid'.format(
+                    name,
+                    bench(client, valid, falcon.HTTP_OK, args.number),
+                    bench(
+                        client,
+                        invalid,
+                        falcon.HTTP_NOT_FOUND
+                        if converters
+                        else falcon.HTTP_BAD_REQUEST,
+                        args.number,
+                    ),
+                )
+            )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""Compare list responses with and without the response serializer.
+
+The items have undeclared and ``writeOnly`` fields.  Without the
+serializer, the responder converts the dates and the UUIDs itself, as
+Falcon's JSON handler does not encode them.
+
+The serializer copies only the declared properties in Python, so it
+does not match the hand conversion with orjson: 14.9 ms against
+12.5 ms for 5,000 items and 0.36 ms against 0.31 ms for 100 items
+here.  With the standard json module it is about as fast.  In exchange
+the responses of the serializer are about 40% smaller as the
+undeclared and ``writeOnly`` fields are removed.
+
+Usage: python benchmarks/bench_serializer.py
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import datetime
+import timeit
+import uuid
+
+from falcon import testing
+
+import falcon_oas
+from falcon_oas.media import create_json_handler
+
+ITEM_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'id': {'type': 'string', 'format': 'uuid'},
+        'name': {'type': 'string'},
+        'created': {'type': 'string', 'format': 'date-time'},
+        'password': {'type': 'string', 'writeOnly': True},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+    },
+}
+
+SPEC_DICT = {
+    'openapi': '3.0.2',
+    'info': {'title': 'serializer', 'version': '1.0.0'},
+    'paths': {
+        '/items': {
+            'get': {
+                'responses': {
+                    '200': {
+                        'description': 'OK',
+                        'content': {
+                            'application/json': {
+                                'schema': {
+                                    'type': 'array',
+                                    'items': ITEM_SCHEMA,
+                                }
+                            }
+                        },
+                    }
+                }
+            }
+        }
+    },
+}
+
+
+def create_items(n):
+    created = datetime.datetime(
+        2019, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc
+    )
+    return [
+        {
+            'id': uuid.uuid4(),
+            'name': 'item',
+            'created': created,
+            'password': 'secret',
+            'tags': ['a', 'b'],
+            'internal_score': 0.5,
+            'internal_notes': 'not for clients',
+        }
+        for _ in range(n)
+    ]
+
+
+class ConvertingItems(object):
+    def __init__(self, items):
+        self.items = items
+
+    def on_get(self, req, resp):
+        resp.media = [
+            dict(item, id=str(item['id']), created=item['created'].isoformat())
+            for item in self.items
+        ]
+
+
+class Items(object):
+    def __init__(self, items):
+        self.items = items
+
+    def on_get(self, req, resp):
+        resp.media = self.items
+
+
+def bench(name, resource, json_handler, response_serializer, number):
+    oas = falcon_oas.OAS(
+        SPEC_DICT,
+        json_handler=json_handler,
+        response_serializer=response_serializer,
+    )
+    oas.resolve_path_item('/items', resource)
+    client = testing.TestClient(oas.create_api())
+
+    def request():
+        return client.simulate_get('/items')
+
+    length = len(request().content)
+    seconds = min(timeit.repeat(request, number=number, repeat=5)) / number
+    print('{:<24} {:8.2f} ms {:10d} bytes'.format(name, seconds * 1e3, length))
+
+
+def main():
+    for n in (100, 5000):
+        items = create_items(n)
+        print('{} items'.format(n))
+        for library in ('json', 'orjson'):
+            try:
+                handler = create_json_handler(library)
+            except ImportError:
+                continue
+            bench(
+                library + ' converting',
+                ConvertingItems(items),
+                handler,
+                None,
+                20,
+            )
+            bench(library + ' serializer', Items(items), handler, True, 20)
+
+
+if __name__ == '__main__':
+    main()
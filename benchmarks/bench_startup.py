@@ -0,0 +1,67 @@
+"""Compare cold starts from the YAML document and from the spec cache.
+
+Each start runs in a new interpreter, loads the spec of about 3,000
+operations and creates the API.
+
+Usage: python benchmarks/bench_startup.py
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import timeit
+
+import yaml
+from specs import generate_spec
+
+from falcon_oas.specs import compile_spec
+
+REPEAT = 3
+
+FROM_YAML = """
+import yaml
+import falcon_oas
+with open({source!r}) as f:
+    falcon_oas.OAS(yaml.safe_load(f)).create_api()
+"""
+
+FROM_CACHE = """
+import falcon_oas
+falcon_oas.OAS.from_cache({cache!r}, source={source!r}).create_api()
+"""
+
+
+def bench(label, code):
+    seconds = min(
+        timeit.repeat(
+            lambda: subprocess.check_call([sys.executable, '-c', code]),
+            number=1,
+            repeat=REPEAT,
+        )
+    )
+    print('{:<6} {:8.3f} s'.format(label, seconds))
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        source = os.path.join(directory, 'spec.yaml')
+        cache = os.path.join(directory, 'spec.cache')
+        with open(source, 'w') as f:
+            yaml.safe_dump(generate_spec(n_paths=1200), f)
+        compile_spec(source, cache)
+
+        bench('yaml', FROM_YAML.format(source=source))
+        bench('cache', FROM_CACHE.format(cache=cache, source=source))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Compare allocations per request of per-request and shared unmarshalers.
+
+Usage: python benchmarks/bench_unmarshaler.py
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import timeit
+import tracemalloc
+
+import falcon
+from falcon import testing
+from oas import create_spec_from_dict
+from oas.schema.unmarshalers import SchemaUnmarshaler
+from specs import load_petstore
+
+import falcon_oas
+
+NUMBER = 2000
+
+
+class PerRequestMiddleware(falcon_oas.Middleware):
+    """Construct an unmarshaler per request as falcon-oas used to."""
+
+    def __init__(self, spec, **kwargs):
+        # The snapshot of the spec is created by the base class, which
+        # reads the unmarshaler below.
+        self._unmarshaler_spec = spec
+        super(PerRequestMiddleware, self).__init__(spec, **kwargs)
+
+    @property
+    def _schema_unmarshaler(self):
+        return SchemaUnmarshaler(spec=self._unmarshaler_spec)
+
+    @_schema_unmarshaler.setter
+    def _schema_unmarshaler(self, value):
+        pass
+
+
+class Resource(object):
+    def on_patch(self, req, resp, pet_id):
+        resp.media = {'id': pet_id}
+
+
+def bench(label, middleware_class):
+    spec = create_spec_from_dict(load_petstore())
+    app = falcon.API(middleware=[middleware_class(spec)])
+    app.add_route('/api/v1/pets/{pet_id}', Resource())
+    client = testing.TestClient(app)
+
+    def request():
+        return client.simulate_patch(
+            path='/api/v1/pets/42', json={'name': 'momo'}
+        )
+
+    assert request().status == falcon.HTTP_OK
+
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(NUMBER):
+        request()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    stats = after.compare_to(before, 'filename')
+    blocks = sum(stat.count_diff for stat in stats)
+    seconds = min(timeit.repeat(request, number=NUMBER, repeat=3))
+    print(
+        '{:<12} {:8.2f} retained blocks/request {:8.1f} us/request'.format(
+            label, blocks / NUMBER, seconds / NUMBER * 1e6
+        )
+    )
+
+    tracemalloc.start()
+    request()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('{:<12} {:8d} peak bytes/request'.format(label, peak))
+
+
+def main():
+    bench('per-request', PerRequestMiddleware)
+    bench('shared', falcon_oas.Middleware)
+
+
+if __name__ == '__main__':
+    main()
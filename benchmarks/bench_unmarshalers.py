@@ -0,0 +1,60 @@
+"""Compare the interpreted and the compiled schema unmarshalers.
+
+Usage: python benchmarks/bench_unmarshalers.py
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import timeit
+
+from oas.schema.unmarshalers import SchemaUnmarshaler
+
+from falcon_oas.unmarshalers import CompiledSchemaUnmarshaler
+
+NUMBER = 20
+
+PET = {
+    'type': 'object',
+    'required': ['id', 'name'],
+    'properties': {
+        'id': {'type': 'integer', 'format': 'int64', 'minimum': 1},
+        'name': {'type': 'string', 'minLength': 1, 'maxLength': 64},
+        'tag': {'type': 'string', 'nullable': True},
+        'kind': {'type': 'string', 'enum': ['cat', 'dog']},
+    },
+    'additionalProperties': False,
+}
+SCHEMA = {'type': 'array', 'items': PET}
+
+
+def main():
+    instance = [
+        {'id': i + 1, 'name': 'pet {}'.format(i), 'tag': None, 'kind': 'cat'}
+        for i in range(1000)
+    ]
+
+    compiled = CompiledSchemaUnmarshaler()
+    assert compiled.compile(SCHEMA)
+
+    for label, schema_unmarshaler in (
+        ('interpreted', SchemaUnmarshaler()),
+        ('compiled', compiled),
+    ):
+        seconds = min(
+            timeit.repeat(
+                lambda: schema_unmarshaler.unmarshal(instance, SCHEMA),
+                number=NUMBER,
+                repeat=3,
+            )
+        )
+        print(
+            '{:<12} {:8.2f} ms/body of 1000 objects'.format(
+                label, seconds / NUMBER * 1e3
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
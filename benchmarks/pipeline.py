@@ -0,0 +1,278 @@
+"""Benchmark the full request pipeline built by ``OAS.create_api()``.
+
+Each case sends a request through ``falcon.testing.TestClient`` and the
+results are the microseconds per request.  The results can be written
+as JSON and compared with the results of another commit.
+
+Usage::
+
+    python benchmarks/pipeline.py --output baseline.json
+    # ... change the code ...
+    python benchmarks/pipeline.py --compare baseline.json --threshold 0.1
+
+The comparison exits with status 1 if any case is slower than the
+baseline by more than the threshold.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import json
+import platform
+import sys
+import timeit
+
+import falcon
+from falcon import testing
+from specs import generate_spec
+from specs import load_petstore
+
+import falcon_oas
+
+API_KEY = 'secret'
+
+
+def api_key_validator(value, scopes, request):
+    return value == API_KEY
+
+
+def session_loader(value, scopes, request):
+    return value == API_KEY
+
+
+class PetCollection(object):
+    def on_get(self, req, resp):
+        resp.media = [{'id': 1, 'name': 'momo'}][: req.oas_query['limit']]
+
+    def on_post(self, req, resp):
+        resp.status = falcon.HTTP_CREATED
+        resp.media = dict(req.oas_media, id=1)
+
+
+class PetItem(object):
+    def on_get(self, req, resp, pet_id):
+        resp.media = {'id': pet_id, 'name': 'momo'}
+
+    def on_patch(self, req, resp, pet_id):
+        resp.media = dict(req.oas_media, id=pet_id)
+
+    def on_delete(self, req, resp, pet_id):
+        resp.status = falcon.HTTP_NO_CONTENT
+
+
+def extend_petstore(spec_dict):
+    """Add query parameters and a nested request body to the petstore."""
+    for path, path_item in spec_dict['paths'].items():
+        if 'post' in path_item:
+            path_item['get']['parameters'] = [
+                {
+                    'name': 'limit',
+                    'in': 'query',
+                    'required': True,
+                    'schema': {'type': 'integer', 'minimum': 1},
+                },
+                {'name': 'tag', 'in': 'query', 'schema': {'type': 'string'}},
+            ]
+    spec_dict['components']['schemas']['PetUpdate']['properties'].update(
+        {
+            'tags': {
+                'type': 'array',
+                'items': {'type': 'string', 'minLength': 1},
+            },
+            'owner': {
+                'type': 'object',
+                'required': ['name'],
+                'properties': {
+                    'name': {'type': 'string'},
+                    'address': {
+                        'type': 'object',
+                        'properties': {
+                            'city': {'type': 'string'},
+                            'zip': {'type': 'string', 'pattern': '^[0-9]+$'},
+                        },
+                    },
+                },
+            },
+        }
+    )
+    return spec_dict
+
+
+NESTED_PET = {
+    'name': 'momo',
+    'tags': ['cat', 'white'],
+    'owner': {'name': 'alice', 'address': {'city': 'Tokyo', 'zip': '100'}},
+}
+
+# name, path prefix, method, request options and expected status
+CASES = [
+    (
+        'get_query',
+        '/api/v1/pets',
+        'GET',
+        {'query_string': str('limit=10&tag=cat')},
+        falcon.HTTP_OK,
+    ),
+    ('get_path', '/api/v1/pets/42', 'GET', {}, falcon.HTTP_OK),
+    (
+        'patch_nested_body',
+        '/api/v1/pets/42',
+        'PATCH',
+        {
+            'query_string': str('page=1'),
+            'headers': {str('X-API-Version'): str('v2')},
+            'json': NESTED_PET,
+        },
+        falcon.HTTP_OK,
+    ),
+    (
+        'post_secured',
+        '/api/v1/pets',
+        'POST',
+        {'headers': {str('X-API-Key'): str(API_KEY)}, 'json': NESTED_PET},
+        falcon.HTTP_CREATED,
+    ),
+    (
+        'error_parameters',
+        '/api/v1/pets',
+        'GET',
+        {'query_string': str('limit=x')},
+        falcon.HTTP_BAD_REQUEST,
+    ),
+    (
+        'error_request_body',
+        '/api/v1/pets/42',
+        'PATCH',
+        {'json': {'name': 1, 'owner': {}}},
+        falcon.HTTP_BAD_REQUEST,
+    ),
+    (
+        'error_security',
+        '/api/v1/pets',
+        'POST',
+        {'json': NESTED_PET},
+        falcon.HTTP_FORBIDDEN,
+    ),
+    (
+        'error_media_type',
+        '/api/v1/pets/42',
+        'PATCH',
+        {'body': 'x', 'headers': {str('Content-Type'): str('text/plain')}},
+        falcon.HTTP_BAD_REQUEST,
+    ),
+]
+
+SPECS = [
+    ('petstore', load_petstore, '/v1/'),
+    # Requests to the last paths of a large spec.
+    ('large', lambda: generate_spec(n_paths=500), '/v1/r249/'),
+]
+
+
+def create_client(spec_dict, options):
+    oas = falcon_oas.OAS(spec_dict, **options)
+    for path in oas.spec.data['paths']:
+        resource = PetItem() if path.endswith('}') else PetCollection()
+        oas.resolve_path_item(path, resource)
+    oas.resolve_security_scheme('api_key', api_key_validator)
+    oas.resolve_security_scheme('session', session_loader)
+    return testing.TestClient(oas.create_api(request_type=falcon_oas.Request))
+
+
+def run(options, number, repeat, pattern=None):
+    results = {}
+    for spec_name, load, prefix in SPECS:
+        client = create_client(extend_petstore(load()), options)
+        for case_name, path, method, kwargs, status in CASES:
+            name = '{}.{}'.format(spec_name, case_name)
+            if pattern and pattern not in name:
+                continue
+
+            path = path.replace('/v1/', prefix)
+
+            def request():
+                return client.simulate_request(
+                    method=method, path=path, **kwargs
+                )
+
+            response = request()
+            assert response.status == status, (name, response.status)
+
+            timings = sorted(
+                seconds / number * 1e6
+                for seconds in timeit.repeat(
+                    request, number=number, repeat=repeat
+                )
+            )
+            results[name] = {
+                'min': timings[0],
+                'median': timings[len(timings) // 2],
+            }
+            print(
+                '{:<32} {:8.1f} us {:8.1f} us'.format(
+                    name, timings[0], results[name]['median']
+                )
+            )
+    return results
+
+
+def compare(baseline, results, threshold):
+    """Print the ratios to the baseline and return the regressed cases."""
+    regressions = []
+    for name, result in sorted(results.items()):
+        if name not in baseline:
+            continue
+        # Compare the minimums which are the least noisy.
+        ratio = result['min'] / baseline[name]['min']
+        regressed = ratio > 1 + threshold
+        if regressed:
+            regressions.append(name)
+        print(
+            '{:<32} {:6.2f}x{}'.format(
+                name, ratio, '  REGRESSED' if regressed else ''
+            )
+        )
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--number', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('-k', dest='pattern', help='run matching cases only')
+    parser.add_argument('--compiled', action='store_true')
+    parser.add_argument('--lazy', action='store_true')
+    parser.add_argument('--output', help='write the results as JSON')
+    parser.add_argument('--compare', help='compare with the JSON results')
+    parser.add_argument('--threshold', type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    options = {'compiled': args.compiled, 'lazy': args.lazy}
+    results = run(options, args.number, args.repeat, pattern=args.pattern)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(
+                {
+                    'python': platform.python_version(),
+                    'falcon': falcon.__version__,
+                    'options': options,
+                    'results': results,
+                },
+                f,
+                indent=2,
+                sort_keys=True,
+            )
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        if compare(baseline, results, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""OpenAPI documents shared by the benchmarks."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import copy
+import os
+
+import yaml
+
+PETSTORE_PATH = os.path.join(
+    os.path.dirname(__file__), os.pardir, 'tests', 'petstore.yaml'
+)
+
+
+def load_petstore():
+    with open(PETSTORE_PATH) as f:
+        return yaml.safe_load(f)
+
+
+def generate_spec(n_paths=500):
+    """Generate a spec with ``n_paths`` copies of the petstore paths."""
+    petstore = load_petstore()
+    paths = {}
+    for i in range(n_paths // 2):
+        for path, path_item in petstore['paths'].items():
+            paths[path.replace('/v1/', '/v1/r{}/'.format(i))] = copy.deepcopy(
+                path_item
+            )
+    petstore['paths'] = paths
+    return petstore
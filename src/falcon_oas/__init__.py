@@ -4,6 +4,7 @@ from __future__ import print_function
 from __future__ import unicode_literals
 
 from .__version__ import __version__  # noqa: F401
+from .factories import MultiOAS  # noqa: F401
 from .factories import OAS  # noqa: F401
 from .middlewares import Middleware  # noqa: F401
 from .request import Request  # noqa: F401
@@ -0,0 +1 @@
+__version__ = '0.1.dev26+g98ae27213.d20261018'
@@ -0,0 +1,158 @@
+"""Batch endpoint which dispatches sub-requests through the API.
+
+The request body is an array of sub-requests::
+
+    [
+        {"method": "GET", "path": "/api/v1/pets/1"},
+        {"method": "PATCH", "path": "/api/v1/pets/2",
+         "query": {"page": 1}, "body": {"name": "momo"}}
+    ]
+
+``query`` is a dict or a query string.  ``headers`` overrides the
+headers of the batch request, which the sub-requests inherit.  ``body``
+is sent as JSON.
+
+The response body is an array of the results in the same order::
+
+    [
+        {"status": 200, "headers": {...}, "body": {...}},
+        {"status": 400, "headers": {...}, "body": {"title": ...}}
+    ]
+
+Each sub-request goes through the middleware, the access control and the
+resources of the API as a request does, so the errors are reported as
+the problem documents of the items.  The results of the access control
+functions are shared by the sub-requests with the same credentials.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import json
+
+import falcon
+from six import iteritems
+from six import string_types
+from six.moves.urllib_parse import urlencode
+
+from .security import MEMO_ENVIRON_KEY
+
+BATCH_ENVIRON_KEY = 'falcon_oas.batch'
+
+_METHODS = frozenset(
+    ('GET', 'PUT', 'POST', 'DELETE', 'OPTIONS', 'HEAD', 'PATCH', 'TRACE')
+)
+
+
+class BatchResource(object):
+    def __init__(self, api, max_items=100):
+        self._api = api
+        self._max_items = max_items
+
+    def on_post(self, req, resp):
+        if BATCH_ENVIRON_KEY in req.env:
+            raise falcon.HTTPBadRequest(description='Nested batch request')
+
+        items = req.media
+        _validate(items, self._max_items)
+
+        memo = {}
+        resp.media = [
+            self._dispatch(_create_environ(req.env, item, memo))
+            for item in items
+        ]
+
+    def _dispatch(self, environ):
+        started = []
+
+        def start_response(status, headers, exc_info=None):
+            started[:] = [status, headers]
+
+        chunks = self._api(environ, start_response)
+        try:
+            data = b''.join(chunks)
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+        status, headers = started
+        headers = {name.lower(): value for name, value in headers}
+        content_type = headers.get('content-type')
+        if not data:
+            body = None
+        elif content_type and 'json' in content_type:
+            body = json.loads(data.decode('utf-8'))
+        else:
+            body = data.decode('utf-8')
+        return {'status': int(status[:3]), 'headers': headers, 'body': body}
+
+
+def _validate(items, max_items):
+    if not isinstance(items, list):
+        raise falcon.HTTPBadRequest(
+            description='The request body must be an array'
+        )
+    if len(items) > max_items:
+        raise falcon.HTTPBadRequest(
+            description='The batch must not exceed {} items'.format(max_items)
+        )
+    for index, item in enumerate(items):
+        if (
+            not isinstance(item, dict)
+            or not isinstance(item.get('method'), string_types)
+            or item['method'].upper() not in _METHODS
+            or not isinstance(item.get('path'), string_types)
+            or not item['path'].startswith('/')
+            or not isinstance(
+                item.get('query', ''), (type(None), dict) + string_types
+            )
+            or not _is_string_dict(item.get('headers', {}))
+        ):
+            raise falcon.HTTPBadRequest(
+                description='Invalid sub-request at {}'.format(index)
+            )
+
+
+def _is_string_dict(obj):
+    return isinstance(obj, dict) and all(
+        isinstance(key, string_types) and isinstance(value, string_types)
+        for key, value in iteritems(obj)
+    )
+
+
+def _create_environ(env, item, memo):
+    environ = {
+        key: value
+        for key, value in iteritems(env)
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH')
+    }
+    environ[BATCH_ENVIRON_KEY] = True
+    environ[MEMO_ENVIRON_KEY] = memo
+    environ['REQUEST_METHOD'] = str(item['method'].upper())
+
+    path, _, query_string = item['path'].partition('?')
+    environ['PATH_INFO'] = str(path)
+    query = item.get('query')
+    if isinstance(query, dict):
+        query_string = urlencode(query, doseq=True)
+    elif query is not None:
+        query_string = query
+    environ['QUERY_STRING'] = str(query_string)
+
+    if 'body' in item:
+        data = json.dumps(item['body']).encode('utf-8')
+        environ['CONTENT_TYPE'] = str('application/json')
+        environ['CONTENT_LENGTH'] = str(len(data))
+    else:
+        data = b''
+    environ['wsgi.input'] = io.BytesIO(data)
+
+    for name, value in iteritems(item.get('headers', {})):
+        key = name.upper().replace('-', '_')
+        if key not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            key = 'HTTP_' + key
+        environ[str(key)] = str(value)
+
+    return environ
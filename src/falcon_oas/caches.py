@@ -0,0 +1,82 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+from collections import OrderedDict
+
+try:
+    from time import monotonic
+except ImportError:  # pragma: no cover
+    from time import time as monotonic
+
+
+class TTLCache(object):
+    """Thread-safe LRU cache whose entries expire after their TTL.
+
+    Truthy values live for ``ttl`` seconds and falsy values live for
+    ``negative_ttl`` seconds.  Falsy values are not stored when
+    ``negative_ttl`` is ``0``.  The least recently used entry is evicted
+    when the cache holds ``maxsize`` entries.
+    """
+
+    def __init__(self, maxsize, ttl, negative_ttl=0, timer=monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.hits = 0
+        self.misses = 0
+        self._timer = timer
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return ``(True, value)`` if the key is cached.
+
+        Otherwise return ``(False, None)``.
+        """
+        with self._lock:
+            try:
+                value, expires = self._entries.pop(key)
+            except KeyError:
+                self.misses += 1
+                return False, None
+
+            if expires <= self._timer():
+                self.misses += 1
+                return False, None
+
+            # Re-insert the entry as the most recently used one.
+            self._entries[key] = value, expires
+            self.hits += 1
+            return True, value
+
+    def set(self, key, value):
+        ttl = self.ttl if value else self.negative_ttl
+        if ttl <= 0 or self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries.pop(key, None)
+            while len(self._entries) >= self.maxsize:
+                self._entries.popitem(last=False)
+            self._entries[key] = value, self._timer() + ttl
+
+    def invalidate(self, predicate=None):
+        """Remove entries whose keys satisfy the predicate.
+
+        Remove all the entries if the predicate is not given.
+        """
+        with self._lock:
+            if predicate is None:
+                self._entries.clear()
+                return
+            for key in [key for key in self._entries if predicate(key)]:
+                del self._entries[key]
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self)}
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,77 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import argparse
+import json
+
+from .factories import OAS
+from .specs import compile_spec
+from .specs import load_spec_dict
+from .utils import import_report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='falcon-oas')
+    subparsers = parser.add_subparsers(dest='command')
+    # Python 2 does not support the required keyword argument.
+    subparsers.required = True
+
+    compile_parser = subparsers.add_parser(
+        'compile', help='compile the OpenAPI document into a spec cache'
+    )
+    compile_parser.add_argument('source', help='JSON or YAML document')
+    compile_parser.add_argument(
+        '-o', '--output', required=True, help='path to the spec cache'
+    )
+
+    imports_parser = subparsers.add_parser(
+        'imports',
+        help='report the time to import the implementation modules',
+    )
+    imports_parser.add_argument('source', help='JSON or YAML document')
+    imports_parser.add_argument('--base-module', default='')
+
+    profile_parser = subparsers.add_parser(
+        'profile',
+        help='report the operations and the schemas slowest to compile',
+    )
+    profile_parser.add_argument('source', help='JSON or YAML document')
+    profile_parser.add_argument('--base-module', default='')
+    profile_parser.add_argument(
+        '-n', '--limit', type=int, default=10, help='number of the items'
+    )
+
+    args = parser.parse_args(argv)
+    if args.command == 'compile':
+        compile_spec(args.source, args.output)
+    elif args.command == 'profile':
+        _profile(args.source, args.base_module, args.limit)
+    else:
+        oas = OAS(load_spec_dict(args.source), base_module=args.base_module)
+        oas.preload(freeze=False)
+        for module_name, seconds in import_report():
+            print('{:10.3f} ms  {}'.format(seconds * 1e3, module_name))
+    return 0
+
+
+def _profile(source, base_module, limit):
+    oas = OAS(load_spec_dict(source), base_module=base_module, compiled=True)
+    middleware = oas.middleware
+
+    print('Operations:')
+    for uri_template, method, seconds in middleware.compile_report()[:limit]:
+        print(
+            '{:10.3f} ms  {} {}'.format(
+                seconds * 1e3, method.upper(), uri_template
+            )
+        )
+
+    print('Schemas:')
+    schema_report = middleware.schema_unmarshaler.schema_report()
+    for schema, seconds in schema_report[:limit]:
+        summary = json.dumps(schema, sort_keys=True, default=repr)
+        if len(summary) > 60:
+            summary = summary[:57] + '...'
+        print('{:10.3f} ms  {}'.format(seconds * 1e3, summary))
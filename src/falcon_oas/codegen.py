@@ -0,0 +1,99 @@
+"""Generate Python functions from schemas.
+
+:mod:`falcon_oas.unmarshalers` and :mod:`falcon_oas.serializers` compile
+schemas with the subclasses of :class:`Compiler`.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import abc
+import contextlib
+
+import six
+
+
+class Lines(list):
+    """Lines of the generated source code with the indentation."""
+
+    def __init__(self, depth):
+        super(Lines, self).__init__()
+        self.depth = depth
+
+    def append(self, line):
+        super(Lines, self).append('    ' * self.depth + line)
+
+    def fail(self, condition):
+        """Return ``False`` if the condition is satisfied."""
+        with self.block('if {}:'.format(condition)):
+            self.append('return False')
+
+    @contextlib.contextmanager
+    def block(self, header):
+        self.append(header)
+        start = len(self)
+        self.depth += 1
+        try:
+            yield
+        finally:
+            if len(self) == start:
+                self.append('pass')
+            self.depth -= 1
+
+
+@six.add_metaclass(abc.ABCMeta)
+class Compiler(object):
+    """Generate a function of one argument ``v`` for each schema.
+
+    The functions and the constants which they refer to are generated
+    into a single module so that the functions of sub-schemas, including
+    recursive ones, call each other.
+    """
+
+    def __init__(self):
+        self._functions = {}
+        self.constants = {}
+        self.lines = []
+
+    def build(self, schema, namespace, filename):
+        """Return the function of the schema in a new module.
+
+        :param namespace: The globals which the generated code refers to.
+        """
+        name = self.compile_function(schema)
+        namespace = dict(namespace)
+        namespace.update(self.constants)
+        source = '\n'.join(self.lines)
+        exec(compile(source, filename, 'exec'), namespace)
+        return namespace[name]
+
+    def compile_function(self, schema):
+        """Generate a function for the schema and return its name."""
+        try:
+            return self._functions[id(schema)]
+        except KeyError:
+            pass
+
+        name = '_f{}'.format(len(self._functions))
+        # Register the name before compiling the body to support
+        # recursive schemas.
+        self._functions[id(schema)] = name
+        # Keep the schema alive to make its id unique.
+        self.constant(schema)
+
+        body = Lines(1)
+        self.compile_body(schema, body)
+        self.lines.append('def {}(v):'.format(name))
+        self.lines.extend(body)
+        return name
+
+    def constant(self, value):
+        """Return the name of the value in the generated code."""
+        name = '_c{}'.format(len(self.constants))
+        self.constants[name] = value
+        return name
+
+    @abc.abstractmethod
+    def compile_body(self, schema, lines):
+        """Append the body of the function of the schema to the lines."""
@@ -0,0 +1,108 @@
+"""Conditional GET with ETag and Cache-Control declared in the spec."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import hashlib
+
+import falcon
+import six
+
+from . import extensions
+
+_METHODS = frozenset(('GET', 'HEAD'))
+
+
+def hash_data(data):
+    """Return the hex digest of the bytes.
+
+    BLAKE2 is faster than SHA-1 on 64-bit platforms.  Python 2 does not
+    have it.
+    """
+    try:
+        return hashlib.blake2b(data, digest_size=16).hexdigest()
+    except AttributeError:  # pragma: no cover
+        return hashlib.sha1(data).hexdigest()
+
+
+class ConditionalResponses(object):
+    """Add ETag and Cache-Control by :data:`~extensions.HTTP_CACHE`.
+
+    ``ETag`` of 200 OK responses to GET and HEAD is the hash of the
+    body, and the response turns into 304 Not Modified if it matches
+    ``If-None-Match`` of the request.  The body is still generated by
+    the responder and serialized once here, but is not sent.
+
+    :param hash: The function which returns the hex digest of the bytes.
+    """
+
+    def __init__(self, hash=hash_data):
+        self._hash = hash
+
+    def process(self, req, resp, operation):
+        options = operation.get(extensions.HTTP_CACHE)
+        if not options:
+            return
+
+        cache_control = options.get('cacheControl')
+        if (
+            cache_control is not None
+            and resp.get_header('Cache-Control') is None
+        ):
+            resp.set_header('Cache-Control', cache_control)
+
+        if (
+            not options.get('etag', False)
+            or req.method not in _METHODS
+            or resp.status != falcon.HTTP_OK
+        ):
+            return
+
+        etag = resp.etag
+        if etag is None:
+            data = _get_data(resp)
+            if data is None:
+                return
+            etag = resp.etag = '"{}"'.format(self._hash(data))
+
+        if _match(req.get_header('If-None-Match'), etag):
+            resp.status = falcon.HTTP_NOT_MODIFIED
+            # 304 Not Modified does not have the body nor its media type.
+            resp.delete_header('Content-Type')
+
+
+def _get_data(resp):
+    # ``resp.data`` serializes ``resp.media`` once in Falcon 2, and
+    # Falcon 1 serializes it on assignment.
+    if resp.body is not None:
+        body = resp.body
+        if isinstance(body, six.text_type):
+            # Falcon encodes the text body in UTF-8.
+            body = body.encode('utf-8')
+        return body
+    data = resp.data
+    if resp.media is None and data == b'null':
+        # Falcon 1 serializes ``resp.media = None`` into ``null`` while
+        # Falcon 2 sends no body.
+        return None
+    return data
+
+
+def _match(if_none_match, etag):
+    """Compare the entity tags weakly as If-None-Match requires."""
+    if if_none_match is None:
+        return False
+
+    if_none_match = if_none_match.strip()
+    if if_none_match == '*':
+        return True
+
+    etag = _strip_weak(etag)
+    return any(
+        _strip_weak(tag.strip()) == etag for tag in if_none_match.split(',')
+    )
+
+
+def _strip_weak(etag):
+    return etag[2:] if etag.startswith('W/') else etag
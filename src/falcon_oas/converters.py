@@ -0,0 +1,173 @@
+"""Falcon field converters derived from the schemas of path parameters.
+
+The URI templates of the spec are rewritten so that the router of
+Falcon 2 converts and checks the path parameters, e.g. ``/pets/{pet_id}``
+with ``{type: integer, minimum: 1}`` is routed as
+``/pets/{pet_id:int(min=1)}``.  The path parameters which do not match
+the converters do not match the route, so the requests respond 404 Not
+Found instead of 400 Bad Request.
+
+The converters are derived from the schemas which they check exactly:
+
+``integer``
+    ``int`` converter with the bounds of ``minimum``, ``maximum`` and
+    the ``int32`` and ``int64`` formats.
+
+``string`` with ``uuid`` format
+    ``uuid`` converter.  The parameters are passed as ``uuid.UUID``.
+
+``string`` with ``enum``
+    :class:`EnumConverter`.
+
+The schemas with other keywords, such as ``pattern`` and ``multipleOf``,
+are not converted.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import math
+
+from six import iteritems
+from six import string_types
+
+from .operations import _iter_operations
+
+#: The identifier of :class:`EnumConverter` in the router.
+ENUM = 'oas_enum'
+
+# Keywords which do not affect the values of the instances.
+_ANNOTATIONS = frozenset(
+    ('type', 'title', 'description', 'example', 'deprecated', 'nullable')
+)
+
+_INTEGER_KEYWORDS = _ANNOTATIONS.union(
+    ('format', 'minimum', 'maximum', 'exclusiveMinimum', 'exclusiveMaximum')
+)
+
+_INTEGER_FORMATS = {
+    None: (None, None),
+    'int32': (-(2 ** 31), 2 ** 31 - 1),
+    'int64': (-(2 ** 63), 2 ** 63 - 1),
+}
+
+_STRING_KEYWORDS = _ANNOTATIONS.union(('format', 'enum'))
+
+# Characters which the URI templates of Falcon cannot hold in the
+# arguments of the converters.
+_RESERVED = frozenset('/{}()')
+
+
+class EnumConverter(object):
+    """Accept the field values in ``values`` only."""
+
+    __slots__ = ('_values',)
+
+    def __init__(self, *values):
+        self._values = frozenset(values)
+
+    def convert(self, value):
+        return value if value in self._values else None
+
+
+def path_converter(parameter_spec_dict):
+    """Return the field converter of the path parameter.
+
+    Return ``None`` if the schema of the parameter is not checked exactly
+    by a converter.
+    """
+    if parameter_spec_dict.get('style', 'simple') != 'simple':
+        return None
+    try:
+        schema = parameter_spec_dict['schema']
+    except KeyError:
+        return None
+
+    keywords = set(key for key in schema if not key.startswith('x-'))
+    schema_type = schema.get('type')
+    if schema_type == 'integer' and keywords <= _INTEGER_KEYWORDS:
+        return _int_converter(schema)
+    if schema_type == 'string' and keywords <= _STRING_KEYWORDS:
+        if 'enum' in schema:
+            return _enum_converter(schema)
+        if schema.get('format') == 'uuid':
+            return 'uuid'
+    return None
+
+
+def _int_converter(schema):
+    try:
+        minimum, maximum = _INTEGER_FORMATS[schema.get('format')]
+    except KeyError:
+        # Other formats may modify the values.
+        return None
+
+    if 'minimum' in schema:
+        value = int(math.ceil(schema['minimum']))
+        if schema.get('exclusiveMinimum') and value == schema['minimum']:
+            value += 1
+        minimum = value if minimum is None else max(minimum, value)
+    if 'maximum' in schema:
+        value = int(math.floor(schema['maximum']))
+        if schema.get('exclusiveMaximum') and value == schema['maximum']:
+            value -= 1
+        maximum = value if maximum is None else min(maximum, value)
+
+    args = []
+    if minimum is not None:
+        args.append('min={}'.format(minimum))
+    if maximum is not None:
+        args.append('max={}'.format(maximum))
+    return 'int({})'.format(','.join(args)) if args else 'int'
+
+
+def _enum_converter(schema):
+    values = schema['enum']
+    if 'format' in schema or not all(
+        isinstance(value, string_types) and not _RESERVED.intersection(value)
+        for value in values
+    ):
+        return None
+    # The router evaluates the arguments as Python literals.
+    return '{}({})'.format(ENUM, ','.join(repr(value) for value in values))
+
+
+def convert_uri_templates(spec):
+    """Return the URI templates with the field converters.
+
+    The dict maps the URI templates of the spec to the pairs of the URI
+    template with the converters and the names of the converted
+    parameters.  A path parameter is converted only if all the
+    operations of the path have the same converter for it since the
+    router has one route for each path.
+    """
+    converters = {}
+    for uri_template, _, operation, _ in _iter_operations(spec):
+        path_converters = {
+            parameter_spec_dict['name']: path_converter(parameter_spec_dict)
+            for parameter_spec_dict in operation['parameters']
+            if parameter_spec_dict['in'] == 'path'
+        }
+        if uri_template not in converters:
+            converters[uri_template] = path_converters
+        else:
+            converters[uri_template] = {
+                name: converter
+                for name, converter in iteritems(converters[uri_template])
+                if path_converters.get(name) == converter
+            }
+
+    result = {}
+    for uri_template, path_converters in iteritems(converters):
+        names = []
+        routed_template = uri_template
+        for name, converter in sorted(iteritems(path_converters)):
+            field = '{' + name + '}'
+            if converter is not None and field in routed_template:
+                routed_template = routed_template.replace(
+                    field, '{' + name + ':' + converter + '}'
+                )
+                names.append(name)
+        result[uri_template] = routed_template, frozenset(names)
+    return result
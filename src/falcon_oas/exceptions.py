@@ -8,3 +8,43 @@ from oas.exceptions import Error
 
 class SecurityError(Error):
     pass
+
+
+class RateLimitError(Error):
+    """The client exceeded the rate limit."""
+
+    def __init__(self, retry_after):
+        #: Seconds until the request is allowed.
+        self.retry_after = retry_after
+
+
+class SpecCacheError(Error):
+    """The spec cache cannot be used."""
+
+
+class ResponseError(Error):
+    """The response violates the Operation Object."""
+
+    def __init__(self, uri_template, method, status, errors):
+        self.uri_template = uri_template
+        self.method = method
+        self.status = status
+        self.errors = errors
+
+    def to_dict(self, obj_type=dict):
+        obj = obj_type()
+        obj['uri_template'] = self.uri_template
+        obj['method'] = self.method
+        obj['status'] = self.status
+        obj['errors'] = [
+            _error_to_dict(error, obj_type) for error in self.errors
+        ]
+        return obj
+
+
+def _error_to_dict(error, obj_type):
+    obj = obj_type()
+    obj['path'] = list(error.path)
+    obj['validator'] = error.validator
+    obj['message'] = error.message
+    return obj
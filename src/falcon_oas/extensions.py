@@ -41,6 +41,28 @@ from __future__ import unicode_literals
 #: the scopes of Security Requirement Object and an instance of
 #: :class:`oas.Request` in this case.
 #:
+#: The credential passed to the access control function depends on the
+#: type of Security Scheme Object:
+#:
+#: ``apiKey``
+#:     The value of the header, query parameter or cookie.
+#:
+#: ``http`` with ``basic`` scheme
+#:     The pair of the user-id and the password in ``Authorization``
+#:     header.
+#:
+#: ``http`` with other schemes
+#:     The credentials of the scheme in ``Authorization`` header, e.g.
+#:     the token of ``bearer`` scheme.
+#:
+#: ``oauth2`` and ``openIdConnect``
+#:     The bearer token in ``Authorization`` header.
+#:
+#: When the request does not have the credential, the Security
+#: Requirement Object is not satisfied without calling the access
+#: control function.  The result of the function is shared by the
+#: alternative Security Requirement Objects in the request.
+#:
 #: The access control function should return:
 #:
 #: ``True``
@@ -53,3 +75,85 @@ from __future__ import unicode_literals
 #: Falsy value
 #:     Deny the access. 403 Forbidden error occurs.
 IMPLEMENTATION = 'x-falcon-oas-implementation'
+
+#: ``x-falcon-oas-max-content-length`` limits the size of the request
+#: body in bytes for Request Body Object:
+#:
+#: .. code:: yaml
+#:
+#:     requestBody:
+#:       x-falcon-oas-max-content-length: 1048576
+#:       content:
+#:         application/json:
+#:           schema:
+#:             $ref: '#/components/schemas/PetNew'
+#:
+#: falcon-oas compares the limit with ``Content-Length`` before reading
+#: the request body and 413 Payload Too Large error occurs when the
+#: request body exceeds it.  The limit overrides ``max_content_length``
+#: of :class:`falcon_oas.OAS`.
+MAX_CONTENT_LENGTH = 'x-falcon-oas-max-content-length'
+
+#: ``x-falcon-oas-cache`` caches the results of the access control
+#: function of Security Scheme Object:
+#:
+#: .. code:: yaml
+#:
+#:     x-falcon-oas-implementation: auth.session_cookie_loader
+#:     x-falcon-oas-cache:
+#:       ttl: 60
+#:       negativeTtl: 5
+#:       maxSize: 1024
+#:     type: apiKey
+#:     name: session
+#:     in: cookie
+#:
+#: The results are cached by the credential and the scopes.  Allowed
+#: results live for ``ttl`` seconds (default: ``60``) and denied results
+#: live for ``negativeTtl`` seconds (default: ``0``, not cached).  The
+#: least recently used result is evicted when the cache holds
+#: ``maxSize`` results (default: ``1024``).
+#:
+#: The access control function is not called for cached results, so it
+#: should not depend on the request other than the credential.  Use
+#: :meth:`falcon_oas.security.AccessControl.invalidate` to invalidate
+#: the results, e.g. on logout.
+CACHE = 'x-falcon-oas-cache'
+
+#: ``x-falcon-oas-rate-limit`` limits the rate of the requests with
+#: :class:`falcon_oas.ratelimits.RateLimiter` for Operation Object and
+#: Security Scheme Object:
+#:
+#: .. code:: yaml
+#:
+#:     x-falcon-oas-rate-limit:
+#:       limit: 100
+#:       period: 60
+#:       burst: 10
+#:
+#: Each client can send ``limit`` requests per ``period`` seconds
+#: (default: ``1``) with bursts of ``burst`` requests (default:
+#: ``limit``).  The limit of Operation Object applies to the requests of
+#: the operation and the limit of Security Scheme Object applies to the
+#: requests of all the operations which require the scheme.  ``limit``
+#: and ``period`` must be positive.  The clients are identified by
+#: :func:`falcon_oas.ratelimits.default_key` by default.  429 Too Many
+#: Requests error with ``Retry-After`` header occurs when the limit is
+#: exceeded.
+RATE_LIMIT = 'x-falcon-oas-rate-limit'
+
+#: ``x-falcon-oas-http-cache`` describes the caching of the responses with
+#: :class:`falcon_oas.conditional.ConditionalResponses` for Operation
+#: Object:
+#:
+#: .. code:: yaml
+#:
+#:     x-falcon-oas-http-cache:
+#:       etag: true
+#:       cacheControl: private, max-age=60
+#:
+#: ``etag`` adds ``ETag`` header to 200 OK responses to GET and HEAD
+#: requests, and returns 304 Not Modified if it matches
+#: ``If-None-Match`` header of the request.  ``cacheControl`` is set as
+#: ``Cache-Control`` header unless the responder sets it.
+HTTP_CACHE = 'x-falcon-oas-http-cache'
@@ -3,20 +3,42 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import gc
+
 import falcon
+import six
 from oas import create_spec_from_dict
 from oas.exceptions import UndocumentedMediaType
 from oas.exceptions import UnmarshalError
+from oas.schema.unmarshalers import SchemaUnmarshaler
+from oas.spec import Spec
 
+from .batch import BatchResource
+from .conditional import ConditionalResponses
+from .converters import convert_uri_templates
+from .converters import ENUM
+from .converters import EnumConverter
+from .exceptions import RateLimitError
 from .exceptions import SecurityError
+from .exceptions import SpecCacheError
 from .extensions import IMPLEMENTATION
+from .interning import SchemaInterner
+from .media import create_json_handler
 from .middlewares import Middleware
+from .middlewares import MultiMiddleware
+from .problems import create_problem_serializer
 from .problems import http_error_handler
+from .problems import rate_limit_error_handler
 from .problems import security_error_handler
 from .problems import serialize_problem
 from .problems import undocumented_media_type_handler
 from .problems import unmarshal_error_handler
+from .routing import add_routes
 from .routing import generate_routes
+from .serializers import ResponseSerializer
+from .specs import compile_spec
+from .specs import load_spec
+from .unmarshalers import CompiledSchemaUnmarshaler
 
 
 class OAS(object):
@@ -27,12 +49,93 @@ class OAS(object):
         base_module='',
         api_factory=falcon.API,
         problems=True,
+        compiled=False,
+        max_content_length=None,
+        response_validator=None,
+        lazy=False,
+        observer=None,
+        batch_path=None,
+        json_handler=None,
+        rate_limiter=None,
+        conditional=False,
+        schema_unmarshaler=None,
+        response_serializer=None,
+        executor=None,
+        converters=False,
     ):
-        self.spec = create_spec_from_dict(spec_dict)
+        if isinstance(spec_dict, Spec):
+            self.spec = spec_dict
+        else:
+            self.spec = create_spec_from_dict(spec_dict)
         self.formats = formats
         self.base_module = base_module
         self.api_factory = api_factory
         self.problems = problems
+        self.compiled = compiled
+        self.max_content_length = max_content_length
+        self.response_validator = response_validator
+        self.lazy = lazy
+        self.observer = observer
+        self.batch_path = batch_path
+        if isinstance(json_handler, six.string_types):
+            json_handler = create_json_handler(json_handler)
+        self.json_handler = json_handler
+        if response_serializer is True:
+            response_serializer = ResponseSerializer(
+                dumps=json_handler and json_handler.dumps
+            )
+        self.response_serializer = response_serializer or None
+        self.rate_limiter = rate_limiter
+        if conditional is True:
+            conditional = ConditionalResponses()
+        self.conditional = conditional or None
+        self.schema_unmarshaler = schema_unmarshaler
+        self.executor = executor
+        self.converters = converters
+        self._middleware = None
+        self._routes = None
+        # The APIs set up and the resource classes of their routes.
+        self._apis = []
+
+    @classmethod
+    def from_cache(cls, path, source=None, **kwargs):
+        """Create from the spec cache compiled by ``falcon-oas compile``.
+
+        If ``source`` is given and the cache is not usable, for example
+        since the source document has changed, the cache is compiled
+        again from the source.
+        """
+        try:
+            spec = load_spec(path, source=source)
+        except (IOError, OSError, SpecCacheError):
+            if source is None:
+                raise
+            spec = compile_spec(source, path)
+        return cls(spec, **kwargs)
+
+    def preload(self, freeze=True):
+        """Resolve everything eagerly before forking workers.
+
+        Call it in the master process of a prefork server after
+        :meth:`resolve_path_item` and :meth:`resolve_security_scheme`.
+        The operations, the security schemes, the compiled validators and
+        the implementations are resolved, and ``gc.freeze()`` moves all
+        the objects to the permanent generation so that the workers share
+        their pages instead of copying them on garbage collection.
+        ``gc.freeze()`` is available in Python 3.7 or later.
+        """
+        self.middleware
+        self._routes = list(
+            generate_routes(
+                self.spec,
+                base_module=self.base_module,
+                converters=self.converters,
+            )
+        )
+
+        if freeze and hasattr(gc, 'freeze'):
+            gc.collect()
+            gc.freeze()
 
     def create_api(self, **options):
         if 'middleware' not in options:
@@ -42,9 +145,28 @@ class OAS(object):
 
     @property
     def middleware(self):
-        return Middleware(
-            self.spec, formats=self.formats, base_module=self.base_module
-        )
+        """The middleware shared by the APIs created by :meth:`create_api`.
+
+        It is created on first access with the options at that time.
+        """
+        if self._middleware is None:
+            self._middleware = Middleware(
+                self.spec,
+                formats=self.formats,
+                base_module=self.base_module,
+                compiled=self.compiled,
+                max_content_length=self.max_content_length,
+                response_validator=self.response_validator,
+                lazy=self.lazy,
+                observer=self.observer,
+                rate_limiter=self.rate_limiter,
+                conditional=self.conditional,
+                schema_unmarshaler=self.schema_unmarshaler,
+                response_serializer=self.response_serializer,
+                executor=self.executor,
+                converters=self.converters,
+            )
+        return self._middleware
 
     def setup(self, api):
         api.req_options.auto_parse_qs_csv = False
@@ -54,22 +176,211 @@ class OAS(object):
         )
         api.add_error_handler(SecurityError, security_error_handler)
         api.add_error_handler(UnmarshalError, unmarshal_error_handler)
+        api.add_error_handler(RateLimitError, rate_limit_error_handler)
+
+        if self.json_handler is not None:
+            # Share the handler with unmarshaling the request bodies
+            # through ``req.media`` so that they are decoded only once.
+            # Falcon 1 keys the default handler by
+            # ``falcon.DEFAULT_MEDIA_TYPE`` with the charset.
+            handlers = {
+                'application/json': self.json_handler,
+                falcon.DEFAULT_MEDIA_TYPE: self.json_handler,
+            }
+            api.req_options.media_handlers.update(handlers)
+            api.resp_options.media_handlers.update(handlers)
 
         if self.problems:
             api.add_error_handler(falcon.HTTPError, http_error_handler)
-            api.set_error_serializer(serialize_problem)
+            if self.json_handler is None:
+                api.set_error_serializer(serialize_problem)
+            else:
+                api.set_error_serializer(
+                    create_problem_serializer(dumps=self.json_handler.dumps)
+                )
+
+        if self.converters:
+            api.router_options.converters[ENUM] = EnumConverter
 
-        for uri_template, resource_class in generate_routes(
-            self.spec, base_module=self.base_module
-        ):
+        routes = self._routes
+        if routes is None:
+            routes = generate_routes(
+                self.spec,
+                base_module=self.base_module,
+                converters=self.converters,
+            )
+        resource_classes = {}
+        for uri_template, resource_class in routes:
             api.add_route(uri_template, resource_class())
+            resource_classes[uri_template] = resource_class
+        self._apis.append((api, resource_classes))
+
+        if self.batch_path is not None:
+            api.add_route(
+                self.spec.base_path + self.batch_path, BatchResource(api)
+            )
 
         return api
 
+    def reload(self, spec_dict):
+        """Replace the spec without restarting the workers.
+
+        Everything derived from the new spec, including the routes, the
+        implementations and the compiled schemas, is prepared in the
+        calling thread, e.g. a background thread, and then the state of
+        the middleware is replaced at once with no lock on the requests.
+        The unchanged operations reuse their compiled schemas.
+
+        The routes of the new paths and the paths with new
+        implementations are added to the APIs set up by :meth:`setup`
+        with :func:`~falcon_oas.routing.add_routes`, so the requests are
+        routed by either the previous router or the new one.
+        The removed paths respond 404 Not Found.  The implementations
+        resolved by :meth:`resolve_path_item` and
+        :meth:`resolve_security_scheme` are kept unless the new spec has
+        ones.
+
+        :raises ValueError: if ``converters`` is true and the converters of
+            the paths routed by the APIs change, since the routes cannot
+            be removed from the router.
+        """
+        if isinstance(spec_dict, Spec):
+            spec = spec_dict
+        else:
+            spec = create_spec_from_dict(spec_dict)
+        if self.converters and self._apis:
+            _check_converters(self.spec, spec)
+        _copy_resolved_implementations(self.spec, spec)
+        routes = list(
+            generate_routes(
+                spec, base_module=self.base_module, converters=self.converters
+            )
+        )
+
+        # Replace the middleware state before adding the routes so that
+        # the new routes are never served without their operations.
+        if self._middleware is not None:
+            self._middleware.reload(spec)
+        self.spec = spec
+        self._routes = routes
+
+        for api, resource_classes in self._apis:
+            new_routes = [
+                (uri_template, resource_class)
+                for uri_template, resource_class in routes
+                if resource_classes.get(uri_template) is not resource_class
+            ]
+            if new_routes:
+                add_routes(
+                    api,
+                    [
+                        (uri_template, resource_class())
+                        for uri_template, resource_class in new_routes
+                    ],
+                )
+                resource_classes.update(new_routes)
+
     def resolve_path_item(self, path, resource):
         path_item = self.spec['paths'][path]
         path_item[IMPLEMENTATION] = lambda: resource
+        self._routes = None
 
     def resolve_security_scheme(self, name, handler):
         security_scheme = self.spec['components']['securitySchemes'][name]
         security_scheme[IMPLEMENTATION] = handler
+        # The middleware resolves the handlers when it is created.
+        self._middleware = None
+
+
+class MultiOAS(object):
+    """Serve several specs, e.g. the versions of an API, on one API.
+
+    The requests are dispatched to the middleware of the spec by
+    :class:`~falcon_oas.middlewares.MultiMiddleware`.  Identical schemas
+    of the specs are interned by
+    :class:`~falcon_oas.interning.SchemaInterner`, and the specs with the
+    same ``compiled`` and ``formats`` share the schema unmarshaler, so
+    that the schemas are held in memory and compiled once.
+
+    :param oases: The instances of :class:`OAS` whose specs have distinct
+        paths.
+    """
+
+    def __init__(self, oases, api_factory=falcon.API, intern=True):
+        self.oases = list(oases)
+        self.api_factory = api_factory
+        self.interner = None
+        if intern:
+            self.interner = SchemaInterner()
+            for oas in self.oases:
+                self.interner.intern_spec(oas.spec)
+        self._share_schema_unmarshalers()
+        self._middleware = None
+
+    def _share_schema_unmarshalers(self):
+        schema_unmarshalers = {}
+        for oas in self.oases:
+            if oas.schema_unmarshaler is not None:
+                continue
+            key = oas.compiled, id(oas.formats)
+            if key not in schema_unmarshalers:
+                if oas.compiled:
+                    schema_unmarshaler = CompiledSchemaUnmarshaler(
+                        spec=oas.spec, formats=oas.formats
+                    )
+                else:
+                    schema_unmarshaler = SchemaUnmarshaler(
+                        spec=oas.spec, formats=oas.formats
+                    )
+                schema_unmarshalers[key] = schema_unmarshaler
+            oas.schema_unmarshaler = schema_unmarshalers[key]
+            oas._middleware = None
+
+    def create_api(self, **options):
+        if 'middleware' not in options:
+            options['middleware'] = self.middleware
+
+        return self.setup(self.api_factory(**options))
+
+    @property
+    def middleware(self):
+        if self._middleware is None:
+            self._middleware = MultiMiddleware(
+                [oas.middleware for oas in self.oases]
+            )
+        return self._middleware
+
+    def setup(self, api):
+        for oas in self.oases:
+            oas.setup(api)
+        return api
+
+
+def _copy_resolved_implementations(spec, new_spec):
+    """Copy the implementations resolved programmatically to the new spec."""
+    pairs = [(spec.data.get('paths', {}), new_spec.data.get('paths', {}))]
+    pairs.append(
+        tuple(
+            s.data.get('components', {}).get('securitySchemes', {})
+            for s in (spec, new_spec)
+        )
+    )
+    for objects, new_objects in pairs:
+        for name, new_object in six.iteritems(new_objects):
+            try:
+                implementation = objects[name][IMPLEMENTATION]
+            except KeyError:
+                continue
+            if IMPLEMENTATION not in new_object and not isinstance(
+                implementation, six.string_types
+            ):
+                new_object[IMPLEMENTATION] = implementation
+
+
+def _check_converters(spec, new_spec):
+    uri_templates = convert_uri_templates(spec)
+    for uri_template, route in six.iteritems(convert_uri_templates(new_spec)):
+        if uri_templates.get(uri_template, route)[0] != route[0]:
+            raise ValueError(
+                'The converters of {} cannot change'.format(uri_template)
+            )
@@ -0,0 +1,154 @@
+"""Measure the phases of :meth:`falcon_oas.Middleware.process_resource`.
+
+The phases are:
+
+``lookup``
+    Looking up the operation of the request.
+``security``
+    Handling the Security Requirement Objects of the operation.
+``parameters``
+    Unmarshaling the parameters.
+``request_body``
+    Unmarshaling the request body.
+
+The phases are not measured at all if no observer is given to the
+middleware.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import abc
+import bisect
+import threading
+
+import six
+
+try:
+    from time import perf_counter_ns as clock
+except ImportError:  # pragma: no cover
+    try:
+        from time import perf_counter
+    except ImportError:
+        from time import time as perf_counter
+
+    def clock():
+        return int(perf_counter() * 1e9)
+
+
+#: Upper bounds of the buckets of :class:`HistogramCollector` in seconds.
+DEFAULT_BUCKETS = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+)
+
+
+@six.add_metaclass(abc.ABCMeta)
+class Observer(object):
+    """Interface of the observers of the phases."""
+
+    @abc.abstractmethod
+    def observe(self, uri_template, method, phase, duration_ns):
+        """Called with the duration of the phase in nanoseconds."""
+
+
+class HistogramCollector(Observer):
+    """Thread-safe observer which collects histograms in process.
+
+    The histograms are collected per operation and phase.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self._bounds = [int(bucket * 1e9) for bucket in self.buckets]
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def observe(self, uri_template, method, phase, duration_ns):
+        # The bucket includes its upper bound as ``le`` of Prometheus.
+        index = bisect.bisect_left(self._bounds, duration_ns)
+        key = uri_template, method, phase
+        with self._lock:
+            try:
+                histogram = self._histograms[key]
+            except KeyError:
+                histogram = self._histograms[key] = _Histogram(
+                    len(self._bounds) + 1
+                )
+            histogram.counts[index] += 1
+            histogram.sum += duration_ns
+
+    def snapshot(self):
+        """Return the histograms keyed by ``(uri_template, method, phase)``.
+
+        Each histogram is a dict with the cumulative ``buckets`` as a list
+        of ``(upper_bound, count)`` ending with ``float('inf')``, the
+        ``count`` and the ``sum`` in seconds, as Prometheus expects.
+        """
+        upper_bounds = self.buckets + (float('inf'),)
+        with self._lock:
+            histograms = [
+                (key, list(histogram.counts), histogram.sum)
+                for key, histogram in self._histograms.items()
+            ]
+
+        snapshot = {}
+        for key, counts, sum_ns in histograms:
+            buckets = []
+            cumulative = 0
+            for upper_bound, count in zip(upper_bounds, counts):
+                cumulative += count
+                buckets.append((upper_bound, cumulative))
+            snapshot[key] = {
+                'buckets': buckets,
+                'count': cumulative,
+                'sum': sum_ns / 1e9,
+            }
+        return snapshot
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+
+class _Histogram(object):
+    __slots__ = ('counts', 'sum')
+
+    def __init__(self, size):
+        self.counts = [0] * size
+        self.sum = 0
+
+
+class Stopwatch(object):
+    """Report the durations of consecutive phases to the observer."""
+
+    __slots__ = ('_observer', '_uri_template', '_method', '_start')
+
+    def __init__(self, observer, uri_template, method):
+        self._observer = observer
+        self._uri_template = uri_template
+        self._method = method
+        self._start = clock()
+
+    def restart(self):
+        self._start = clock()
+
+    def lap(self, phase):
+        """Report the duration since the last lap or restart."""
+        now = clock()
+        self._observer.observe(
+            self._uri_template, self._method, phase, now - self._start
+        )
+        self._start = now
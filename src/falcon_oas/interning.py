@@ -0,0 +1,111 @@
+"""Share identical schemas between specs.
+
+Specs of the API versions served side by side usually have many
+identical schemas.  :class:`SchemaInterner` replaces equal schemas with
+a single instance so that they are held in memory and compiled by
+:class:`~falcon_oas.unmarshalers.CompiledSchemaUnmarshaler` only once.
+The interned schemas must not be modified.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from six import iteritems
+from six import itervalues
+
+
+class SchemaInterner(object):
+    """Intern the schemas of resolved specs.
+
+    The schemas are hash-consed bottom up: a dict or a list is equal to
+    the interned one if their items are identical after interning.
+    """
+
+    def __init__(self):
+        # The interned schemas keyed by their structure.
+        self._interned = {}
+        self._visiting = set()
+        self.hits = 0
+
+    def intern_spec(self, spec):
+        """Intern the schemas in the spec in place."""
+        self._intern_schemas(spec.data)
+
+    def intern(self, value):
+        """Return the interned value equal to the value."""
+        if isinstance(value, dict):
+            items = value.items
+        elif isinstance(value, list):
+            items = lambda: enumerate(value)  # noqa: E731
+        else:
+            return value
+
+        if id(value) in self._visiting:
+            # Recursive schemas are left as they are.
+            return value
+        self._visiting.add(id(value))
+        try:
+            for key, item in list(items()):
+                value[key] = self.intern(item)
+        finally:
+            self._visiting.discard(id(value))
+
+        if isinstance(value, dict):
+            key = dict, frozenset(
+                (k, _identify(v)) for k, v in iteritems(value)
+            )
+        else:
+            key = list, tuple(_identify(v) for v in value)
+
+        try:
+            interned = self._interned[key]
+        except KeyError:
+            self._interned[key] = value
+            return value
+        self.hits += 1
+        return interned
+
+    def __len__(self):
+        return len(self._interned)
+
+    def _intern_schemas(self, value):
+        if isinstance(value, dict):
+            for key, item in list(iteritems(value)):
+                if key == 'schema':
+                    value[key] = self.intern(item)
+                elif key == 'schemas' and isinstance(item, dict):
+                    for name, schema in list(iteritems(item)):
+                        item[name] = self.intern(schema)
+                else:
+                    self._intern_schemas(item)
+        elif isinstance(value, list):
+            for item in value:
+                self._intern_schemas(item)
+
+
+def _identify(value):
+    if isinstance(value, (dict, list)):
+        # The items are already interned.
+        return id(value)
+    # Distinguish ``1``, ``1.0`` and ``True`` which are equal.
+    return type(value), value
+
+
+def count_objects(specs):
+    """Return the number of the distinct dicts and lists in the specs."""
+    seen = set()
+    stack = [spec.data for spec in specs]
+    while stack:
+        value = stack.pop()
+        if id(value) in seen:
+            continue
+        seen.add(id(value))
+        if isinstance(value, dict):
+            children = itervalues(value)
+        else:
+            children = value
+        stack.extend(
+            child for child in children if isinstance(child, (dict, list))
+        )
+    return len(seen)
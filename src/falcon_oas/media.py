@@ -0,0 +1,113 @@
+"""JSON media handler with pluggable JSON libraries."""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import functools
+import importlib
+
+import falcon
+from falcon.media import BaseHandler
+
+#: Libraries tried by :func:`create_json_handler` in order.
+LIBRARIES = ('orjson', 'ujson', 'rapidjson', 'json')
+
+
+class JSONHandler(BaseHandler):
+    """JSON media handler of Falcon 1 and 2.
+
+    :param loads: The function which decodes JSON in bytes.
+    :param dumps: The function which encodes the object to JSON in bytes.
+    """
+
+    def __init__(self, loads, dumps):
+        self.loads = loads
+        self.dumps = dumps
+
+    def deserialize(self, stream, content_type=None, content_length=None):
+        # Falcon 1 passes the bytes while Falcon 2 passes the stream.
+        raw = stream if isinstance(stream, bytes) else stream.read()
+        try:
+            return self.loads(raw)
+        except ValueError as e:
+            raise falcon.HTTPBadRequest(
+                'Invalid JSON', 'Could not parse JSON body - {0}'.format(e)
+            )
+
+    def serialize(self, media, content_type=None):
+        return self.dumps(media)
+
+
+def create_json_handler(library=None):
+    """Return :class:`JSONHandler` with the JSON library.
+
+    :param library: The name of the library in :data:`LIBRARIES`.  The
+        first importable library is used if it is not given.
+    :raises ImportError: if the library is not importable.
+    """
+    if library is not None:
+        return JSONHandler(
+            *_FUNCTIONS[library](importlib.import_module(library))
+        )
+
+    for library in LIBRARIES[:-1]:
+        try:
+            module = importlib.import_module(library)
+        except ImportError:
+            continue
+        return JSONHandler(*_FUNCTIONS[library](module))
+    # The standard library is always available.
+    return create_json_handler('json')
+
+
+def _encode(dumps):
+    def encoded_dumps(obj):
+        return dumps(obj).encode('utf-8')
+
+    return encoded_dumps
+
+
+def _decode(loads):
+    def decoded_loads(raw):
+        return loads(raw.decode('utf-8'))
+
+    return decoded_loads
+
+
+def _orjson(module):
+    # orjson works with bytes natively.
+    return module.loads, module.dumps
+
+
+def _ujson(module):
+    return (
+        _decode(module.loads),
+        _encode(
+            functools.partial(
+                module.dumps, ensure_ascii=False, escape_forward_slashes=False
+            )
+        ),
+    )
+
+
+def _rapidjson(module):
+    return (
+        _decode(module.loads),
+        _encode(functools.partial(module.dumps, ensure_ascii=False)),
+    )
+
+
+def _json(module):
+    return (
+        _decode(module.loads),
+        _encode(functools.partial(module.dumps, ensure_ascii=False)),
+    )
+
+
+_FUNCTIONS = {
+    'orjson': _orjson,
+    'ujson': _ujson,
+    'rapidjson': _rapidjson,
+    'json': _json,
+}
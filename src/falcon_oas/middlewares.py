@@ -3,15 +3,25 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import threading
+
 import falcon
 from oas import Request
 from oas import unmarshal_request
+from oas.exceptions import UnmarshalError
+from oas.parameters.unmarshalers import unmarshal_parameters
+from oas.request_body.unmarshalers import unmarshal_request_body
 from oas.schema.unmarshalers import SchemaUnmarshaler
 from oas.utils import cached_property
 from six import iteritems
 
 from . import extensions
+from .converters import convert_uri_templates
+from .instrumentation import Stopwatch
+from .operations import OperationTable
 from .security import AccessControl
+from .security import MEMO_ENVIRON_KEY
+from .unmarshalers import CompiledSchemaUnmarshaler
 from .utils import import_string
 
 
@@ -30,12 +40,16 @@ class _Indexer(object):
 
 
 class _RequestAdapter(Request):
-    def __init__(self, req, params):
+    def __init__(self, req, params, uri_template=None):
         self._req = req
         self._params = params
+        # The URI template of the spec if the route has converters.
+        self._uri_template = uri_template
 
     @property
     def uri_template(self):
+        if self._uri_template is not None:
+            return self._uri_template
         return self._req.uri_template
 
     @property
@@ -85,49 +99,593 @@ class _RequestAdapter(Request):
 
 
 class _Context(object):
-    __slots__ = ('schema_unmarshaler', 'user', 'parameters', 'request_body')
+    __slots__ = (
+        'schema_unmarshaler',
+        'user',
+        'parameters',
+        'request_body',
+        'operation',
+        'uri_template',
+    )
 
     def __init__(
-        self, schema_unmarshaler, user=None, parameters=None, request_body=None
+        self,
+        schema_unmarshaler,
+        user=None,
+        parameters=None,
+        request_body=None,
+        operation=None,
+        uri_template=None,
     ):
         self.schema_unmarshaler = schema_unmarshaler
         self.user = user
         self.parameters = parameters
         self.request_body = request_body
+        self.operation = operation
+        # The URI template of the spec, which differs from
+        # ``req.uri_template`` routed with the converters.
+        self.uri_template = uri_template
+
+
+class _LazyParameters(dict):
+    """Parameters which are unmarshaled per location on first access."""
+
+    def __init__(self, unmarshal):
+        super(_LazyParameters, self).__init__()
+        self._unmarshal = unmarshal
+
+    def __missing__(self, location):
+        self[location] = parameters = self._unmarshal(location)
+        return parameters
+
+
+_unset = object()
+
+
+class _LazyContext(_Context):
+    """Context whose request body is unmarshaled on first access."""
+
+    __slots__ = ('_request_body', '_unmarshal_request_body')
+
+    def __init__(self, schema_unmarshaler, unmarshal_request_body, **kwargs):
+        self._unmarshal_request_body = unmarshal_request_body
+        super(_LazyContext, self).__init__(
+            schema_unmarshaler, request_body=_unset, **kwargs
+        )
+
+    @property
+    def request_body(self):
+        if self._request_body is _unset:
+            self._request_body = self._unmarshal_request_body()
+        return self._request_body
+
+    @request_body.setter
+    def request_body(self, value):
+        self._request_body = value
+
+
+class _Snapshot(object):
+    """The state of :class:`Middleware` derived from the spec."""
+
+    __slots__ = ('spec', 'operations', 'access_control', 'removed', 'routes')
+
+    def __init__(self, spec, operations, access_control, removed, routes):
+        self.spec = spec
+        self.operations = operations
+        self.access_control = access_control
+        # URI templates of the paths removed by the reloads.
+        self.removed = removed
+        # The URI templates with the converters mapped to the URI
+        # templates of the spec and the names of the converted path
+        # parameters.
+        self.routes = routes
 
 
 class Middleware(object):
-    def __init__(self, spec, formats=None, base_module=''):
-        self._spec = spec
-        self._formats = formats
-        security_schemes = _get_security_schemes(spec, base_module=base_module)
-        self._access_control = AccessControl(security_schemes)
+    def __init__(
+        self,
+        spec,
+        formats=None,
+        base_module='',
+        compiled=False,
+        max_content_length=None,
+        response_validator=None,
+        lazy=False,
+        observer=None,
+        rate_limiter=None,
+        conditional=None,
+        schema_unmarshaler=None,
+        response_serializer=None,
+        executor=None,
+        converters=False,
+    ):
+        self._lazy = lazy
+        self._converters = converters
+        self._observer = observer
+        self._max_content_length = max_content_length
+        self._response_validator = response_validator
+        self._conditional = conditional
+        self._base_module = base_module
+        self._rate_limiter = rate_limiter
+        self._response_serializer = response_serializer
+        # The unmarshaler is shared by all the requests, and can be
+        # shared by the middlewares of other specs.  It does not keep
+        # per-request state since ``$ref``s of the spec are already
+        # resolved by :func:`oas.create_spec_from_dict`.
+        if schema_unmarshaler is None:
+            if compiled:
+                schema_unmarshaler = CompiledSchemaUnmarshaler(
+                    spec=spec, formats=formats
+                )
+            else:
+                schema_unmarshaler = SchemaUnmarshaler(
+                    spec=spec, formats=formats
+                )
+        self._schema_unmarshaler = schema_unmarshaler
+        self._executor = executor
+        # The durations to compile the operations in nanoseconds.
+        self._compile_durations = {}
+        # Functions called with the middleware and the new snapshot
+        # before :meth:`reload` replaces the snapshot.
+        self._reload_hooks = []
+        self._snapshot = self._create_snapshot(spec)
+
+    def reload(self, spec):
+        """Replace the spec without blocking requests.
+
+        The state derived from the new spec is created in the calling
+        thread, and then replaces the current state at once.  Each
+        request sees either the previous state or the new one.  The
+        operations which are not changed are reused, so their compiled
+        schemas and access control are reused too.  The paths removed
+        from the spec respond 404 Not Found.
+
+        The state of the previous operations, such as compiled schemas
+        and rate limits, is released after the replacement, and the
+        requests which still use the previous state fall back to the
+        uncompiled path.  The caches of the access control are reused.
+        """
+        previous = self._snapshot
+        snapshot = self._create_snapshot(spec, previous)
+        try:
+            for hook in self._reload_hooks:
+                hook(self, snapshot)
+        except Exception:
+            self._release_operations(snapshot.operations)
+            raise
+        self._snapshot = snapshot
+        self._release_operations(previous.operations)
+
+    def _release_operations(self, operations):
+        compiled = isinstance(
+            self._schema_unmarshaler, CompiledSchemaUnmarshaler
+        )
+        for operation in operations.iter_operations():
+            if compiled:
+                self._schema_unmarshaler.release_operation(operation)
+            if self._response_serializer is not None:
+                self._response_serializer.release_operation(operation)
+            if self._rate_limiter is not None:
+                self._rate_limiter.release(operation)
+
+    def _create_snapshot(self, spec, previous=None):
+        operations = OperationTable(
+            spec, previous=previous and previous.operations
+        )
+        removed = frozenset()
+        converted_routes = {}
+        if previous is not None:
+            # The routes added before the reload stay in the router.
+            converted_routes.update(previous.routes)
+            uri_templates = set(
+                uri_template for uri_template, _ in operations.iter_routes()
+            )
+            removed = (
+                frozenset(
+                    uri_template
+                    for uri_template, _ in previous.operations.iter_routes()
+                )
+                .union(previous.removed)
+                .difference(uri_templates)
+            )
+
+        if isinstance(self._schema_unmarshaler, CompiledSchemaUnmarshaler):
+            self._compile_operations(operations)
+        if self._response_serializer is not None:
+            for operation in operations.iter_operations():
+                self._response_serializer.compile_operation(operation)
+
+        security_schemes = _get_security_schemes(
+            spec, base_module=self._base_module
+        )
+        access_control = AccessControl(
+            security_schemes, previous=previous and previous.access_control
+        )
+        for operation in operations.iter_operations():
+            if operation['security']:
+                access_control.compile(operation['security'])
+
+        if self._rate_limiter is not None:
+            all_security_schemes = spec.get_security_schemes()
+            routes = operations.iter_route_operations()
+            for uri_template, method, operation in routes:
+                self._rate_limiter.compile(
+                    uri_template, method, operation, all_security_schemes
+                )
+
+        if self._converters:
+            for uri_template, route in iteritems(convert_uri_templates(spec)):
+                if route[1]:
+                    converted_routes[route[0]] = uri_template, route[1]
+
+        return _Snapshot(
+            spec, operations, access_control, removed, converted_routes
+        )
+
+    def _compile_operations(self, operations):
+        routes = list(operations.iter_route_operations())
+        # Only the schemas of distinct digests are passed to the
+        # executor, so equal schemas are compiled once as well.
+        durations = self._schema_unmarshaler.compile_operations(
+            [operation for _, _, operation in routes],
+            map=map if self._executor is None else self._executor.map,
+        )
+        for (uri_template, method, _), duration in zip(routes, durations):
+            self._compile_durations[uri_template, method] = duration
+
+    def compile_report(self):
+        """Return ``(uri_template, method, seconds)`` of the operations.
+
+        The operations are sorted by the durations to compile their
+        schemas in descending order.  The schemas are compiled only if
+        ``compiled`` is true.
+        """
+        return sorted(
+            (
+                (uri_template, method, duration / 1e9)
+                for (uri_template, method), duration in iteritems(
+                    self._compile_durations
+                )
+            ),
+            key=lambda item: item[2],
+            reverse=True,
+        )
+
+    @property
+    def access_control(self):
+        return self._snapshot.access_control
+
+    @property
+    def operations(self):
+        return self._snapshot.operations
+
+    @property
+    def schema_unmarshaler(self):
+        """The schema unmarshaler shared by the requests."""
+        return self._schema_unmarshaler
+
+    @property
+    def converted_uri_templates(self):
+        """The URI templates with the converters routed by Falcon."""
+        return frozenset(self._snapshot.routes)
 
     def process_resource(self, req, resp, resource, params):
-        oas_req = _RequestAdapter(req, params)
+        # Use the same snapshot throughout the request.
+        snapshot = self._snapshot
+        converted = frozenset()
+        try:
+            uri_template, converted = snapshot.routes[req.uri_template]
+        except KeyError:
+            oas_req = _RequestAdapter(req, params)
+        else:
+            oas_req = _RequestAdapter(req, params, uri_template)
+
+        stopwatch = None
+        if self._observer is not None:
+            stopwatch = Stopwatch(
+                self._observer, oas_req.uri_template, oas_req.method
+            )
 
-        operation = self._spec.get_operation(
+        operation = snapshot.operations[
             oas_req.uri_template, oas_req.method, oas_req.media_type
-        )
+        ]
         if operation is None:
+            if oas_req.uri_template in snapshot.removed:
+                raise falcon.HTTPNotFound()
             return
 
-        schema_unmarshaler = SchemaUnmarshaler(
-            spec=self._spec, formats=self._formats
-        )
-        req.context['oas'] = context = _Context(schema_unmarshaler)
+        if stopwatch is not None:
+            stopwatch.lap('lookup')
 
-        user = self._access_control.handle(oas_req, operation)
+        schema_unmarshaler = self._schema_unmarshaler
+        if self._lazy:
+            context = _LazyContext(
+                schema_unmarshaler,
+                lambda: _unmarshal_request_body(
+                    schema_unmarshaler, oas_req, operation, stopwatch
+                ),
+                operation=operation,
+                uri_template=oas_req.uri_template,
+            )
+        else:
+            context = _Context(
+                schema_unmarshaler,
+                operation=operation,
+                uri_template=oas_req.uri_template,
+            )
+        req.context['oas'] = context
 
-        parameters, request_body = unmarshal_request(
-            schema_unmarshaler, oas_req, operation
+        user = snapshot.access_control.handle(
+            oas_req, operation, memo=req.env.get(MEMO_ENVIRON_KEY)
         )
-        if 'path' in parameters:
+
+        if self._rate_limiter is not None:
+            self._rate_limiter.check(req, operation, user)
+
+        if stopwatch is not None:
+            stopwatch.lap('security')
+
+        if 'requestBody' in operation:
+            self._check_content_length(oas_req, operation['requestBody'])
+
+        if self._lazy:
+            # Path parameters are unmarshaled eagerly since they are
+            # passed to the responder as keyword arguments.
+            parameters = _LazyParameters(
+                lambda location: _unmarshal_parameters(
+                    schema_unmarshaler,
+                    oas_req,
+                    operation,
+                    location,
+                    stopwatch,
+                    skip=converted,
+                )
+            )
+        else:
+            if stopwatch is None and not converted:
+                parameters, request_body = unmarshal_request(
+                    schema_unmarshaler, oas_req, operation
+                )
+            else:
+                parameters, request_body = _unmarshal_request(
+                    schema_unmarshaler,
+                    oas_req,
+                    operation,
+                    stopwatch,
+                    skip=converted,
+                )
+            context.request_body = request_body
+
+        if converted:
+            # The router has converted and checked them already.
+            parameters['path'].update(
+                (name, params[name]) for name in converted
+            )
+        if self._lazy or 'path' in parameters:
             params.update(parameters['path'])
 
         context.user = user
         context.parameters = parameters
-        context.request_body = request_body
+
+    def process_response(self, req, resp, resource, req_succeeded):
+        if not req_succeeded:
+            return
+
+        context = req.context.get('oas')
+        if context is None:
+            return
+
+        # Validate the instance converted by the serializer, which is
+        # sent, before the response turns into 304 Not Modified.
+        media = None
+        if self._response_serializer is not None:
+            media = self._response_serializer.process(
+                req, resp, context.operation
+            )
+        if self._response_validator is not None:
+            self._response_validator.process(
+                req, resp, context.operation, media=media
+            )
+        if self._conditional is not None:
+            self._conditional.process(req, resp, context.operation)
+
+    def _check_content_length(self, oas_req, request_body_spec_dict):
+        max_content_length = request_body_spec_dict.get(
+            extensions.MAX_CONTENT_LENGTH, self._max_content_length
+        )
+        if (
+            max_content_length is not None
+            and oas_req.content_length > max_content_length
+        ):
+            # Falcon 2 renamed HTTPRequestEntityTooLarge of Falcon 1.
+            raise falcon.HTTPError(
+                falcon.HTTP_413,
+                description=(
+                    'The request body must not exceed {} bytes'.format(
+                        max_content_length
+                    )
+                ),
+            )
+
+
+class MultiMiddleware(object):
+    """Dispatch to the middlewares of the specs by URI template.
+
+    The middleware of the route is found by a single dict lookup instead
+    of calling each middleware in turn.  The dispatch table is rebuilt
+    when a middleware reloads its spec.
+
+    :raises ValueError: if the specs have the same operation.
+    """
+
+    def __init__(self, middlewares):
+        self._members = list(middlewares)
+        self._lock = threading.Lock()
+        self._middlewares = self._create_table({})
+        for middleware in self._members:
+            middleware._reload_hooks.append(self._reload)
+
+    def _reload(self, middleware, snapshot):
+        # Replace the table before the middleware replaces its snapshot,
+        # so that the routes added by the reload are never dispatched to
+        # no middleware, and a duplicate path rejects the reload.
+        with self._lock:
+            self._middlewares = self._create_table({middleware: snapshot})
+
+    def _create_table(self, snapshots):
+        table = {}
+        # The routes of the removed paths stay in the router, and the
+        # middlewares respond 404 Not Found to them.
+        routed = []
+        for middleware in self._members:
+            snapshot = snapshots.get(middleware, middleware._snapshot)
+            for uri_template, method in snapshot.operations.iter_routes():
+                if table.get(uri_template, middleware) is not middleware:
+                    raise ValueError('Duplicate path: {}'.format(uri_template))
+                table[uri_template] = middleware
+            routed.extend(
+                (uri_template, middleware)
+                for uri_template in snapshot.removed.union(snapshot.routes)
+            )
+        for uri_template, middleware in routed:
+            table.setdefault(uri_template, middleware)
+        return table
+
+    def process_resource(self, req, resp, resource, params):
+        try:
+            middleware = self._middlewares[req.uri_template]
+        except KeyError:
+            return
+        middleware.process_resource(req, resp, resource, params)
+
+    def process_response(self, req, resp, resource, req_succeeded):
+        try:
+            middleware = self._middlewares[req.uri_template]
+        except KeyError:
+            return
+        middleware.process_response(req, resp, resource, req_succeeded)
+
+
+def _unmarshal_request(
+    schema_unmarshaler, request, operation, stopwatch=None, skip=frozenset()
+):
+    """Unmarshal the request as :func:`oas.unmarshal_request` does.
+
+    The durations of unmarshaling the parameters and the request body are
+    reported to the stopwatch separately.  The path parameters named in
+    ``skip`` are not unmarshaled.
+    """
+    if stopwatch is not None:
+        stopwatch.restart()
+    parameters, parameter_errors = _unmarshal_parameter_subset(
+        schema_unmarshaler, request, operation, skip=skip
+    )
+    _prefix_schema_path(parameter_errors, 'parameters')
+    if stopwatch is not None:
+        stopwatch.lap('parameters')
+
+    request_body = request_body_errors = None
+    if 'requestBody' in operation:
+        request_body, request_body_errors = unmarshal_request_body(
+            schema_unmarshaler, request, operation['requestBody']
+        )
+        _prefix_schema_path(request_body_errors, 'requestBody')
+        if stopwatch is not None:
+            stopwatch.lap('request_body')
+
+    if parameter_errors or request_body_errors:
+        raise UnmarshalError(parameter_errors, request_body_errors)
+
+    return parameters, request_body
+
+
+def _unmarshal_parameters(
+    schema_unmarshaler,
+    request,
+    operation,
+    location,
+    stopwatch=None,
+    skip=frozenset(),
+):
+    """Unmarshal the parameters in the location.
+
+    :raises oas.exceptions.UnmarshalError: as
+        :func:`oas.unmarshal_request` does.
+    """
+    if stopwatch is not None:
+        stopwatch.restart()
+
+    parameters, errors = _unmarshal_parameter_subset(
+        schema_unmarshaler, request, operation, location=location, skip=skip
+    )
+    _prefix_schema_path(errors, 'parameters')
+
+    if stopwatch is not None:
+        stopwatch.lap('parameters')
+
+    if errors:
+        raise UnmarshalError(parameter_errors=errors)
+    return parameters[location]
+
+
+def _unmarshal_parameter_subset(
+    schema_unmarshaler, request, operation, location=None, skip=frozenset()
+):
+    """Unmarshal the parameters in the location except the ones in ``skip``.
+
+    ``skip`` is the names of path parameters.  All the locations are
+    unmarshaled if ``location`` is ``None``.
+    """
+    if location is None and not skip:
+        return unmarshal_parameters(
+            schema_unmarshaler, request, operation['parameters']
+        )
+
+    indexes = [
+        index
+        for index, parameter_spec_dict in enumerate(operation['parameters'])
+        if location in (None, parameter_spec_dict['in'])
+        and not (
+            parameter_spec_dict['in'] == 'path'
+            and parameter_spec_dict['name'] in skip
+        )
+    ]
+    parameters, errors = unmarshal_parameters(
+        schema_unmarshaler,
+        request,
+        [operation['parameters'][index] for index in indexes],
+    )
+    for error in errors or ():
+        # Point to the parameter in the operation, not in the subset.
+        error.schema_path[0] = indexes[error.schema_path[0]]
+    return parameters, errors
+
+
+def _unmarshal_request_body(
+    schema_unmarshaler, request, operation, stopwatch=None
+):
+    if 'requestBody' not in operation:
+        return None
+
+    if stopwatch is not None:
+        stopwatch.restart()
+
+    request_body, errors = unmarshal_request_body(
+        schema_unmarshaler, request, operation['requestBody']
+    )
+    _prefix_schema_path(errors, 'requestBody')
+
+    if stopwatch is not None:
+        stopwatch.lap('request_body')
+
+    if errors:
+        raise UnmarshalError(request_body_errors=errors)
+    return request_body
+
+
+def _prefix_schema_path(errors, key):
+    for error in errors or ():
+        error.schema_path.appendleft(key)
 
 
 def _get_security_schemes(spec, base_module=''):
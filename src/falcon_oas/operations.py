@@ -0,0 +1,117 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+from oas.exceptions import UndocumentedMediaType
+from six import iteritems
+from six import itervalues
+
+from .utils import digest
+
+#: The fixed fields of Path Item Object which describe operations.
+METHODS = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch', 'trace')
+
+
+class OperationTable(dict):
+    """Resolve Operation Objects of the spec once.
+
+    The table maps ``(uri_template, method, media_type)`` to the
+    resolved Operation Object, which holds the merged ``parameters`` and
+    the effective ``security`` as :meth:`oas.spec.Spec.get_operation`
+    does, so that a request costs a single dict lookup.  The key of an
+    operation without request body has ``None`` as ``media_type``.
+
+    Other keys fall back to :meth:`__missing__`, which returns ``None``
+    for undocumented operations and raises
+    :class:`oas.exceptions.UndocumentedMediaType` for undocumented
+    media types.  The table is not modified after the construction.
+
+    The operations equal to the ones of the ``previous`` table are
+    replaced with them so that the state keyed by the operations, such
+    as compiled schemas, is reused.  The operations are compared by
+    :func:`~falcon_oas.utils.digest` since they may have recursive
+    schemas.
+    """
+
+    def __init__(self, spec, previous=None):
+        super(OperationTable, self).__init__()
+        self._routes = {}
+        operations = _iter_operations(spec)
+        for uri_template, method, operation, media_types in operations:
+            if previous is not None:
+                route = previous._routes.get((uri_template, method))
+                if route is not None and (
+                    route[1] == media_types
+                    and digest(route[0]) == digest(operation)
+                ):
+                    operation = route[0]
+            self._routes[uri_template, method] = operation, media_types
+            for media_type in media_types or (None,):
+                self[uri_template, method, media_type] = operation
+
+    def __missing__(self, key):
+        uri_template, method, media_type = key
+        try:
+            operation, media_types = self._routes[uri_template, method]
+        except KeyError:
+            return None
+
+        if media_types is not None:
+            raise UndocumentedMediaType()
+        # Do not store the key since ``media_type`` comes from requests.
+        return operation
+
+    def iter_routes(self):
+        """Iterate ``(uri_template, method)`` of the operations."""
+        return iter(self._routes)
+
+    def iter_route_operations(self):
+        """Iterate ``(uri_template, method, operation)``."""
+        for (uri_template, method), (operation, _) in iteritems(self._routes):
+            yield uri_template, method, operation
+
+    def iter_operations(self):
+        """Iterate the resolved Operation Objects."""
+        for operation, _ in itervalues(self._routes):
+            yield operation
+
+
+def _iter_operations(spec):
+    # ``security`` of Operation Object overrides any declared top-level
+    # ``security``.
+    base_security = spec.data.get('security')
+
+    for path, path_item in iteritems(spec.data.get('paths', {})):
+        uri_template = spec.base_path + path
+        for method in METHODS:
+            try:
+                operation = path_item[method]
+            except KeyError:
+                continue
+
+            try:
+                # ``content`` is required in Request Body Object.
+                media_types = frozenset(operation['requestBody']['content'])
+            except KeyError:
+                media_types = None
+
+            result = operation.copy()
+            result['parameters'] = list(_iter_parameters(operation, path_item))
+            result['security'] = operation.get('security', base_security)
+            yield uri_template, method, result, media_types
+
+
+def _iter_parameters(operation, path_item):
+    """Iterate parameters of Operation Object and Path Item Object.
+
+    Parameters of Operation Object override the ones of Path Item
+    Object with the same combination of ``in`` and ``name``.
+    """
+    seen = set()
+    for spec_dict in (operation, path_item):
+        for parameter_spec_dict in spec_dict.get('parameters', ()):
+            key = (parameter_spec_dict['in'], parameter_spec_dict['name'])
+            if key not in seen:
+                seen.add(key)
+                yield parameter_spec_dict
@@ -3,10 +3,13 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import math
 from collections import OrderedDict
 
 import falcon
 
+from .media import create_json_handler
+
 
 UNMARSHAL_PROBLEM_VERSION = '0.3.0'
 UNMARSHAL_PROBLEM_TYPE_URI = (
@@ -65,17 +68,69 @@ class Problem(falcon.HTTPError):
         return obj
 
 
-def serialize_problem(req, resp, problem):
-    """Serialize the given instance of Problem."""
-    preferred = req.client_prefers(
-        ('application/json', 'application/problem+json')
-    )
+class StaticProblem(Problem):
+    """Problem which has only the status and the title of the status.
+
+    Its body is encoded only once by the serializers.
+    """
+
+    def __init__(self, status):
+        super(StaticProblem, self).__init__(status, title=status)
+
+
+#: Encode the object to JSON in bytes with the fastest available library.
+dumps = create_json_handler().dumps
+
+_PROBLEM_MEDIA_TYPES = ('application/json', 'application/problem+json')
+_MAX_PREFERRED_MEDIA_TYPES = 256
+# The preferred media types of problems keyed by Accept header.
+_preferred_media_types = {}
+
+
+def create_problem_serializer(dumps=dumps):
+    """Return the error serializer of Problem.
+
+    :param dumps: The function which encodes the dict to JSON in bytes.
+    """
+    # The encoded bodies of the static problems keyed by status.
+    static_bodies = {}
+
+    def serialize_problem(req, resp, problem):
+        """Serialize the given instance of Problem."""
+        if type(problem) is StaticProblem:
+            try:
+                data = static_bodies[problem.status]
+            except KeyError:
+                data = static_bodies[problem.status] = dumps(
+                    problem.to_dict(OrderedDict)
+                )
+        else:
+            data = dumps(problem.to_dict(OrderedDict))
+
+        resp.data = data
+        resp.content_type = _prefer_media_type(req)
+        resp.append_header('Vary', 'Accept')
+
+    return serialize_problem
+
+
+serialize_problem = create_problem_serializer()
+
+
+def _prefer_media_type(req):
+    accept = req.accept
+    try:
+        return _preferred_media_types[accept]
+    except KeyError:
+        pass
+
+    preferred = req.client_prefers(_PROBLEM_MEDIA_TYPES)
     if preferred is None:
         preferred = 'application/json'
-
-    resp.data = problem.to_json().encode('utf-8')
-    resp.content_type = preferred
-    resp.append_header('Vary', 'Accept')
+    # Bound the number of the Accept headers which clients can choose.
+    if len(_preferred_media_types) < _MAX_PREFERRED_MEDIA_TYPES:
+        _preferred_media_types[accept] = preferred
+    return preferred
 
 
 def http_error_handler(error, req, resp, params):
@@ -83,11 +138,21 @@ def http_error_handler(error, req, resp, params):
 
 
 def undocumented_media_type_handler(error, req, resp, params):
-    raise Problem.from_http_error(falcon.HTTPBadRequest())
+    raise StaticProblem(falcon.HTTP_BAD_REQUEST)
 
 
 def security_error_handler(error, req, resp, params):
-    raise Problem.from_http_error(falcon.HTTPForbidden())
+    raise StaticProblem(falcon.HTTP_FORBIDDEN)
+
+
+def rate_limit_error_handler(error, req, resp, params):
+    # Retry-After is in integer seconds.
+    retry_after = max(1, int(math.ceil(error.retry_after)))
+    raise Problem(
+        falcon.HTTP_429,
+        title=falcon.HTTP_429,
+        headers={'Retry-After': str(retry_after)},
+    )
 
 
 def unmarshal_error_handler(error, req, resp, params):
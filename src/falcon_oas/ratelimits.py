@@ -0,0 +1,191 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+
+from six import integer_types
+from six import iteritems
+from six import string_types
+
+from . import extensions
+from .caches import monotonic
+from .exceptions import RateLimitError
+from .utils import digest
+from .utils import ReferenceCounter
+
+
+class MemoryBackend(object):
+    """Token buckets in process.
+
+    The buckets are striped by key over ``stripes`` locks so that the
+    threads rarely wait for each other.  A bucket is a tuple of the
+    tokens, the last update and the time when it becomes full again.
+    Full buckets are equivalent to missing ones, so they are removed
+    when a stripe holds more than ``maxsize`` buckets.
+
+    Other backends, e.g. the one shared by processes, implement
+    :meth:`consume` in the same way.
+    """
+
+    def __init__(self, stripes=64, maxsize=4096, timer=monotonic):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+        self._stripes = [{} for _ in range(stripes)]
+        self._maxsize = maxsize
+        self._timer = timer
+
+    def consume(self, key, rate, capacity):
+        """Take a token from the bucket of the key.
+
+        Return ``0`` if the token is taken.  Otherwise return the seconds
+        until the bucket has a token.
+
+        :param rate: The tokens added to the bucket per second.
+        :param capacity: The maximum tokens of the bucket.
+        """
+        index = hash(key) % len(self._locks)
+        buckets = self._stripes[index]
+        with self._locks[index]:
+            now = self._timer()
+            try:
+                tokens, updated, _ = buckets[key]
+            except KeyError:
+                tokens = capacity
+            else:
+                tokens = min(capacity, tokens + (now - updated) * rate)
+
+            if tokens < 1:
+                buckets[key] = tokens, now, now + (capacity - tokens) / rate
+                return (1 - tokens) / rate
+
+            tokens -= 1
+            buckets[key] = tokens, now, now + (capacity - tokens) / rate
+            if len(buckets) > self._maxsize:
+                _remove_full_buckets(buckets, now)
+            return 0
+
+    def __len__(self):
+        return sum(len(buckets) for buckets in self._stripes)
+
+
+def _remove_full_buckets(buckets, now):
+    for key in [key for key, bucket in iteritems(buckets) if bucket[2] <= now]:
+        del buckets[key]
+
+
+def default_key(req, user):
+    """Identify the client by the user or the address.
+
+    The user is identified by itself if it is a string or an integer, or
+    by its ``id`` attribute, or its ``'id'`` item if it is a dict.  Other
+    users, e.g. the instances created per request, and the anonymous
+    clients are identified by the address.
+    """
+    if isinstance(user, string_types + integer_types) and not isinstance(
+        user, bool
+    ):
+        return user
+    if isinstance(user, dict):
+        identity = user.get('id')
+    else:
+        identity = getattr(user, 'id', None)
+    if identity is None:
+        return req.remote_addr
+    return identity
+
+
+class RateLimiter(object):
+    """Limit the rate of the requests by :data:`~extensions.RATE_LIMIT`.
+
+    :param backend: The object with ``consume(key, rate, capacity)`` as
+        :meth:`MemoryBackend.consume`.
+    :param key: The function which returns the key of the client from
+        the request and the user.  The keys which are not hashable, e.g.
+        dicts, are replaced with their :func:`~falcon_oas.utils.digest`.
+    """
+
+    def __init__(self, backend=None, key=default_key):
+        if backend is None:
+            backend = MemoryBackend()
+        self._backend = backend
+        self._key = key
+        self._plans = {}
+        self._operations = ReferenceCounter()
+
+    def compile(self, uri_template, method, operation, security_schemes):
+        """Compile and keep the limits of the resolved Operation Object.
+
+        The limits are compiled again since the security schemes of the
+        operation may change.
+        """
+        self._operations.acquire(operation)
+        limits = []
+        if extensions.RATE_LIMIT in operation:
+            limits.append(
+                _create_limit(
+                    (uri_template, method), operation[extensions.RATE_LIMIT]
+                )
+            )
+
+        names = set()
+        for requirement in operation['security'] or ():
+            for name in requirement:
+                security_scheme = (security_schemes or {}).get(name, {})
+                if (
+                    name not in names
+                    and extensions.RATE_LIMIT in security_scheme
+                ):
+                    names.add(name)
+                    limits.append(
+                        _create_limit(
+                            (name,), security_scheme[extensions.RATE_LIMIT]
+                        )
+                    )
+
+        if limits:
+            # Keep ``operation`` alive to make its id unique.
+            self._plans[id(operation)] = operation, tuple(limits)
+        else:
+            self._plans.pop(id(operation), None)
+
+    def release(self, operation):
+        """Remove the limits when no compiled operation refers to them."""
+        if self._operations.release(operation):
+            self._plans.pop(id(operation), None)
+
+    def check(self, req, operation, user):
+        """Take a token from the buckets of the client.
+
+        :raises falcon_oas.exceptions.RateLimitError: if any of the
+            buckets is empty.
+        """
+        try:
+            _, limits = self._plans[id(operation)]
+        except KeyError:
+            return
+
+        key = self._key(req, user)
+        try:
+            hash(key)
+        except TypeError:
+            key = digest(key)
+        for namespace, rate, capacity in limits:
+            retry_after = self._backend.consume(
+                namespace + (key,), rate, capacity
+            )
+            if retry_after:
+                raise RateLimitError(retry_after)
+
+
+def _create_limit(namespace, options):
+    limit = options['limit']
+    period = options.get('period', 1)
+    if limit <= 0 or period <= 0:
+        raise ValueError(
+            'The limit and the period must be positive: {}'.format(
+                ' '.join(namespace)
+            )
+        )
+    rate = limit / period
+    return namespace, rate, options.get('burst', limit)
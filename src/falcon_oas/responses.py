@@ -0,0 +1,173 @@
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import random
+
+import falcon
+import jsonschema
+from oas.exceptions import ValidationError
+from oas.schema.formats import default_formats
+from oas.schema.validators import SchemaValidator
+from six import iteritems
+
+from .exceptions import ResponseError
+
+
+class ResponseValidator(object):
+    """Validate responses against Response Objects of the operations.
+
+    :param callback: The function called with
+        :class:`~falcon_oas.exceptions.ResponseError` for each response
+        which violates the spec.  The response itself is not modified.
+    :param sample_rate: The ratio of the responses to validate.
+    :param executor: The object with ``submit(fn, *args)`` such as
+        :class:`concurrent.futures.ThreadPoolExecutor` which validates
+        responses off the request thread.  Responses are validated in
+        the request thread if it is not given.
+    """
+
+    def __init__(
+        self,
+        callback,
+        sample_rate=1.0,
+        executor=None,
+        formats=None,
+        rand=random.random,
+    ):
+        if formats is None:
+            formats = default_formats
+
+        self._callback = callback
+        self._sample_rate = sample_rate
+        self._executor = executor
+        self._rand = rand
+        # ``$ref``s are already resolved by ``oas.create_spec_from_dict``.
+        self._validator = SchemaValidator(
+            {}, format_checker=formats.format_checker
+        )
+
+    def process(self, req, resp, operation, media=None):
+        """Validate the response.
+
+        :param media: The instance sent instead of ``resp.media``, e.g.
+            converted by :class:`~falcon_oas.serializers.ResponseSerializer`.
+        """
+        if self._rand() >= self._sample_rate:
+            return
+        if media is None:
+            media = resp.media
+
+        # Report the URI template of the spec rather than the one routed
+        # with the converters.
+        uri_template = req.context['oas'].uri_template
+        status = int(resp.status[:3])
+        try:
+            response_spec_dict = _get_response(operation, status)
+        except KeyError:
+            errors = [
+                jsonschema.ValidationError(
+                    'Status code {} is undocumented'.format(status),
+                    validator='responses',
+                )
+            ]
+            self._report(uri_template, req.method, status, errors)
+            return
+
+        # Collect the headers in the request thread since the response
+        # may be reused after it has been sent.
+        missing_headers = [
+            name
+            for name, header_spec_dict in iteritems(
+                response_spec_dict.get('headers', {})
+            )
+            if header_spec_dict.get('required', False)
+            and resp.get_header(name) is None
+        ]
+        # Falcon sets the default media type after the middleware.
+        content_type = resp.content_type or falcon.DEFAULT_MEDIA_TYPE
+        media_type = content_type.split(';', 1)[0]
+
+        args = (
+            uri_template,
+            req.method,
+            status,
+            response_spec_dict,
+            missing_headers,
+            media_type,
+            media,
+        )
+        if self._executor is None:
+            self._validate(*args)
+        else:
+            self._executor.submit(self._validate, *args)
+
+    def _validate(
+        self,
+        uri_template,
+        method,
+        status,
+        response_spec_dict,
+        missing_headers,
+        media_type,
+        media,
+    ):
+        errors = [
+            jsonschema.ValidationError(
+                '{!r} is a required header'.format(name),
+                validator='required',
+                path=('headers', name),
+            )
+            for name in missing_headers
+        ]
+
+        if media is not None:
+            errors.extend(
+                self._validate_media(
+                    response_spec_dict.get('content', {}), media_type, media
+                )
+            )
+
+        if errors:
+            self._report(uri_template, method, status, errors)
+
+    def _validate_media(self, content_spec_dict, media_type, media):
+        try:
+            media_type_spec_dict = content_spec_dict[media_type]
+        except KeyError:
+            return [
+                jsonschema.ValidationError(
+                    'Media type {!r} is undocumented'.format(media_type),
+                    validator='content',
+                )
+            ]
+
+        try:
+            schema = media_type_spec_dict['schema']
+        except KeyError:
+            return []
+
+        try:
+            self._validator.validate(media, schema)
+        except ValidationError as e:
+            return e.errors
+        return []
+
+    def _report(self, uri_template, method, status, errors):
+        self._callback(
+            ResponseError(uri_template, method.lower(), status, errors)
+        )
+
+
+def _get_response(operation, status):
+    """Return Response Object of the status code.
+
+    :raises KeyError: if the status code is undocumented.
+    """
+    # ``responses`` is required in Operation Object.
+    responses = operation['responses']
+    for key in (str(status), '{}XX'.format(status // 100), 'default'):
+        if key in responses:
+            return responses[key]
+    raise KeyError(status)
@@ -3,13 +3,32 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import copy
+
+from falcon.routing import CompiledRouter
 from six import iteritems
 
 from . import extensions
+from .converters import convert_uri_templates
 from .utils import import_string
 
+try:
+    # Falcon 1 wraps the routers without ``req`` argument of ``find``.
+    from falcon.api_helpers import make_router_search
+except ImportError:  # pragma: no cover
+
+    def make_router_search(router):
+        return router.find
+
 
-def generate_routes(spec, base_module=''):
+def generate_routes(spec, base_module='', converters=False):
+    """Generate ``(uri_template, resource_class)`` of the paths.
+
+    If ``converters`` is true, the URI templates have the field
+    converters of the path parameters generated by
+    :func:`falcon_oas.converters.convert_uri_templates`.
+    """
+    uri_templates = converters and convert_uri_templates(spec)
     for path, path_item in iteritems(spec['paths']):
         try:
             resource_name = path_item[extensions.IMPLEMENTATION]
@@ -19,4 +38,46 @@ def generate_routes(spec, base_module=''):
             resource_class = import_string(
                 resource_name, base_module=base_module
             )
-            yield spec.base_path + path, resource_class
+            uri_template = spec.base_path + path
+            if uri_templates and uri_template in uri_templates:
+                uri_template = uri_templates[uri_template][0]
+            yield uri_template, resource_class
+
+
+def add_routes(api, routes):
+    """Add ``(uri_template, resource)`` to the API serving requests.
+
+    Adding a route to :class:`falcon.routing.CompiledRouter` rebuilds its
+    tables in place, where the concurrent requests would be routed by the
+    half-built tables.  The routes are added to a copy of the router
+    instead, and then the copy replaces the router at once.  Other
+    routers are modified in place.
+    """
+    router = api._router
+    if type(router) is not CompiledRouter:
+        for uri_template, resource in routes:
+            api.add_route(uri_template, resource)
+        return
+
+    new_router = copy.copy(router)
+    new_router._roots = _copy_nodes(router._roots)
+    # ``API.add_route`` adds the route to ``api._router`` while the
+    # requests are routed by ``api._router_search``.
+    api._router = new_router
+    try:
+        for uri_template, resource in routes:
+            api.add_route(uri_template, resource)
+    except Exception:
+        api._router = router
+        raise
+    api._router_search = make_router_search(new_router)
+
+
+def _copy_nodes(nodes):
+    """Copy the tree of the nodes sharing the resources."""
+    result = []
+    for node in nodes:
+        node = copy.copy(node)
+        node.children = _copy_nodes(node.children)
+        result.append(node)
+    return result
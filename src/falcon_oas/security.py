@@ -3,54 +3,290 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import base64
+
 from six import iteritems
 
+from . import extensions
+from .caches import TTLCache
 from .exceptions import SecurityError
 
+#: The WSGI environ key of the dict which shares the results of the
+#: access control functions between requests, e.g. the sub-requests of
+#: a batch request.
+MEMO_ENVIRON_KEY = 'falcon_oas.security_memo'
+
 
 class AccessControl(object):
-    def __init__(self, security_schemes):
-        self._security_schemes = security_schemes
-
-    def handle(self, request, operation):
-        if self._security_schemes and operation['security']:
-            # ``requirement`` is a alternative security requirement
-            # object. Only one of the security requirement objects
-            # need to be satisfied to authorize a request.
-            for requirement in operation['security']:
-                user = self._satisfy_requirement(request, requirement)
-                if user:
-                    if user is not True:
-                        return user
-                    return
-            raise SecurityError()
-
-    def _satisfy_requirement(self, request, requirement):
+    """Check the security requirements of the operations.
+
+    :param previous: The access control which this one replaces, e.g.
+        before the spec is reloaded.  Its caches are reused for the
+        security schemes with the same implementation and cache options
+        so that reloading does not flush them.
+    """
+
+    def __init__(self, security_schemes, previous=None):
+        # Extract credentials without looking up Security Scheme Objects
+        # in each request.
+        self._security_schemes = security_schemes and {
+            name: (create_extractor(security_scheme), satisfy)
+            for name, (security_scheme, satisfy) in iteritems(security_schemes)
+        }
+        self._plans = {}
+        #: The number of calls of the access control functions.
+        self.calls = 0
+        #: The number of calls avoided by the plans.  The counters are
+        #: approximate under concurrent requests.
+        self.avoided_calls = 0
+        # The caches keyed by the names of the security schemes, and the
+        # implementations and options which the cached results depend on.
+        self._caches = {}
+        self._cache_keys = {}
+        for name, (security_scheme, satisfy) in iteritems(
+            security_schemes or {}
+        ):
+            if extensions.CACHE not in security_scheme:
+                continue
+            options = security_scheme[extensions.CACHE]
+            key = satisfy, options
+            if previous is not None and previous._cache_keys.get(name) == key:
+                self._caches[name] = previous._caches[name]
+            else:
+                self._caches[name] = _create_cache(options)
+            self._cache_keys[name] = key
+
+    def compile(self, security):
+        """Compile and keep the plan of the security requirements.
+
+        ``security`` is the list of Security Requirement Objects which
+        is shared by the requests, e.g. of the resolved Operation Object.
+        """
+        if self._security_schemes and id(security) not in self._plans:
+            # Keep ``security`` alive to make its id unique.
+            self._plans[id(security)] = security, self._compile(security)
+
+    def _compile(self, security):
+        checks = []
+        indexes = {}
+        alternatives = []
+        for requirement in security:
+            alternative = []
+            for name, scopes in iteritems(requirement):
+                # Each name MUST correspond to a security scheme which is
+                # declared in the Security Schemes under the Components
+                # Object, but it is missing when
+                # ``extensions.IMPLEMENTATION`` is not specified.
+                extract, satisfy = self._security_schemes.get(
+                    name, (None, None)
+                )
+                if extract is None:
+                    # The scheme without implementation or of unsupported
+                    # type is always satisfied.
+                    continue
+
+                # Deduplicate the schemes shared by the alternatives.
+                key = (name, tuple(scopes))
+                if key not in indexes:
+                    indexes[key] = len(checks)
+                    checks.append((name, extract, satisfy, scopes))
+                alternative.append(indexes[key])
+            alternatives.append(tuple(alternative))
+        return tuple(checks), tuple(alternatives)
+
+    def handle(self, request, operation, memo=None):
+        """Return the user if the request satisfies the requirements.
+
+        ``memo`` is the dict which shares the results keyed by the
+        credentials between requests.
+
+        :raises falcon_oas.exceptions.SecurityError: if the request
+            satisfies none of the requirements.
+        """
+        security = operation['security']
+        if not self._security_schemes or not security:
+            return None
+
+        try:
+            _, plan = self._plans[id(security)]
+        except KeyError:
+            plan = self._compile(security)
+
+        # The results of the schemes in the request.
+        results = {}
+        # ``alternative`` is a alternative security requirement object.
+        # Only one of the security requirement objects need to be
+        # satisfied to authorize a request.
+        for alternative in plan[1]:
+            user = self._satisfy_requirement(
+                request, plan[0], alternative, results, memo
+            )
+            if user:
+                if user is not True:
+                    return user
+                return None
+        raise SecurityError()
+
+    def _satisfy_requirement(
+        self, request, checks, alternative, results, memo
+    ):
         # All schemes MUST be satisfied for a request to be authorized.
-        result = True
-        for name, scopes in iteritems(requirement):
-            user = self._satisfy_scheme(request, name, scopes)
-            if not user:
+        # Extract all the credentials before calling any access control
+        # function so that the requirement without any of them does not
+        # call the functions.
+        values = []
+        for index in alternative:
+            if index in results:
+                self.avoided_calls += 1
+                if not results[index]:
+                    return False
+                continue
+
+            name, extract, satisfy, scopes = checks[index]
+            value = extract(request)
+            if value is None:
+                self.avoided_calls += 1
+                results[index] = False
                 return False
-            if user is not True:
-                result = user
+            values.append((index, value))
+
+        for index, value in values:
+            name, extract, satisfy, scopes = checks[index]
+            if memo is None or not _is_hashable(value):
+                results[index] = self._call(
+                    name, satisfy, value, scopes, request
+                )
+            else:
+                key = (name, value, tuple(scopes))
+                if key in memo:
+                    self.avoided_calls += 1
+                else:
+                    memo[key] = self._call(
+                        name, satisfy, value, scopes, request
+                    )
+                results[index] = memo[key]
+            if not results[index]:
+                return False
+
+        result = True
+        for index in alternative:
+            if results[index] is not True:
+                result = results[index]
         return result
 
-    def _satisfy_scheme(self, request, name, scopes):
-        # Each name MUST correspond to a security scheme which is
-        # declared in the Security Schemes under the Components Object,
+    def call_info(self):
+        """Return the numbers of called and avoided access control calls."""
+        return {'calls': self.calls, 'avoided_calls': self.avoided_calls}
+
+    def _call(self, name, satisfy, value, scopes, request):
         try:
-            security_scheme, satisfy = self._security_schemes[name]
+            cache = self._caches[name]
         except KeyError:
-            # When ``extensions.IMPLEMENTATION`` is not specified,
-            # KeyError is raised.
-            return True
-
-        if security_scheme['type'] == 'apiKey':
-            location = security_scheme['in']
-            name = security_scheme['name']
-            value = getattr(request, location).get(name)
+            cache = None
+        # Repeated query parameters are lists, which are not cached.
+        if cache is None or not _is_hashable(value):
+            self.calls += 1
             return satisfy(value, scopes, request)
 
-        # Unsupported security scheme type
-        return True
+        key = (value, tuple(scopes))
+        found, result = cache.get(key)
+        if not found:
+            self.calls += 1
+            result = satisfy(value, scopes, request)
+            cache.set(key, result)
+        return result
+
+    def invalidate(self, name, value=None):
+        """Invalidate the cached results of the security scheme.
+
+        Invalidate only the results of the credential if ``value`` is
+        given.
+        """
+        cache = self._caches[name]
+        if value is None:
+            cache.invalidate()
+        else:
+            cache.invalidate(lambda key: key[0] == value)
+
+    def cache_info(self):
+        """Return hits, misses and size of the cache of each scheme."""
+        return {name: cache.info() for name, cache in iteritems(self._caches)}
+
+
+def _is_hashable(value):
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def create_extractor(security_scheme):
+    """Return a function which extracts the credential from the request.
+
+    Return ``None`` if the type of the security scheme is not supported.
+    """
+    scheme_type = security_scheme['type']
+    if scheme_type == 'apiKey':
+        return _api_key_extractor(
+            security_scheme['in'], security_scheme['name']
+        )
+    if scheme_type == 'http':
+        scheme = security_scheme['scheme'].lower()
+        if scheme == 'basic':
+            return _basic_extractor
+        return _authorization_extractor(scheme)
+    if scheme_type in ('oauth2', 'openIdConnect'):
+        return _authorization_extractor('bearer')
+    return None
+
+
+def _api_key_extractor(location, name):
+    def extract(request):
+        return getattr(request, location).get(name)
+
+    return extract
+
+
+def _authorization_extractor(scheme):
+    """Return the credentials of ``Authorization`` header of the scheme."""
+
+    def extract(request):
+        authorization = request.header.get('Authorization')
+        if authorization is None:
+            return None
+
+        parts = authorization.split(None, 1)
+        if len(parts) == 2 and parts[0].lower() == scheme:
+            return parts[1].strip()
+        return None
+
+    return extract
+
+
+_basic_credentials = _authorization_extractor('basic')
+
+
+def _basic_extractor(request):
+    """Return the pair of user-id and password of Basic scheme."""
+    credentials = _basic_credentials(request)
+    if credentials is None:
+        return None
+
+    try:
+        decoded = base64.b64decode(credentials.encode('ascii')).decode('utf-8')
+    except (ValueError, TypeError):
+        return None
+
+    user_id, colon, password = decoded.partition(':')
+    if not colon:
+        return None
+    return user_id, password
+
+
+def _create_cache(options):
+    return TTLCache(
+        options.get('maxSize', 1024),
+        options.get('ttl', 60),
+        negative_ttl=options.get('negativeTtl', 0),
+    )
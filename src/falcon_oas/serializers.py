@@ -0,0 +1,297 @@
+"""Serialize responses with the schemas of Response Objects.
+
+The schemas are compiled into Python functions which copy only the
+declared properties of the objects, skip ``writeOnly`` properties and
+convert ``datetime.datetime``, ``datetime.date`` and ``uuid.UUID`` to
+strings, so that the JSON encoder encodes nothing but plain values.
+Naive datetimes raise :class:`ValueError` since RFC 3339 ``date-time``
+requires the offset.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import datetime
+import uuid
+
+import falcon
+from six import iteritems
+from six import itervalues
+
+from .codegen import Compiler
+from .media import create_json_handler
+from .utils import ReferenceCounter
+
+# Falcon 1 serializes ``resp.media`` on assignment, before the
+# serializer converts it.
+SUPPORTED = int(falcon.__version__.split('.', 1)[0]) >= 2
+
+# Formats of strings converted from Python objects.
+_FORMATS = frozenset(('date-time', 'date', 'uuid'))
+
+
+def _convert(value):
+    """Convert the value without the schema."""
+    if isinstance(value, dict):
+        return {k: _convert(v) for k, v in iteritems(value)}
+    if isinstance(value, (list, tuple)):
+        return [_convert(v) for v in value]
+    if isinstance(value, datetime.date):
+        return _isoformat(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def _isoformat(value):
+    """Return the RFC 3339 string of the date or the datetime.
+
+    :raises ValueError: if the datetime is naive since ``date-time``
+        requires the offset and the timezone of naive datetimes is
+        unknown.
+    """
+    if isinstance(value, datetime.datetime) and value.utcoffset() is None:
+        raise ValueError(
+            'Naive datetime cannot be serialized: {!r}'.format(value)
+        )
+    return value.isoformat()
+
+
+_NAMESPACE = {
+    '_convert': _convert,
+    '_date': datetime.date,
+    '_isoformat': _isoformat,
+    '_UUID': uuid.UUID,
+}
+
+
+def compile_serializer(schema):
+    """Return a function which converts the instance for JSON encoders."""
+    return _Compiler().build(schema, _NAMESPACE, '<falcon-oas serializer>')
+
+
+def _merge_all_of(schema):
+    """Return the properties and ``additionalProperties`` of the schema.
+
+    The properties of the sub-schemas of ``allOf`` are merged.
+    """
+    properties = {}
+    additional_properties = None
+    for sub_schema in [schema] + list(schema.get('allOf', ())):
+        if sub_schema is not schema and 'allOf' in sub_schema:
+            sub_properties, sub_additional_properties = _merge_all_of(
+                sub_schema
+            )
+        else:
+            sub_properties = sub_schema.get('properties', {})
+            sub_additional_properties = sub_schema.get('additionalProperties')
+        for name, property_schema in iteritems(sub_properties):
+            properties.setdefault(name, property_schema)
+        if sub_additional_properties not in (None, False):
+            additional_properties = sub_additional_properties
+    return properties, additional_properties
+
+
+class _Compiler(Compiler):
+    def expression(self, schema, var):
+        """Return the expression which converts the variable."""
+        if _is_plain(schema):
+            return var
+
+        schema_format = schema.get('format')
+        if (
+            schema.get('type') == 'string'
+            and schema_format in _FORMATS
+            and not _is_composite(schema)
+        ):
+            if schema_format == 'uuid':
+                return '(str({0}) if isinstance({0}, _UUID) else {0})'.format(
+                    var
+                )
+            return (
+                '(_isoformat({0}) if isinstance({0}, _date) else {0})'.format(
+                    var
+                )
+            )
+
+        if (
+            schema.get('type') == 'array'
+            and _is_plain(schema.get('items', {}))
+            and not any(
+                keyword in schema
+                for keyword in ('allOf', 'oneOf', 'anyOf', 'properties')
+            )
+        ):
+            # The arrays of plain items are encoded as they are without
+            # calling a function.
+            return (
+                '({0} if isinstance({0}, (list, tuple)) else _convert({0}))'
+            ).format(var)
+
+        return '{}({})'.format(self.compile_function(schema), var)
+
+    def compile_body(self, schema, lines):
+        if schema.get('type') == 'array' and 'items' in schema:
+            with lines.block('if not isinstance(v, (list, tuple)):'):
+                lines.append('return _convert(v)')
+            lines.append(
+                'return [{} for x in v]'.format(
+                    self.expression(schema['items'], 'x')
+                )
+            )
+            return
+
+        properties, additional_properties = _merge_all_of(schema)
+        if not properties or 'oneOf' in schema or 'anyOf' in schema:
+            lines.append('return _convert(v)')
+            return
+
+        with lines.block('if not isinstance(v, dict):'):
+            lines.append('return _convert(v)')
+        lines.append('r = {}')
+        for name, property_schema in iteritems(properties):
+            if property_schema.get('writeOnly', False):
+                continue
+            name = self.constant(name)
+            with lines.block('if {} in v:'.format(name)):
+                if _is_plain(property_schema):
+                    lines.append('r[{0}] = v[{0}]'.format(name))
+                else:
+                    # Look up the value once for the expression.
+                    lines.append('x = v[{}]'.format(name))
+                    lines.append(
+                        'r[{}] = {}'.format(
+                            name, self.expression(property_schema, 'x')
+                        )
+                    )
+
+        if additional_properties is not None:
+            if additional_properties is True:
+                additional_properties = {}
+            with lines.block('for k in v:'):
+                with lines.block(
+                    'if k not in {}:'.format(
+                        self.constant(frozenset(properties))
+                    )
+                ):
+                    lines.append(
+                        'r[k] = {}'.format(
+                            self.expression(additional_properties, 'v[k]')
+                        )
+                    )
+        lines.append('return r')
+
+
+def _is_composite(schema):
+    return any(
+        keyword in schema
+        for keyword in ('allOf', 'oneOf', 'anyOf', 'properties', 'items')
+    )
+
+
+def _is_plain(schema):
+    """Return whether the instances are encoded as they are."""
+    return (
+        schema.get('type') in ('boolean', 'integer', 'number', 'string')
+        and schema.get('format') not in _FORMATS
+        and not _is_composite(schema)
+    )
+
+
+class ResponseSerializer(object):
+    """Serialize ``resp.media`` with the schema into ``resp.data``.
+
+    Only the responses of the JSON media types documented in the
+    Response Objects are serialized.
+
+    :param dumps: The function which encodes the object to JSON in bytes.
+        It defaults to the fastest available library.
+    :raises RuntimeError: with Falcon 1, which serializes ``resp.media``
+        on assignment.
+    """
+
+    def __init__(self, dumps=None):
+        if not SUPPORTED:
+            raise RuntimeError('The response serializer requires Falcon 2')
+        if dumps is None:
+            dumps = create_json_handler().dumps
+        self._dumps = dumps
+        self._serializers = {}
+        self._plans = {}
+        self._operations = ReferenceCounter()
+        self._schemas = ReferenceCounter()
+
+    def compile_operation(self, operation):
+        """Compile the schemas of the responses of the operation."""
+        if not self._operations.acquire(operation):
+            return
+
+        plan = {status: {} for status in operation['responses']}
+        for status, media_type, schema in _iter_response_schemas(operation):
+            plan[status][media_type] = self._compile(schema)
+        if any(itervalues(plan)):
+            # Keep ``operation`` alive to make its id unique.
+            self._plans[id(operation)] = operation, plan
+
+    def release_operation(self, operation):
+        """Release the compiled schemas of the operation.
+
+        The schemas are removed when no compiled operation refers to them
+        any longer, e.g. after the spec is reloaded.
+        """
+        if not self._operations.release(operation):
+            return
+
+        self._plans.pop(id(operation), None)
+        for _, _, schema in _iter_response_schemas(operation):
+            if self._schemas.release(schema):
+                del self._serializers[id(schema)]
+
+    def _compile(self, schema):
+        if id(schema) not in self._serializers:
+            self._serializers[id(schema)] = compile_serializer(schema)
+        self._schemas.acquire(schema)
+        return self._serializers[id(schema)]
+
+    def process(self, req, resp, operation):
+        """Serialize ``resp.media`` and return the converted instance.
+
+        Return ``None`` if the response is not serialized.
+        """
+        media = resp.media
+        if media is None:
+            return None
+
+        try:
+            _, plan = self._plans[id(operation)]
+        except KeyError:
+            return None
+
+        status = int(resp.status[:3])
+        for key in (str(status), '{}XX'.format(status // 100), 'default'):
+            if key in plan:
+                serializers = plan[key]
+                break
+        else:
+            return None
+
+        content_type = resp.content_type or falcon.DEFAULT_MEDIA_TYPE
+        try:
+            serializer = serializers[content_type.split(';', 1)[0]]
+        except KeyError:
+            return None
+
+        media = serializer(media)
+        resp.data = self._dumps(media)
+        resp.content_type = content_type
+        return media
+
+
+def _iter_response_schemas(operation):
+    """Iterate ``(status, media_type, schema)`` of the JSON responses."""
+    for status, response_spec_dict in iteritems(operation['responses']):
+        content = response_spec_dict.get('content', {})
+        for media_type, media_type_spec_dict in iteritems(content):
+            if 'json' in media_type and 'schema' in media_type_spec_dict:
+                yield status, media_type, media_type_spec_dict['schema']
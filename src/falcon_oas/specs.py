@@ -0,0 +1,137 @@
+"""Precompiled spec caches.
+
+A spec cache is the resolved spec pickled with a header which records
+the versions and the SHA-256 of the source document.  Loading it skips
+parsing the document and resolving its ``$ref``\\ s.
+
+The cache is pickled, so load only caches which you created yourself.
+The checksum detects corrupted caches, not malicious ones.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import hashlib
+import json
+import os
+import pickle
+import sys
+import tempfile
+
+from oas import create_spec_from_dict
+from oas.__version__ import __version__ as oas_version
+from oas.spec import Spec
+
+from .__version__ import __version__
+from .exceptions import SpecCacheError
+
+MAGIC = b'falcon-oas spec cache\n'
+
+#: Incremented when the layout of the cache changes.
+FORMAT_VERSION = 1
+
+# Python 2 does not have os.replace.
+_replace = getattr(os, 'replace', os.rename)
+
+
+def load_spec_dict(path):
+    """Load the OpenAPI document in JSON or YAML.
+
+    Documents other than ``.json`` are loaded as YAML, which requires
+    PyYAML.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    return _parse(path, data)
+
+
+def compile_spec(source, output):
+    """Write the spec cache of the document at ``source`` to ``output``.
+
+    Return the resolved spec.
+    """
+    with open(source, 'rb') as f:
+        data = f.read()
+    spec = create_spec_from_dict(_parse(source, data))
+    dump_spec(spec, output, source_digest=_digest(data))
+    return spec
+
+
+def dump_spec(spec, path, source_digest=None):
+    payload = pickle.dumps(spec.data, pickle.HIGHEST_PROTOCOL)
+    header = dict(
+        _versions(),
+        source_sha256=source_digest,
+        payload_sha256=_digest(payload),
+    )
+    header = json.dumps(header, sort_keys=True).encode('utf-8') + b'\n'
+
+    # Write to a temporary file and rename it not to expose a partially
+    # written cache to other processes.
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(MAGIC + header + payload)
+        _replace(temp_path, path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+
+
+def load_spec(path, source=None):
+    """Load the spec cache.
+
+    :param source: The path to the source document.  The cache is stale
+        if the document has changed since the cache was compiled.
+    :raises falcon_oas.exceptions.SpecCacheError: if the cache is
+        corrupted, stale or compiled by other versions.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if not data.startswith(MAGIC):
+        raise SpecCacheError('Not a spec cache: {}'.format(path))
+    try:
+        header, payload = data[len(MAGIC) :].split(b'\n', 1)
+        header = json.loads(header.decode('utf-8'))
+    except ValueError:
+        raise SpecCacheError('Invalid header: {}'.format(path))
+
+    versions = {key: header.get(key) for key in _versions()}
+    if versions != _versions():
+        raise SpecCacheError('Incompatible versions: {}'.format(path))
+    if header.get('payload_sha256') != _digest(payload):
+        raise SpecCacheError('Checksum mismatch: {}'.format(path))
+    if source is not None:
+        with open(source, 'rb') as f:
+            source_digest = _digest(f.read())
+        if header.get('source_sha256') != source_digest:
+            raise SpecCacheError('Stale spec cache: {}'.format(path))
+
+    return Spec(pickle.loads(payload))
+
+
+def _parse(path, data):
+    if path.endswith('.json'):
+        return json.loads(data.decode('utf-8'))
+
+    try:
+        import yaml
+    except ImportError:  # pragma: no cover
+        raise ImportError('PyYAML is required to load {}'.format(path))
+    return yaml.safe_load(data)
+
+
+def _digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _versions():
+    return {
+        'format': FORMAT_VERSION,
+        'falcon_oas': __version__,
+        'oas': oas_version,
+        'python': '{}.{}'.format(*sys.version_info[:2]),
+    }
@@ -0,0 +1,479 @@
+"""Compile schemas into Python functions which validate instances.
+
+The generated functions only decide whether the instance is valid.
+When it is invalid, :class:`CompiledSchemaUnmarshaler` falls back to
+:class:`oas.schema.unmarshalers.SchemaUnmarshaler` so that the errors,
+and therefore the problem details, are exactly the same.
+"""
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import hashlib
+import json
+import numbers
+import re
+
+import six
+from oas.schema.unmarshalers import SchemaUnmarshaler
+from six import iteritems
+from six import itervalues
+
+from .codegen import Compiler
+from .instrumentation import clock
+from .utils import ReferenceCounter
+
+#: Keywords of JSON Schema Draft 4 which :func:`compile_schema` does not
+#: support.  A schema with any of them is left to the interpreter.  Other
+#: unknown keywords are ignored as ``jsonschema`` does.
+UNSUPPORTED_KEYWORDS = frozenset(
+    (
+        '$ref',
+        'additionalItems',
+        'anyOf',
+        'dependencies',
+        'id',
+        'multipleOf',
+        'not',
+        'oneOf',
+        'patternProperties',
+        'uniqueItems',
+    )
+)
+
+_TYPE_CHECKS = {
+    'array': 'isinstance({0}, list)',
+    'boolean': 'isinstance({0}, bool)',
+    'integer': '(isinstance({0}, _int_types) and not isinstance({0}, bool))',
+    'null': '{0} is None',
+    'number': '(isinstance({0}, _Number) and not isinstance({0}, bool))',
+    'object': 'isinstance({0}, dict)',
+    'string': 'isinstance({0}, _string_types)',
+}
+
+# Keywords which apply only to instances of the type.
+_TYPED_KEYWORDS = (
+    ('number', ('minimum', 'maximum')),
+    ('string', ('minLength', 'maxLength', 'pattern')),
+    ('array', ('items', 'minItems', 'maxItems')),
+    (
+        'object',
+        (
+            'required',
+            'properties',
+            'additionalProperties',
+            'minProperties',
+            'maxProperties',
+        ),
+    ),
+)
+
+# Types which imply the type of keywords.
+_IMPLIED_TYPES = {'integer': 'number'}
+
+
+class UnsupportedSchema(Exception):
+    pass
+
+
+def compile_schema(schema, format_checker=None):
+    """Return a function which returns whether the instance is valid.
+
+    :raises UnsupportedSchema: if the schema or its sub-schemas use
+        keywords which are not supported.
+    """
+    return _Compiler(format_checker).build(
+        schema, _NAMESPACE, '<falcon-oas schema>'
+    )
+
+
+_true = object()
+_false = object()
+
+
+def _unbool(value):
+    if value is True:
+        return _true
+    if value is False:
+        return _false
+    return value
+
+
+def _enum(instance, enums):
+    """Check ``enum`` as ``jsonschema`` does."""
+    if instance == 0 or instance == 1:
+        # Evade booleans and integers being equal.
+        unbooled = _unbool(instance)
+        return any(unbooled == _unbool(x) for x in enums)
+    return instance in enums
+
+
+_NAMESPACE = {
+    '_int_types': six.integer_types,
+    '_Number': numbers.Number,
+    '_string_types': six.string_types,
+    '_enum': _enum,
+}
+
+
+class _Compiler(Compiler):
+    def __init__(self, format_checker):
+        super(_Compiler, self).__init__()
+        self._format_checker = format_checker
+
+    def compile_body(self, schema, lines):
+        self._compile(schema, 'v', lines)
+        lines.append('return True')
+
+    def _compile(self, schema, var, lines):
+        if not isinstance(schema, dict):
+            raise UnsupportedSchema(schema)
+        unsupported = UNSUPPORTED_KEYWORDS.intersection(schema)
+        if unsupported:
+            raise UnsupportedSchema(sorted(unsupported))
+
+        schema_type = schema.get('type')
+        nullable = schema.get('nullable', False)
+
+        if schema_type is not None:
+            try:
+                # The type is a string in OpenAPI.
+                condition = _TYPE_CHECKS[schema_type].format(var)
+            except (KeyError, TypeError):
+                raise UnsupportedSchema(schema_type)
+            if nullable:
+                condition = '{} is None or {}'.format(var, condition)
+            lines.fail('not ({})'.format(condition))
+
+        if 'enum' in schema:
+            condition = 'not _enum({}, {})'.format(
+                var, self.constant(schema['enum'])
+            )
+            if nullable:
+                condition = '{} is not None and {}'.format(var, condition)
+            lines.fail(condition)
+
+        if 'format' in schema and self._format_checker is not None:
+            lines.fail(
+                'not {}({}, {})'.format(
+                    self.constant(self._format_checker.conforms),
+                    var,
+                    self.constant(schema['format']),
+                )
+            )
+
+        for sub_schema in schema.get('allOf', ()):
+            self._compile_sub_schema(sub_schema, var, lines)
+
+        known_type = _IMPLIED_TYPES.get(schema_type, schema_type)
+        for keyword_type, keywords in _TYPED_KEYWORDS:
+            if not any(keyword in schema for keyword in keywords):
+                continue
+
+            if keyword_type != known_type:
+                condition = _TYPE_CHECKS[keyword_type].format(var)
+            elif nullable:
+                condition = '{} is not None'.format(var)
+            else:
+                self._compile_typed(schema, keyword_type, var, lines)
+                continue
+
+            with lines.block('if {}:'.format(condition)):
+                self._compile_typed(schema, keyword_type, var, lines)
+
+    def _compile_sub_schema(self, schema, var, lines):
+        if isinstance(schema, dict) and not any(
+            keyword in schema for keyword in ('allOf', 'items', 'properties')
+        ):
+            # Inline leaf schemas.
+            self._compile(schema, var, lines)
+        else:
+            lines.fail('not {}({})'.format(self.compile_function(schema), var))
+
+    def _compile_typed(self, schema, keyword_type, var, lines):
+        if keyword_type == 'number':
+            for keyword, exclusive, operators in (
+                ('minimum', 'exclusiveMinimum', ('<=', '<')),
+                ('maximum', 'exclusiveMaximum', ('>=', '>')),
+            ):
+                if keyword in schema:
+                    operator = operators[not schema.get(exclusive, False)]
+                    lines.fail(
+                        '{} {} {}'.format(
+                            var, operator, self.constant(schema[keyword])
+                        )
+                    )
+
+        elif keyword_type == 'string':
+            self._compile_length(schema, 'Length', var, lines)
+            if 'pattern' in schema:
+                try:
+                    search = re.compile(schema['pattern']).search
+                except re.error:
+                    raise UnsupportedSchema(schema['pattern'])
+                lines.fail('not {}({})'.format(self.constant(search), var))
+
+        elif keyword_type == 'array':
+            self._compile_length(schema, 'Items', var, lines)
+            if 'items' in schema:
+                item_var = '{}_{}'.format(var, lines.depth)
+                with lines.block('for {} in {}:'.format(item_var, var)):
+                    self._compile_sub_schema(schema['items'], item_var, lines)
+
+        else:
+            self._compile_length(schema, 'Properties', var, lines)
+            for name in schema.get('required', ()):
+                lines.fail('{} not in {}'.format(self.constant(name), var))
+
+            properties = schema.get('properties', {})
+            for index, (name, sub_schema) in enumerate(iteritems(properties)):
+                name = self.constant(name)
+                item_var = '{}_{}_{}'.format(var, lines.depth, index)
+                with lines.block('if {} in {}:'.format(name, var)):
+                    lines.append('{} = {}[{}]'.format(item_var, var, name))
+                    self._compile_sub_schema(sub_schema, item_var, lines)
+
+            additional_properties = schema.get('additionalProperties', True)
+            if additional_properties is True:
+                return
+
+            key_var = '{}_{}'.format(var, lines.depth)
+            with lines.block('for {} in {}:'.format(key_var, var)):
+                with lines.block(
+                    'if {} not in {}:'.format(
+                        key_var, self.constant(frozenset(properties))
+                    )
+                ):
+                    if additional_properties is False:
+                        lines.append('return False')
+                    else:
+                        item_var = key_var + '_v'
+                        lines.append(
+                            '{} = {}[{}]'.format(item_var, var, key_var)
+                        )
+                        self._compile_sub_schema(
+                            additional_properties, item_var, lines
+                        )
+
+    def _compile_length(self, schema, suffix, var, lines):
+        for keyword, operator in (('min', '<'), ('max', '>')):
+            if keyword + suffix in schema:
+                lines.fail(
+                    'len({}) {} {}'.format(
+                        var, operator, self.constant(schema[keyword + suffix])
+                    )
+                )
+
+
+def _digest(schema):
+    try:
+        data = json.dumps(schema, sort_keys=True, default=repr)
+    except (TypeError, ValueError):
+        # Recursive schemas are not compared.
+        return id(schema)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def _compile_function(schema, format_checker):
+    start = clock()
+    try:
+        is_valid = compile_schema(schema, format_checker=format_checker)
+    except UnsupportedSchema:
+        is_valid = None
+    return is_valid, clock() - start
+
+
+def _iter_operation_schemas(operation):
+    for parameter_spec_dict in operation['parameters']:
+        if 'schema' in parameter_spec_dict:
+            yield parameter_spec_dict['schema']
+    if 'requestBody' in operation:
+        content = operation['requestBody']['content']
+        for media_type_spec_dict in itervalues(content):
+            if 'schema' in media_type_spec_dict:
+                yield media_type_spec_dict['schema']
+
+
+class CompiledSchemaUnmarshaler(SchemaUnmarshaler):
+    """Unmarshal instances with compiled schemas if possible.
+
+    Schemas are compiled by :meth:`compile` in advance.  Valid instances
+    skip the validation by ``jsonschema`` while invalid instances and
+    instances of other schemas are handled by the base class.
+    """
+
+    def __init__(self, spec=None, formats=None):
+        super(CompiledSchemaUnmarshaler, self).__init__(
+            spec=spec, formats=formats
+        )
+        self._compiled = {}
+        # The compiled functions keyed by the digests of the schemas so
+        # that equal schemas, e.g. copies of a component inlined by
+        # resolving ``$ref``, are compiled once.
+        self._functions = {}
+        self._durations = {}
+        # The schemas of the operations, which are released by
+        # :meth:`release_operation`, and the numbers of the compiled
+        # schemas of each digest.
+        self._schemas = ReferenceCounter()
+        self._digests = {}
+
+    def compile(self, schema):
+        """Compile the schema and return whether it is supported."""
+        if id(schema) not in self._compiled:
+            self._merge(self._compile_schema(schema))
+        return self._compiled[id(schema)][1] is not None
+
+    def compile_operation(self, operation):
+        """Compile schemas of parameters and request body of the operation.
+
+        ``operation`` is the resolved Operation Object.
+        """
+        self.merge_operation(self.compile_operation_unit(operation))
+
+    def compile_operation_unit(self, operation):
+        """Compile schemas of the operation without storing them.
+
+        The result, including the durations to compile the schemas, is
+        passed to :meth:`merge_operation`.  Units of operations do not
+        modify the unmarshaler, so they can run in threads.
+        """
+        results = [
+            self._compile_schema(schema)
+            for schema in _iter_operation_schemas(operation)
+            if id(schema) not in self._compiled
+        ]
+        return operation, results
+
+    def compile_operations(self, operations, map=map):
+        """Compile schemas of the operations and return their durations.
+
+        The schemas are digested serially, and ``map`` is called once
+        with a schema of each digest which is not compiled yet, so that
+        ``executor.map`` compiles equal schemas once.  The results are
+        merged in the order of ``operations``.  The durations are in
+        nanoseconds and include compiling the schemas first seen in the
+        operation.
+        """
+        pending = []
+        pending_digests = []
+        owners = {}
+        digested = []
+        durations = []
+        for index, operation in enumerate(operations):
+            start = clock()
+            schemas = []
+            for schema in _iter_operation_schemas(operation):
+                if id(schema) in self._compiled:
+                    continue
+                digest = _digest(schema)
+                schemas.append((schema, digest))
+                if digest not in self._functions and digest not in owners:
+                    owners[digest] = index
+                    pending.append(schema)
+                    pending_digests.append(digest)
+            digested.append(schemas)
+            durations.append(clock() - start)
+
+        format_checker = self._formats.format_checker
+        compiled = dict(
+            zip(
+                pending_digests,
+                map(
+                    lambda schema: _compile_function(schema, format_checker),
+                    pending,
+                ),
+            )
+        )
+        for index, (operation, schemas) in enumerate(
+            zip(operations, digested)
+        ):
+            results = []
+            for schema, digest in schemas:
+                if owners.get(digest) == index and digest in compiled:
+                    is_valid, duration = compiled.pop(digest)
+                    durations[index] += duration
+                else:
+                    # The function of the first schema, merged first,
+                    # wins.
+                    is_valid, duration = None, None
+                results.append((schema, digest, is_valid, duration))
+            self.merge_operation((operation, results))
+        return durations
+
+    def merge_operation(self, unit):
+        """Store the result of :meth:`compile_operation_unit`.
+
+        Equal schemas of the units merged first win so that the result
+        does not depend on the order in which the units finish.
+        """
+        operation, results = unit
+        for result in results:
+            self._merge(result)
+        for schema in _iter_operation_schemas(operation):
+            self._schemas.acquire(schema)
+
+    def release_operation(self, operation):
+        """Release the schemas of the merged operation.
+
+        The compiled schemas are removed when no merged operation refers
+        to them any longer, e.g. after the spec is reloaded.
+        """
+        for schema in _iter_operation_schemas(operation):
+            if not self._schemas.release(schema):
+                continue
+            _, _, digest = self._compiled.pop(id(schema))
+            self._digests[digest] -= 1
+            if not self._digests[digest]:
+                del self._digests[digest]
+                del self._functions[digest]
+                self._durations.pop(digest, None)
+
+    def _compile_schema(self, schema):
+        digest = _digest(schema)
+        try:
+            return schema, digest, self._functions[digest], None
+        except KeyError:
+            pass
+
+        is_valid, duration = _compile_function(
+            schema, self._formats.format_checker
+        )
+        return schema, digest, is_valid, duration
+
+    def schema_report(self):
+        """Return ``(schema, seconds)`` of the compiled schemas.
+
+        The schemas are sorted by the durations to compile them in
+        descending order.  Equal schemas are listed once.
+        """
+        durations = list(itervalues(self._durations))
+        return sorted(
+            ((schema, duration / 1e9) for schema, duration in durations),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+    def _merge(self, result):
+        schema, digest, is_valid, duration = result
+        if id(schema) in self._compiled:
+            return
+        if digest not in self._functions and duration is not None:
+            self._durations[digest] = schema, duration
+        is_valid = self._functions.setdefault(digest, is_valid)
+        # Keep the schema alive to make its id unique.
+        self._compiled[id(schema)] = schema, is_valid, digest
+        self._digests[digest] = self._digests.get(digest, 0) + 1
+
+    def unmarshal(self, instance, schema):
+        try:
+            is_valid = self._compiled[id(schema)][1]
+        except KeyError:
+            is_valid = None
+
+        if is_valid is not None and is_valid(instance):
+            return self._unmarshal(instance, schema)
+        return super(CompiledSchemaUnmarshaler, self).unmarshal(
+            instance, schema
+        )
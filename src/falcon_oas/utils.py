@@ -3,10 +3,22 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import hashlib
 import importlib
+import json
+import threading
+from collections import defaultdict
 
 import six
 
+from .instrumentation import clock
+
+# Resolved objects keyed by ``(base_module, name)``.
+_imported = {}
+# Durations of importing modules in nanoseconds.
+_import_durations = defaultdict(int)
+_lock = threading.Lock()
+
 
 def import_string(name, base_module=''):
     if not isinstance(name, six.string_types):
@@ -15,6 +27,111 @@ def import_string(name, base_module=''):
     if base_module and not base_module.endswith('.'):
         base_module += '.'
 
+    key = base_module, name
+    try:
+        return _imported[key]
+    except KeyError:
+        pass
+
+    # Import outside the lock since the module may call this function
+    # while it is imported.  The import system has its own locks.
     module_name, object_name = (base_module + name).rsplit('.', 1)
+    start = clock()
     module = importlib.import_module(module_name)
-    return getattr(module, object_name)
+    duration = clock() - start
+    obj = getattr(module, object_name)
+    with _lock:
+        _import_durations[module_name] += duration
+        return _imported.setdefault(key, obj)
+
+
+def import_report():
+    """Return ``(module_name, seconds)`` of the implementation modules.
+
+    The modules are imported by :func:`import_string` and sorted by the
+    durations in descending order.  The duration of a module includes the
+    modules it imports for the first time.
+    """
+    with _lock:
+        durations = list(_import_durations.items())
+    return sorted(
+        ((module_name, duration / 1e9) for module_name, duration in durations),
+        key=lambda item: item[1],
+        reverse=True,
+    )
+
+
+def clear_import_cache():
+    with _lock:
+        _imported.clear()
+        _import_durations.clear()
+
+
+class ReferenceCounter(object):
+    """Count the references to objects by their ids.
+
+    The state keyed by the ids of objects shared by several owners, e.g.
+    the operations of the specs before and after reloading, is released
+    when the last owner releases the object.  The objects are kept alive
+    while they are referenced so that their ids are unique.
+    """
+
+    def __init__(self):
+        self._counts = {}
+
+    def acquire(self, obj):
+        """Return whether the object was not referenced."""
+        _, count = self._counts.get(id(obj), (obj, 0))
+        self._counts[id(obj)] = obj, count + 1
+        return count == 0
+
+    def release(self, obj):
+        """Return whether the object is no longer referenced."""
+        try:
+            _, count = self._counts[id(obj)]
+        except KeyError:
+            return False
+
+        if count > 1:
+            self._counts[id(obj)] = obj, count - 1
+            return False
+        del self._counts[id(obj)]
+        return True
+
+    def __len__(self):
+        return len(self._counts)
+
+
+def digest(obj):
+    """Return the digest of the JSON-like object to compare it.
+
+    Equal objects have the same digest, including the objects with
+    cycles, e.g. recursive schemas whose ``$ref`` are resolved, which
+    ``==`` cannot compare.  Other values are compared by ``repr``.
+    """
+    data = json.dumps(_encode(obj, []), sort_keys=True, default=repr)
+    return hashlib.sha1(data.encode('utf-8')).hexdigest()
+
+
+def _encode(obj, ancestors):
+    # Tag the containers so that the references to the ancestors are
+    # distinct from the values.
+    if not isinstance(obj, (dict, list, tuple)):
+        return obj
+    for depth, ancestor in enumerate(reversed(ancestors)):
+        if ancestor is obj:
+            return ['cycle', depth]
+
+    ancestors.append(obj)
+    try:
+        if isinstance(obj, dict):
+            return [
+                'dict',
+                {
+                    six.text_type(key): _encode(value, ancestors)
+                    for key, value in six.iteritems(obj)
+                },
+            ]
+        return ['list', [_encode(value, ancestors) for value in obj]]
+    finally:
+        ancestors.pop()
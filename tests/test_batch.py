@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import falcon
+import pytest
+from falcon import testing
+
+import falcon_oas
+
+
+class PetCollection(object):
+    def on_post(self, req, resp):
+        resp.status = falcon.HTTP_CREATED
+        resp.media = dict(req.oas_media, id=1, user=req.oas_user)
+
+
+class PetItem(object):
+    def on_get(self, req, resp, pet_id):
+        resp.media = {'id': pet_id}
+
+    def on_patch(self, req, resp, pet_id):
+        resp.media = {
+            'id': pet_id,
+            'page': req.oas_query.get('page'),
+            'name': req.oas_media['name'],
+        }
+
+    def on_delete(self, req, resp, pet_id):
+        resp.status = falcon.HTTP_NO_CONTENT
+
+
+@pytest.fixture
+def api_key_validator(mocker):
+    return mocker.Mock(side_effect=lambda value, scopes, req: value)
+
+
+@pytest.fixture
+def client(petstore_dict, api_key_validator):
+    oas = falcon_oas.OAS(petstore_dict, batch_path='/batch')
+    oas.resolve_path_item('/v1/pets', PetCollection())
+    oas.resolve_path_item('/v1/pets/{pet_id}', PetItem())
+    oas.resolve_security_scheme('api_key', api_key_validator)
+    api = oas.create_api(request_type=falcon_oas.Request)
+    return testing.TestClient(api)
+
+
+def test_batch(client):
+    response = client.simulate_post(
+        path='/api/batch',
+        json=[
+            {'method': 'GET', 'path': '/api/v1/pets/1'},
+            {
+                'method': 'patch',
+                'path': '/api/v1/pets/2',
+                'query': {'page': 3},
+                'body': {'name': 'momo'},
+            },
+            {
+                'method': 'PATCH',
+                'path': '/api/v1/pets/2?page=x',
+                'body': {'name': 'momo'},
+            },
+            {'method': 'DELETE', 'path': '/api/v1/pets/3'},
+            {'method': 'GET', 'path': '/undocumented'},
+        ],
+    )
+
+    assert response.status == falcon.HTTP_OK
+    results = response.json
+    assert [result['status'] for result in results] == [
+        200,
+        200,
+        400,
+        204,
+        404,
+    ]
+    assert results[0]['body'] == {'id': 1}
+    assert results[1]['body'] == {'id': 2, 'page': 3, 'name': 'momo'}
+    assert results[2]['body']['title'] == 'Unmarshal Error'
+    assert results[2]['body']['parameters'][0]['path'] == ['query', 'page']
+    assert results[3]['body'] is None
+    assert results[4]['body']['title'] == 'Not Found'
+
+
+def test_batch_shares_security_results(client, api_key_validator):
+    item = {
+        'method': 'POST',
+        'path': '/api/v1/pets',
+        'body': {'name': 'momo'},
+    }
+    other = dict(item, headers={'X-API-Key': 'other'})
+
+    response = client.simulate_post(
+        path='/api/batch',
+        headers={'X-API-Key': str('secret')},
+        json=[item, item, other, item],
+    )
+
+    results = response.json
+    assert [result['body']['user'] for result in results] == [
+        'secret',
+        'secret',
+        'other',
+        'secret',
+    ]
+    assert api_key_validator.call_count == 2
+
+
+@pytest.mark.parametrize(
+    'media',
+    [
+        {},
+        [1],
+        [{'method': 'GET'}],
+        [{'method': 'FOO', 'path': '/api/v1/pets/1'}],
+        [{'method': 1, 'path': '/api/v1/pets/1'}],
+        [{'method': 'GET', 'path': 'api/v1/pets/1'}],
+        [{'method': 'GET', 'path': '/api/v1/pets/1'}] * 101,
+        [{'method': 'GET', 'path': '/api/v1/pets/1', 'query': ['x']}],
+        [{'method': 'GET', 'path': '/api/v1/pets/1', 'headers': ['x']}],
+        [{'method': 'GET', 'path': '/api/v1/pets/1', 'headers': {'X': 1}}],
+    ],
+)
+def test_batch_bad_request(client, media):
+    response = client.simulate_post(path='/api/batch', json=media)
+
+    assert response.status == falcon.HTTP_BAD_REQUEST
+    assert response.json['title'] == 'Bad Request'
+
+
+def test_batch_nested(client):
+    response = client.simulate_post(
+        path='/api/batch',
+        json=[{'method': 'POST', 'path': '/api/batch', 'body': []}],
+    )
+
+    assert response.status == falcon.HTTP_OK
+    assert response.json[0]['status'] == 400
+    assert response.json[0]['body']['detail'] == 'Nested batch request'
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+from falcon_oas.caches import TTLCache
+
+
+class Timer(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def timer():
+    return Timer()
+
+
+def test_ttl_cache(timer):
+    cache = TTLCache(2, 10, timer=timer)
+
+    assert cache.get('a') == (False, None)
+    cache.set('a', 1)
+    assert cache.get('a') == (True, 1)
+    assert cache.info() == {'hits': 1, 'misses': 1, 'size': 1}
+
+
+def test_ttl_cache_expires(timer):
+    cache = TTLCache(2, 10, timer=timer)
+    cache.set('a', 1)
+
+    timer.now = 9
+    assert cache.get('a') == (True, 1)
+
+    timer.now = 10
+    assert cache.get('a') == (False, None)
+    assert len(cache) == 0
+
+
+def test_ttl_cache_negative_ttl(timer):
+    cache = TTLCache(2, 10, negative_ttl=1, timer=timer)
+    cache.set('a', None)
+    assert cache.get('a') == (True, None)
+
+    timer.now = 1
+    assert cache.get('a') == (False, None)
+
+
+def test_ttl_cache_without_negative_ttl(timer):
+    cache = TTLCache(2, 10, timer=timer)
+    cache.set('a', False)
+
+    assert cache.get('a') == (False, None)
+    assert len(cache) == 0
+
+
+def test_ttl_cache_evicts_least_recently_used(timer):
+    cache = TTLCache(2, 10, timer=timer)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert cache.get('b') == (False, None)
+    assert cache.get('a') == (True, 1)
+    assert cache.get('c') == (True, 3)
+
+
+def test_ttl_cache_maxsize_zero(timer):
+    cache = TTLCache(0, 10, timer=timer)
+    cache.set('a', 1)
+
+    assert len(cache) == 0
+
+
+def test_ttl_cache_invalidate(timer):
+    cache = TTLCache(3, 10, timer=timer)
+    cache.set(('a', 1), 1)
+    cache.set(('a', 2), 2)
+    cache.set(('b', 1), 3)
+
+    cache.invalidate(lambda key: key[0] == 'a')
+    assert len(cache) == 1
+    assert cache.get(('b', 1)) == (True, 3)
+
+    cache.invalidate()
+    assert len(cache) == 0
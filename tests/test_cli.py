@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import os
+
+from falcon_oas import extensions
+from falcon_oas.cli import main
+from falcon_oas.specs import load_spec
+from falcon_oas.utils import clear_import_cache
+
+PETSTORE_PATH = os.path.join(os.path.dirname(__file__), 'petstore.yaml')
+
+
+def test_compile(tmpdir):
+    cache_path = str(tmpdir.join('spec.cache'))
+
+    assert main(['compile', PETSTORE_PATH, '-o', cache_path]) == 0
+
+    assert load_spec(cache_path, source=PETSTORE_PATH) is not None
+
+
+def test_imports(capsys, mocker, petstore_dict):
+    path_item = petstore_dict['paths']['/v1/pets']
+    path_item[extensions.IMPLEMENTATION] = 'test_factories.PetCollection'
+    security_scheme = petstore_dict['components']['securitySchemes']['session']
+    security_scheme[extensions.IMPLEMENTATION] = 'test_utils.OBJECT'
+    mocker.patch('falcon_oas.cli.load_spec_dict', return_value=petstore_dict)
+    clear_import_cache()
+
+    assert main(['imports', 'spec.yaml', '--base-module', 'tests']) == 0
+
+    lines = capsys.readouterr().out.splitlines()
+    assert sorted(line.split()[-1] for line in lines) == [
+        'tests.test_factories',
+        'tests.test_utils',
+    ]
+
+
+def test_profile(capsys, mocker, petstore_dict):
+    mocker.patch('falcon_oas.cli.load_spec_dict', return_value=petstore_dict)
+
+    assert main(['profile', 'spec.yaml', '-n', '2']) == 0
+
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0] == 'Operations:'
+    assert lines[3] == 'Schemas:'
+    assert len(lines) == 6
+    assert all(line.split()[1] == 'ms' for line in lines if line[0] == ' ')
@@ -0,0 +1,166 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import falcon
+import pytest
+from falcon import testing
+from oas import create_spec_from_dict
+
+import falcon_oas
+from falcon_oas import extensions
+from falcon_oas.conditional import ConditionalResponses
+from falcon_oas.conditional import hash_data
+
+
+class Resource(object):
+    def __init__(
+        self, status=falcon.HTTP_OK, media=None, body=None, **headers
+    ):
+        self.status = status
+        self.media = media
+        self.body = body
+        self.headers = headers
+
+    def on_get(self, req, resp, **params):
+        resp.status = self.status
+        if self.body is None:
+            resp.media = self.media
+        else:
+            resp.body = self.body
+        for name, value in self.headers.items():
+            resp.set_header(name, value)
+
+    on_delete = on_get
+
+
+@pytest.fixture
+def spec_dict(petstore_dict):
+    path_item = petstore_dict['paths']['/v1/pets/{pet_id}']
+    path_item['get'][extensions.HTTP_CACHE] = {
+        'etag': True,
+        'cacheControl': 'private, max-age=60',
+    }
+    path_item['delete'][extensions.HTTP_CACHE] = {'etag': True}
+    return petstore_dict
+
+
+def create_client(spec_dict, resource):
+    spec = create_spec_from_dict(spec_dict)
+    app = falcon.API(
+        middleware=[
+            falcon_oas.Middleware(spec, conditional=ConditionalResponses())
+        ]
+    )
+    app.add_route('/api/v1/pets/{pet_id}', resource)
+    app.add_route('/api/v1/pets', resource)
+    return testing.TestClient(app)
+
+
+def test_etag(spec_dict):
+    client = create_client(spec_dict, Resource(media={'id': 42}))
+
+    response = client.simulate_get(path='/api/v1/pets/42')
+    assert response.status == falcon.HTTP_OK
+    assert response.json == {'id': 42}
+    assert response.headers['ETag'] == '"{}"'.format(
+        hash_data(response.content)
+    )
+    assert response.headers['Cache-Control'] == 'private, max-age=60'
+    etag = response.headers['ETag']
+
+    response = client.simulate_get(
+        path='/api/v1/pets/42', headers={'If-None-Match': str(etag)}
+    )
+    assert response.status == falcon.HTTP_NOT_MODIFIED
+    assert response.content == b''
+    assert response.headers['ETag'] == etag
+    assert response.headers['Cache-Control'] == 'private, max-age=60'
+
+
+@pytest.mark.parametrize(
+    'if_none_match,expected',
+    [
+        ('"x"', falcon.HTTP_OK),
+        ('"x", {etag}', falcon.HTTP_NOT_MODIFIED),
+        ('W/{etag}', falcon.HTTP_NOT_MODIFIED),
+        ('*', falcon.HTTP_NOT_MODIFIED),
+    ],
+)
+def test_if_none_match(spec_dict, if_none_match, expected):
+    client = create_client(spec_dict, Resource(media={'id': 42}))
+    etag = client.simulate_get(path='/api/v1/pets/42').headers['ETag']
+
+    response = client.simulate_get(
+        path='/api/v1/pets/42',
+        headers={'If-None-Match': str(if_none_match.format(etag=etag))},
+    )
+    assert response.status == expected
+
+
+def test_text_body(spec_dict):
+    client = create_client(spec_dict, Resource(body='ねこ'))
+
+    response = client.simulate_get(path='/api/v1/pets/42')
+    assert response.headers['ETag'] == '"{}"'.format(
+        hash_data('ねこ'.encode('utf-8'))
+    )
+
+
+def test_etag_of_responder(spec_dict):
+    client = create_client(
+        spec_dict, Resource(media={'id': 42}, ETag=str('"v1"'))
+    )
+
+    response = client.simulate_get(
+        path='/api/v1/pets/42', headers={'If-None-Match': str('"v1"')}
+    )
+    assert response.status == falcon.HTTP_NOT_MODIFIED
+    assert response.headers['ETag'] == '"v1"'
+
+
+def test_cache_control_of_responder(spec_dict):
+    client = create_client(
+        spec_dict, Resource(media={'id': 42}, **{'Cache-Control': 'no-store'})
+    )
+
+    response = client.simulate_get(path='/api/v1/pets/42')
+    assert response.headers['Cache-Control'] == 'no-store'
+
+
+@pytest.mark.parametrize(
+    'method,path,resource',
+    [
+        ('GET', '/api/v1/pets/42', Resource(status=falcon.HTTP_ACCEPTED)),
+        ('GET', '/api/v1/pets/42', Resource()),
+        ('DELETE', '/api/v1/pets/42', Resource(media={'id': 42})),
+        ('GET', '/api/v1/pets', Resource(media=[])),
+    ],
+)
+def test_without_etag(spec_dict, method, path, resource):
+    client = create_client(spec_dict, resource)
+
+    response = client.simulate_request(
+        method=method,
+        path=path,
+        headers={
+            'Cookie': str('session=1'),
+            'If-None-Match': str('*'),
+        },
+    )
+    assert response.status == resource.status
+    assert 'ETag' not in response.headers
+
+
+def test_failed_request(spec_dict):
+    class FailingResource(object):
+        def on_get(self, req, resp, pet_id):
+            raise falcon.HTTPNotFound()
+
+    client = create_client(spec_dict, FailingResource())
+
+    response = client.simulate_get(path='/api/v1/pets/42')
+    assert response.status == falcon.HTTP_NOT_FOUND
+    assert 'Cache-Control' not in response.headers
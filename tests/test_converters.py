@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import uuid
+
+import falcon
+import pytest
+from falcon import testing
+from oas import create_spec_from_dict
+
+from falcon_oas.converters import convert_uri_templates
+from falcon_oas.converters import ENUM
+from falcon_oas.converters import EnumConverter
+from falcon_oas.converters import path_converter
+
+
+def parameter(schema, **kwargs):
+    return dict(name='x', schema=schema, **kwargs)
+
+
+@pytest.mark.parametrize(
+    'schema,expected',
+    [
+        ({'type': 'integer'}, 'int'),
+        ({'type': 'integer', 'description': 'ID', 'x-foo': 1}, 'int'),
+        ({'type': 'integer', 'minimum': 1}, 'int(min=1)'),
+        (
+            {'type': 'integer', 'minimum': 0.5, 'maximum': 9.5},
+            'int(min=1,max=9)',
+        ),
+        (
+            {
+                'type': 'integer',
+                'minimum': 0,
+                'exclusiveMinimum': True,
+                'maximum': 10,
+                'exclusiveMaximum': True,
+            },
+            'int(min=1,max=9)',
+        ),
+        (
+            {'type': 'integer', 'format': 'int32', 'minimum': 0},
+            'int(min=0,max=2147483647)',
+        ),
+        (
+            {'type': 'integer', 'format': 'int64'},
+            'int(min=-9223372036854775808,max=9223372036854775807)',
+        ),
+        ({'type': 'integer', 'format': 'custom'}, None),
+        ({'type': 'integer', 'multipleOf': 2}, None),
+        ({'type': 'string', 'format': 'uuid'}, 'uuid'),
+        ({'type': 'string', 'enum': ['cat', 'dog']}, ENUM + "('cat','dog')"),
+        ({'type': 'string', 'enum': ['a/b']}, None),
+        ({'type': 'string', 'enum': ['a'], 'format': 'uuid'}, None),
+        ({'type': 'string', 'format': 'uuid', 'pattern': '^a'}, None),
+        ({'type': 'string'}, None),
+        ({'type': 'number'}, None),
+        ({}, None),
+    ],
+)
+def test_path_converter(schema, expected):
+    assert path_converter(parameter(schema)) == expected
+
+
+def test_path_converter_without_schema():
+    assert path_converter({'name': 'x', 'content': {}}) is None
+
+
+def test_path_converter_with_style():
+    parameter_spec_dict = parameter({'type': 'integer'}, style='label')
+    assert path_converter(parameter_spec_dict) is None
+
+
+def test_enum_converter():
+    converter = EnumConverter('cat', 'dog')
+    assert converter.convert('cat') == 'cat'
+    assert converter.convert('cow') is None
+
+
+def test_convert_uri_templates(petstore_dict):
+    paths = petstore_dict['paths']
+    paths['/v1/pets/{pet_id}']['delete']['parameters'] = [
+        {
+            'name': 'pet_id',
+            'in': 'path',
+            'required': True,
+            'schema': {'type': 'string'},
+        }
+    ]
+    paths['/v1/owners/{owner_id}/pets/{kind}'] = {
+        'parameters': [
+            {
+                'name': 'owner_id',
+                'in': 'path',
+                'required': True,
+                'schema': {'type': 'string', 'format': 'uuid'},
+            },
+            {
+                'name': 'kind',
+                'in': 'path',
+                'required': True,
+                'schema': {'type': 'string', 'enum': ['cat', 'dog']},
+            },
+        ],
+        'get': {'responses': {'200': {'description': 'Pets'}}},
+    }
+    spec = create_spec_from_dict(petstore_dict)
+
+    assert convert_uri_templates(spec) == {
+        '/api/v1/pets': ('/api/v1/pets', frozenset()),
+        # The operations of the path disagree.
+        '/api/v1/pets/{pet_id}': ('/api/v1/pets/{pet_id}', frozenset()),
+        '/api/v1/owners/{owner_id}/pets/{kind}': (
+            "/api/v1/owners/{owner_id:uuid}/pets/{kind:oas_enum('cat','dog')}",
+            frozenset(['owner_id', 'kind']),
+        ),
+    }
+
+
+def test_converters_in_router():
+    class Resource(object):
+        def on_get(self, req, resp, **params):
+            resp.media = {
+                key: str(value) if isinstance(value, uuid.UUID) else value
+                for key, value in params.items()
+            }
+
+    app = falcon.API()
+    app.router_options.converters[ENUM] = EnumConverter
+    app.add_route(
+        "/owners/{owner_id:uuid}/pets/{kind:oas_enum('cat','dog')}"
+        '/{pet_id:int(min=1)}',
+        Resource(),
+    )
+    client = testing.TestClient(app)
+
+    owner_id = str(uuid.uuid4())
+    path = '/owners/{}/pets/cat/1'.format(owner_id)
+    response = client.simulate_get(path=path)
+    assert response.json == {'owner_id': owner_id, 'kind': 'cat', 'pet_id': 1}
+
+    for path in (
+        '/owners/x/pets/cat/1',
+        '/owners/{}/pets/cow/1'.format(owner_id),
+        '/owners/{}/pets/cat/0'.format(owner_id),
+    ):
+        response = client.simulate_get(path=path)
+        assert response.status == falcon.HTTP_NOT_FOUND
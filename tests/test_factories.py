@@ -4,12 +4,25 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import copy
+import json
+import threading
+
 import falcon
 import pytest
 from falcon import testing
+from oas import create_spec_from_dict
 
 from falcon_oas import extensions
+from falcon_oas.factories import MultiOAS
 from falcon_oas.factories import OAS
+from falcon_oas.instrumentation import HistogramCollector
+from falcon_oas.media import create_json_handler
+from falcon_oas.media import JSONHandler
+from falcon_oas.middlewares import Middleware
+from falcon_oas.ratelimits import RateLimiter
+from falcon_oas.serializers import SUPPORTED as SERIALIZER_SUPPORTED
+from falcon_oas.specs import load_spec
 
 
 user = object()
@@ -118,6 +131,496 @@ def test_oas_without_middleware(spec_dict):
     assert response.status == falcon.HTTP_NO_CONTENT
 
 
+def test_oas_max_content_length(spec_dict):
+    api = OAS(
+        spec_dict, base_module='tests', max_content_length=16
+    ).create_api()
+    client = testing.TestClient(api)
+
+    response = client.simulate_patch(
+        path='/api/v1/pets/42', json={'name': 'x' * 32}
+    )
+    assert response.status == falcon.HTTP_413
+    assert response.headers['Content-Type'] == 'application/problem+json'
+
+    response = client.simulate_patch(path='/api/v1/pets/42', json={})
+    assert response.status == falcon.HTTP_OK
+
+
+def test_oas_lazy(spec_dict):
+    class LazyPetItem(PetItem):
+        def on_patch(self, req, resp, pet_id):
+            request_body = req.context['oas'].request_body
+            resp.media = {'id': pet_id, 'name': request_body['name']}
+
+    oas = OAS(spec_dict, base_module='tests', lazy=True)
+    oas.resolve_path_item('/v1/pets/{pet_id}', LazyPetItem())
+    client = testing.TestClient(oas.create_api())
+
+    response = client.simulate_patch(
+        path='/api/v1/pets/42', json={'name': 'momo'}
+    )
+    assert response.status == falcon.HTTP_OK
+    assert response.json == {'id': 42, 'name': 'momo'}
+
+    response = client.simulate_patch(path='/api/v1/pets/42', json={'name': 1})
+    assert response.status == falcon.HTTP_BAD_REQUEST
+    assert response.headers['Content-Type'] == 'application/problem+json'
+    assert 'request_body' in response.json
+
+
+def test_oas_observer(spec_dict):
+    collector = HistogramCollector()
+    api = OAS(spec_dict, base_module='tests', observer=collector).create_api()
+    client = testing.TestClient(api)
+
+    client.simulate_get(path='/api/v1/pets/42')
+
+    snapshot = collector.snapshot()
+    assert snapshot[('/api/v1/pets/{pet_id}', 'get', 'lookup')]['count'] == 1
+
+
+def test_oas_rate_limiter(spec_dict):
+    path_item = spec_dict['paths']['/v1/pets/{pet_id}']
+    path_item['get'][extensions.RATE_LIMIT] = {'limit': 1, 'period': 60}
+    api = OAS(
+        spec_dict, base_module='tests', rate_limiter=RateLimiter()
+    ).create_api()
+    client = testing.TestClient(api)
+
+    response = client.simulate_get(path='/api/v1/pets/42')
+    assert response.status == falcon.HTTP_OK
+
+    response = client.simulate_get(path='/api/v1/pets/42')
+    assert response.status == falcon.HTTP_TOO_MANY_REQUESTS
+    assert response.headers['Content-Type'] == 'application/problem+json'
+    assert 59 <= int(response.headers['Retry-After']) <= 60
+
+    # Other operations are not limited.
+    response = client.simulate_get(path='/api/v1/pets')
+    assert response.status == falcon.HTTP_OK
+
+
+def test_oas_conditional(spec_dict):
+    path_item = spec_dict['paths']['/v1/pets/{pet_id}']
+    path_item['get'][extensions.HTTP_CACHE] = {'etag': True}
+    api = OAS(spec_dict, base_module='tests', conditional=True).create_api()
+    client = testing.TestClient(api)
+
+    etag = client.simulate_get(path='/api/v1/pets/42').headers['ETag']
+    response = client.simulate_get(
+        path='/api/v1/pets/42', headers={'If-None-Match': str(etag)}
+    )
+    assert response.status == falcon.HTTP_NOT_MODIFIED
+
+
+@pytest.mark.skipif(
+    not SERIALIZER_SUPPORTED, reason='The serializer requires Falcon 2'
+)
+def test_oas_response_serializer(spec_dict):
+    class PetItemWithSecret(PetItem):
+        def on_get(self, req, resp, pet_id):
+            resp.media = {'id': pet_id, 'secret': 'x'}
+
+    oas = OAS(spec_dict, base_module='tests', response_serializer=True)
+    oas.resolve_path_item('/v1/pets/{pet_id}', PetItemWithSecret())
+    client = testing.TestClient(oas.create_api())
+
+    response = client.simulate_get(path='/api/v1/pets/42')
+    assert response.json == {'id': 42}
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_oas_converters(spec_dict, lazy):
+    class PetItemWithParameters(PetItem):
+        def on_get(self, req, resp, pet_id):
+            resp.media = {
+                'id': pet_id,
+                'path': req.context['oas'].parameters['path'],
+            }
+
+    schema = spec_dict['components']['parameters']['pet_id']['schema']
+    schema['minimum'] = 1
+    collector = HistogramCollector()
+    oas = OAS(
+        spec_dict,
+        base_module='tests',
+        converters=True,
+        lazy=lazy,
+        observer=collector,
+    )
+    oas.resolve_path_item('/v1/pets/{pet_id}', PetItemWithParameters())
+    client = testing.TestClient(oas.create_api())
+
+    response = client.simulate_get(path='/api/v1/pets/42')
+    assert response.status == falcon.HTTP_OK
+    assert response.json == {'id': 42, 'path': {'pet_id': 42}}
+
+    # The parameters which are not converted do not match the route.
+    for pet_id in ('0', 'x'):
+        response = client.simulate_get(path='/api/v1/pets/' + pet_id)
+        assert response.status == falcon.HTTP_NOT_FOUND
+
+    # The request body is still unmarshaled.
+    if not lazy:
+        response = client.simulate_patch(
+            path='/api/v1/pets/42', json={'name': 1}
+        )
+        assert response.status == falcon.HTTP_BAD_REQUEST
+
+    # The operations are looked up by the URI templates of the spec.
+    snapshot = collector.snapshot()
+    assert snapshot[('/api/v1/pets/{pet_id}', 'get', 'lookup')]['count'] == 1
+
+
+def test_oas_reload_converters(spec_dict):
+    oas = OAS(copy.deepcopy(spec_dict), base_module='tests', converters=True)
+    client = testing.TestClient(oas.create_api())
+
+    new_spec_dict = copy.deepcopy(spec_dict)
+    new_spec_dict['paths']['/v1/pets/{pet_id}']['get']['summary'] = 'Pet'
+    oas.reload(new_spec_dict)
+    response = client.simulate_get(path='/api/v1/pets/42')
+    assert response.json == {'id': 42}
+
+    schema = new_spec_dict['components']['parameters']['pet_id']['schema']
+    schema['minimum'] = 1
+    with pytest.raises(ValueError):
+        oas.reload(new_spec_dict)
+    assert oas.spec['paths']['/v1/pets/{pet_id}']['get']['summary'] == 'Pet'
+
+
+def test_oas_reload(spec_dict):
+    oas = OAS(spec_dict, base_module='tests', compiled=True)
+    resource = PetItem()
+    oas.resolve_path_item('/v1/pets/{pet_id}', resource)
+    api = oas.create_api()
+    client = testing.TestClient(api)
+    operations = oas.middleware.operations
+    key = '/api/v1/pets/{pet_id}', 'get', None
+    compiled = len(oas.middleware._schema_unmarshaler._compiled)
+
+    new_spec_dict = copy.deepcopy(spec_dict)
+    del new_spec_dict['paths']['/v1/pets/{pet_id}'][extensions.IMPLEMENTATION]
+    oas.reload(new_spec_dict)
+
+    # The unchanged operations and their compiled schemas are reused.
+    assert oas.middleware.operations[key] is operations[key]
+    assert len(oas.middleware._schema_unmarshaler._compiled) == compiled
+    # The resolved implementation is kept.
+    path_item = oas.spec['paths']['/v1/pets/{pet_id}']
+    assert path_item[extensions.IMPLEMENTATION]() is resource
+
+    path_item = new_spec_dict['paths'].pop('/v1/pets')
+    new_spec_dict['paths']['/v1/cats'] = path_item
+    oas.reload(new_spec_dict)
+    # The compiled schemas of the previous operations are released.
+    assert len(oas.middleware._schema_unmarshaler._compiled) == compiled
+
+    response = client.simulate_get(path='/api/v1/pets/42')
+    assert response.status == falcon.HTTP_OK
+    assert response.json == {'id': 42}
+
+    response = client.simulate_get(path='/api/v1/cats')
+    assert response.status == falcon.HTTP_OK
+
+    response = client.simulate_get(path='/api/v1/pets')
+    assert response.status == falcon.HTTP_NOT_FOUND
+    assert response.headers['Content-Type'] == 'application/problem+json'
+
+    # The path is back.
+    oas.reload(spec_dict)
+
+    response = client.simulate_get(path='/api/v1/pets')
+    assert response.status == falcon.HTTP_OK
+
+
+@pytest.mark.parametrize('compiled', [False, True])
+def test_oas_reload_recursive_schema(spec_dict, compiled):
+    schemas = spec_dict['components']['schemas']
+    schemas['PetUpdate']['properties']['parent'] = {
+        '$ref': '#/components/schemas/Pet'
+    }
+    oas = OAS(spec_dict, base_module='tests', compiled=compiled)
+    client = testing.TestClient(oas.create_api())
+    operations = oas.middleware.operations
+
+    oas.reload(copy.deepcopy(spec_dict))
+
+    key = '/api/v1/pets/{pet_id}', 'get', None
+    assert oas.middleware.operations[key] is operations[key]
+    response = client.simulate_get(path='/api/v1/pets/42')
+    assert response.status == falcon.HTTP_OK
+
+
+def test_oas_reload_before_create_api(spec_dict):
+    oas = OAS(spec_dict, base_module='tests')
+    new_spec_dict = copy.deepcopy(spec_dict)
+    del new_spec_dict['paths']['/v1/pets']
+    oas.reload(new_spec_dict)
+
+    client = testing.TestClient(oas.create_api())
+
+    response = client.simulate_get(path='/api/v1/pets')
+    assert response.status == falcon.HTTP_NOT_FOUND
+    response = client.simulate_get(path='/api/v1/pets/42')
+    assert response.status == falcon.HTTP_OK
+
+
+def test_oas_reload_concurrently(spec_dict):
+    class VersionedPetItem(PetItem):
+        def on_get(self, req, resp, pet_id):
+            operation = req.context['oas'].operation
+            resp.media = {'id': pet_id, 'version': operation['x-version']}
+
+    # The type of ``pet_id`` and the version change together.
+    spec_dicts = []
+    for version, schema in (
+        ('integer', {'type': 'integer'}),
+        ('string', {'type': 'string', 'pattern': '^[0-9]+$'}),
+    ):
+        new_spec_dict = copy.deepcopy(spec_dict)
+        path_item = new_spec_dict['paths']['/v1/pets/{pet_id}']
+        del path_item[extensions.IMPLEMENTATION]
+        path_item['get']['x-version'] = version
+        path_item['parameters'] = [
+            {
+                'name': 'pet_id',
+                'in': 'path',
+                'required': True,
+                'schema': schema,
+            }
+        ]
+        spec_dicts.append(new_spec_dict)
+
+    oas = OAS(spec_dicts[0], base_module='tests', compiled=True)
+    oas.resolve_path_item('/v1/pets/{pet_id}', VersionedPetItem())
+    client = testing.TestClient(oas.create_api())
+
+    stop = threading.Event()
+    results = []
+
+    def send():
+        while not stop.is_set():
+            response = client.simulate_get(path='/api/v1/pets/42')
+            results.append((response.status, response.json))
+
+    threads = [threading.Thread(target=send) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for i in range(20):
+            # Each reload adds a path to the router too.
+            new_spec_dict = copy.deepcopy(spec_dicts[(i + 1) % 2])
+            new_spec_dict['paths']['/v1/r{}/pets'.format(i)] = copy.deepcopy(
+                new_spec_dict['paths']['/v1/pets']
+            )
+            oas.reload(new_spec_dict)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    assert results
+    response = client.simulate_get(path='/api/v1/r19/pets')
+    assert response.status == falcon.HTTP_OK
+    for status, media in results:
+        assert status == falcon.HTTP_OK
+        assert media in (
+            {'id': 42, 'version': 'integer'},
+            {'id': '42', 'version': 'string'},
+        )
+
+
+def test_oas_from_spec(spec_dict):
+    spec = create_spec_from_dict(spec_dict)
+
+    assert OAS(spec).spec is spec
+
+
+def test_oas_from_cache(spec_dict, tmpdir):
+    source = tmpdir.join('spec.json')
+    source.write(json.dumps(spec_dict))
+    cache_path = str(tmpdir.join('spec.cache'))
+
+    with pytest.raises(IOError):
+        OAS.from_cache(cache_path)
+
+    # The cache is compiled from the source if it does not exist.
+    oas = OAS.from_cache(cache_path, source=str(source), base_module='tests')
+    assert oas.base_module == 'tests'
+    assert load_spec(cache_path).data == oas.spec.data
+
+    api = OAS.from_cache(cache_path, base_module='tests').create_api()
+    client = testing.TestClient(api)
+    response = client.simulate_get(path='/api/v1/pets/42')
+    assert response.json == {'id': 42}
+
+    # The cache is compiled again if the source has changed.
+    spec_dict['info']['version'] = '0.2.0'
+    source.write(json.dumps(spec_dict))
+    oas = OAS.from_cache(cache_path, source=str(source))
+    assert oas.spec['info']['version'] == '0.2.0'
+    assert load_spec(cache_path)['info']['version'] == '0.2.0'
+
+
+def test_oas_preload(mocker, spec_dict):
+    freeze = mocker.patch('gc.freeze', create=True)
+    oas = OAS(spec_dict, base_module='tests', compiled=True)
+
+    oas.preload()
+
+    assert freeze.called
+    middleware = oas.middleware
+    assert oas.middleware is middleware
+
+    # Nothing is imported after preloading.
+    mocker.patch('falcon_oas.factories.generate_routes', side_effect=Exception)
+    mocker.patch('falcon_oas.middlewares.import_string', side_effect=Exception)
+    api = oas.create_api()
+
+    client = testing.TestClient(api)
+    response = client.simulate_get(path='/api/v1/pets/42')
+    assert response.json == {'id': 42}
+
+
+def test_oas_preload_without_freeze(mocker, spec_dict):
+    freeze = mocker.patch('gc.freeze', create=True)
+
+    OAS(spec_dict, base_module='tests').preload(freeze=False)
+
+    assert not freeze.called
+
+
+def test_oas_middleware_is_shared(mocker, spec_dict):
+    middleware_class = mocker.patch(
+        'falcon_oas.factories.Middleware', wraps=Middleware
+    )
+    oas = OAS(spec_dict, base_module='tests')
+    middleware = oas.middleware
+
+    oas.create_api()
+    oas.create_api()
+    assert middleware_class.call_count == 1
+    assert oas.middleware is middleware
+
+    # Resolving a security scheme recreates the middleware.
+    oas.resolve_security_scheme('session', session_cookie_loader)
+    assert oas.middleware is not middleware
+
+
+def test_oas_json_handler(mocker, spec_dict):
+    class EchoPetItem(PetItem):
+        def on_patch(self, req, resp, pet_id):
+            resp.media = dict(req.media, id=pet_id)
+
+    json_handler = create_json_handler('json')
+    loads = mocker.spy(json_handler, 'loads')
+    dumps = mocker.spy(json_handler, 'dumps')
+    oas = OAS(spec_dict, base_module='tests', json_handler=json_handler)
+    oas.resolve_path_item('/v1/pets/{pet_id}', EchoPetItem())
+    client = testing.TestClient(oas.create_api())
+
+    response = client.simulate_patch(
+        path='/api/v1/pets/42', json={'name': 'momo'}
+    )
+    assert response.json == {'id': 42, 'name': 'momo'}
+    # The request body is decoded once for both unmarshaling and the
+    # responder.
+    assert loads.call_count == 1
+    assert dumps.call_count == 1
+
+    response = client.simulate_patch(path='/api/v1/pets/42', json={'name': 1})
+    assert response.status == falcon.HTTP_BAD_REQUEST
+    assert response.headers['Content-Type'] == 'application/problem+json'
+    assert dumps.call_count == 2
+
+
+def test_oas_json_handler_name(spec_dict):
+    oas = OAS(spec_dict, json_handler='json')
+
+    assert isinstance(oas.json_handler, JSONHandler)
+
+
+def create_version(spec_dict, version):
+    spec_dict = copy.deepcopy(spec_dict)
+    spec_dict['paths'] = {
+        path.replace('/v1/', '/{}/'.format(version)): path_item
+        for path, path_item in spec_dict['paths'].items()
+    }
+    return spec_dict
+
+
+def test_multi_oas(spec_dict):
+    oases = [
+        OAS(create_version(spec_dict, version), base_module='tests')
+        for version in ('v1', 'v2', 'v3')
+    ]
+    oases[2].compiled = True
+    multi_oas = MultiOAS(oases)
+    client = testing.TestClient(multi_oas.create_api())
+
+    for version in ('v1', 'v2', 'v3'):
+        response = client.simulate_get(path='/api/{}/pets/42'.format(version))
+        assert response.status == falcon.HTTP_OK
+        assert response.json == {'id': 42}
+
+        response = client.simulate_get(path='/api/{}/pets/xxx'.format(version))
+        assert response.status == falcon.HTTP_BAD_REQUEST
+        assert response.headers['Content-Type'] == 'application/problem+json'
+
+    v1, v2, v3 = (oas.spec.data['components']['schemas'] for oas in oases)
+    assert v1['Pet'] is v2['Pet'] is v3['Pet']
+
+    schema_unmarshalers = [oas.middleware._schema_unmarshaler for oas in oases]
+    assert schema_unmarshalers[0] is schema_unmarshalers[1]
+    assert schema_unmarshalers[0] is not schema_unmarshalers[2]
+
+
+def test_multi_oas_without_intern(spec_dict):
+    oases = [
+        OAS(create_version(spec_dict, version), base_module='tests')
+        for version in ('v1', 'v2')
+    ]
+    multi_oas = MultiOAS(oases, intern=False)
+
+    assert multi_oas.interner is None
+    v1, v2 = (oas.spec.data['components']['schemas'] for oas in oases)
+    assert v1['Pet'] is not v2['Pet']
+
+
+def test_multi_oas_duplicate_path(spec_dict):
+    multi_oas = MultiOAS(
+        [OAS(spec_dict, base_module='tests') for _ in range(2)]
+    )
+
+    with pytest.raises(ValueError):
+        multi_oas.create_api()
+
+
+def test_multi_oas_reload(spec_dict):
+    oases = [
+        OAS(create_version(spec_dict, version), base_module='tests')
+        for version in ('v1', 'v2')
+    ]
+    multi_oas = MultiOAS(oases)
+    client = testing.TestClient(multi_oas.create_api())
+
+    new_spec_dict = create_version(spec_dict, 'v2')
+    paths = new_spec_dict['paths']
+    paths['/v2/cats/{pet_id}'] = copy.deepcopy(paths['/v2/pets/{pet_id}'])
+    oases[1].reload(new_spec_dict)
+
+    # The new path is secured by the middleware of the reloaded spec.
+    response = client.simulate_delete(path='/api/v2/cats/42')
+    assert response.status == falcon.HTTP_FORBIDDEN
+
+    response = client.simulate_delete(
+        path='/api/v2/cats/42', headers={'Cookie': str('session=1')}
+    )
+    assert response.status == falcon.HTTP_NO_CONTENT
+
+
 def test_oas_with_resolvers(petstore_dict):
     oas = OAS(petstore_dict, base_module='tests')
     oas.resolve_path_item('/v1/pets', PetCollection())
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+
+from falcon_oas.instrumentation import HistogramCollector
+from falcon_oas.instrumentation import Observer
+from falcon_oas.instrumentation import Stopwatch
+
+
+def test_histogram_collector():
+    collector = HistogramCollector(buckets=(0.002, 0.001))
+    for duration_ns in (500000, 1000000, 1500000, 3000000):
+        collector.observe('/pets', 'get', 'lookup', duration_ns)
+    collector.observe('/pets', 'get', 'security', 1)
+
+    assert collector.buckets == (0.001, 0.002)
+    assert collector.snapshot() == {
+        ('/pets', 'get', 'lookup'): {
+            'buckets': [(0.001, 2), (0.002, 3), (float('inf'), 4)],
+            'count': 4,
+            'sum': 0.006,
+        },
+        ('/pets', 'get', 'security'): {
+            'buckets': [(0.001, 1), (0.002, 1), (float('inf'), 1)],
+            'count': 1,
+            'sum': 1e-09,
+        },
+    }
+
+    collector.reset()
+    assert collector.snapshot() == {}
+
+
+def test_observer():
+    with pytest.raises(TypeError):
+        Observer()
+
+
+def test_stopwatch(mocker):
+    mocker.patch(
+        'falcon_oas.instrumentation.clock', side_effect=[10, 15, 30, 40]
+    )
+    observer = mocker.Mock()
+
+    stopwatch = Stopwatch(observer, '/pets', 'get')
+    stopwatch.lap('lookup')
+    stopwatch.restart()
+    stopwatch.lap('security')
+
+    assert observer.observe.call_args_list == [
+        mocker.call('/pets', 'get', 'lookup', 5),
+        mocker.call('/pets', 'get', 'security', 10),
+    ]
@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import copy
+
+from oas import create_spec_from_dict
+
+from falcon_oas.interning import count_objects
+from falcon_oas.interning import SchemaInterner
+
+
+def create_versions(petstore_dict):
+    """Return the specs of v1, v2 and v3 which share most schemas."""
+    specs = []
+    for version in ('v1', 'v2', 'v3'):
+        spec_dict = copy.deepcopy(petstore_dict)
+        spec_dict['paths'] = {
+            path.replace('/v1/', '/{}/'.format(version)): path_item
+            for path, path_item in spec_dict['paths'].items()
+        }
+        if version == 'v3':
+            properties = spec_dict['components']['schemas']['PetUpdate'][
+                'properties'
+            ]
+            properties['tag'] = {'type': 'string'}
+        specs.append(create_spec_from_dict(spec_dict))
+    return specs
+
+
+def test_intern():
+    interner = SchemaInterner()
+    a = {'type': 'object', 'properties': {'id': {'type': 'integer'}}}
+    b = {'properties': {'id': {'type': 'integer'}}, 'type': 'object'}
+    c = {'type': 'object', 'properties': {'id': {'type': 'number'}}}
+
+    assert interner.intern(a) is a
+    assert interner.intern(b) is a
+    assert interner.intern(c) is c
+    assert c['properties']['id'] is not a['properties']['id']
+    # Each of the dicts of ``b`` is a hit.
+    assert interner.hits == 3
+
+
+def test_intern_distinguishes_types():
+    interner = SchemaInterner()
+    schemas = [{'enum': [1]}, {'enum': [1.0]}, {'enum': [True]}]
+
+    assert [interner.intern(schema) for schema in schemas] == schemas
+    assert interner.hits == 0
+
+
+def test_intern_recursive_schema():
+    interner = SchemaInterner()
+    schema = {'type': 'object', 'properties': {}}
+    schema['properties']['child'] = schema
+
+    assert interner.intern(schema) is schema
+    assert schema['properties']['child'] is schema
+
+
+def test_intern_spec(petstore_dict):
+    v1, v2, v3 = create_versions(petstore_dict)
+    before = count_objects([v1, v2, v3])
+
+    interner = SchemaInterner()
+    for spec in (v1, v2, v3):
+        interner.intern_spec(spec)
+
+    schemas = [spec.data['components']['schemas'] for spec in (v1, v2, v3)]
+    assert schemas[0]['Pet'] is schemas[1]['Pet']
+    assert schemas[0]['PetUpdate'] is not schemas[2]['PetUpdate']
+    # The unchanged parts of the changed schema are still shared.
+    assert (
+        schemas[0]['PetUpdate']['properties']['name']
+        is schemas[2]['PetUpdate']['properties']['name']
+    )
+
+    # The resolved schemas of the operations are shared too.
+    operation = v1.data['paths']['/v1/pets']['post']
+    assert (
+        operation['requestBody']['content']['application/json']['schema']
+        is schemas[0]['PetNew']
+    )
+
+    assert count_objects([v1, v2, v3]) < before
+
+
+def test_intern_spec_does_not_share_path_items(petstore_dict):
+    v1, v2, _ = create_versions(petstore_dict)
+
+    interner = SchemaInterner()
+    interner.intern_spec(v1)
+    interner.intern_spec(v2)
+
+    assert v1.data['paths']['/v1/pets'] is not v2.data['paths']['/v2/pets']
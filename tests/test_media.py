@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import io
+import json
+
+import falcon
+import pytest
+
+from falcon_oas.media import create_json_handler
+from falcon_oas.media import JSONHandler
+from falcon_oas.media import LIBRARIES
+
+media = {'name': 'モモ', 'url': 'https://example.com/', 'tags': [1, None]}
+
+
+@pytest.mark.parametrize('library', LIBRARIES)
+def test_json_handler(library):
+    pytest.importorskip(library)
+    handler = create_json_handler(library)
+
+    data = handler.serialize(media, 'application/json')
+    assert isinstance(data, bytes)
+    assert json.loads(data.decode('utf-8')) == media
+
+    # Falcon 2 passes the stream.
+    stream = io.BytesIO(data)
+    assert handler.deserialize(stream, 'application/json', len(data)) == media
+    # Falcon 1 passes the bytes.
+    assert handler.deserialize(data) == media
+
+
+@pytest.mark.parametrize('library', LIBRARIES)
+def test_json_handler_invalid(library):
+    pytest.importorskip(library)
+    handler = create_json_handler(library)
+
+    with pytest.raises(falcon.HTTPBadRequest):
+        handler.deserialize(b'{')
+
+
+def test_create_json_handler_default(mocker):
+    import_module = mocker.patch(
+        'importlib.import_module',
+        side_effect=[ImportError, ImportError, ImportError, json],
+    )
+
+    handler = create_json_handler()
+
+    assert isinstance(handler, JSONHandler)
+    assert handler.deserialize(b'{"a": 1}') == {'a': 1}
+    assert [args[0] for args, _ in import_module.call_args_list] == list(
+        LIBRARIES
+    )
@@ -4,7 +4,10 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import copy
+
 import falcon
+import oas
 import pytest
 from falcon import testing
 from oas import create_spec_from_dict
@@ -13,12 +16,19 @@ from oas.exceptions import UnmarshalError
 
 import falcon_oas
 from falcon_oas import extensions
+from falcon_oas.exceptions import RateLimitError
 from falcon_oas.exceptions import SecurityError
 from falcon_oas.middlewares import _get_security_schemes
 from falcon_oas.middlewares import _RequestAdapter
+from falcon_oas.ratelimits import RateLimiter
+
+
+class User(object):
+    # Identify the user by the rate limiter.
+    id = 42
 
 
-USER = object()
+USER = User()
 
 
 def api_key_validator(value, scopes, request):
@@ -52,10 +62,10 @@ def resource():
     return Resource()
 
 
-def create_app(spec_dict):
+def create_app(spec_dict, **options):
     spec = create_spec_from_dict(spec_dict)
     app = falcon.API(
-        middleware=[falcon_oas.Middleware(spec)],
+        middleware=[falcon_oas.Middleware(spec, **options)],
         request_type=falcon_oas.Request,
     )
     return app
@@ -165,6 +175,146 @@ def test_security_error(resource, petstore_dict_with_implementation):
     assert resource.called is False
 
 
+def test_rate_limiter(resource, petstore_dict_with_implementation):
+    security_schemes = petstore_dict_with_implementation['components'][
+        'securitySchemes'
+    ]
+    security_schemes['session'][extensions.RATE_LIMIT] = {'limit': 1}
+    app = create_app(
+        petstore_dict_with_implementation, rate_limiter=RateLimiter()
+    )
+    app.add_route('/api/v1/pets', resource)
+
+    client = testing.TestClient(app)
+
+    response = client.simulate_post(
+        path='/api/v1/pets',
+        headers={'Cookie': str('session=1')},
+        json={'name': 'momo'},
+    )
+    assert response.status == falcon.HTTP_OK
+
+    # Other clients have their own buckets.
+    response = client.simulate_post(
+        path='/api/v1/pets',
+        headers={'X-API-Key': str('secret')},
+        json={'name': 'momo'},
+    )
+    assert response.status == falcon.HTTP_OK
+
+    with pytest.raises(RateLimitError):
+        client.simulate_post(
+            path='/api/v1/pets',
+            headers={'Cookie': str('session=1')},
+            json={'name': 'momo'},
+        )
+
+
+class Executor(object):
+    def __init__(self):
+        self.calls = 0
+        self.items = []
+
+    def map(self, fn, iterable):
+        self.calls += 1
+        self.items.extend(iterable)
+        # Run in the reverse order to check that the results are merged
+        # in the original order.
+        return reversed([fn(item) for item in reversed(self.items)])
+
+
+def test_compile_with_executor(petstore_dict):
+    spec = create_spec_from_dict(petstore_dict)
+    executor = Executor()
+    middleware = falcon_oas.Middleware(spec, compiled=True, executor=executor)
+
+    assert executor.calls == 1
+    # Only the distinct schemas are sent to the executor.
+    schema_report = middleware.schema_unmarshaler.schema_report()
+    assert len(executor.items) == len(schema_report)
+    report = middleware.compile_report()
+    assert set(
+        (uri_template, method) for uri_template, method, _ in report
+    ) == set(middleware.operations.iter_routes())
+    durations = [seconds for _, _, seconds in report]
+    assert durations == sorted(durations, reverse=True)
+
+    schema_unmarshaler = middleware.schema_unmarshaler
+    for operation in middleware.operations.iter_operations():
+        for parameter_spec_dict in operation['parameters']:
+            assert schema_unmarshaler.compile(parameter_spec_dict['schema'])
+
+
+def test_compile_report_without_compiled(petstore_dict):
+    spec = create_spec_from_dict(petstore_dict)
+
+    assert falcon_oas.Middleware(spec).compile_report() == []
+
+
+def test_multi_middleware(mocker):
+    middlewares = [mocker.Mock(_reload_hooks=[]) for _ in range(2)]
+    snapshots = [middleware._snapshot for middleware in middlewares]
+    snapshots[0].operations.iter_routes.return_value = [
+        ('/v1/pets', 'get'),
+        ('/v1/pets', 'post'),
+    ]
+    snapshots[0].routes = {'/v1/pets/{pet_id:int}': ('/v1/pets/{pet_id}',)}
+    snapshots[0].removed = frozenset()
+    snapshots[1].operations.iter_routes.return_value = [('/v2/pets', 'get')]
+    snapshots[1].routes = {}
+    snapshots[1].removed = frozenset(['/v2/cats'])
+    multi_middleware = falcon_oas.middlewares.MultiMiddleware(middlewares)
+
+    for uri_template, index in (
+        ('/v1/pets/{pet_id:int}', 0),
+        ('/v2/pets', 1),
+        ('/v2/cats', 1),
+    ):
+        for middleware in middlewares:
+            middleware.reset_mock()
+        req = mocker.Mock(uri_template=uri_template)
+        multi_middleware.process_resource(req, 'resp', 'resource', {})
+        multi_middleware.process_response(req, 'resp', 'resource', True)
+
+        assert middlewares[1 - index].process_resource.call_count == 0
+        middlewares[index].process_resource.assert_called_once_with(
+            req, 'resp', 'resource', {}
+        )
+        middlewares[index].process_response.assert_called_once_with(
+            req, 'resp', 'resource', True
+        )
+
+    # Undocumented routes
+    req = mocker.Mock(uri_template='/v3/pets')
+    multi_middleware.process_resource(req, 'resp', 'resource', {})
+    multi_middleware.process_response(req, 'resp', 'resource', True)
+
+
+def test_multi_middleware_reload(petstore_dict):
+    v2_dict = copy.deepcopy(petstore_dict)
+    v2_dict['servers'] = [{'url': '/api/v2'}]
+    middlewares = [
+        falcon_oas.Middleware(create_spec_from_dict(spec_dict))
+        for spec_dict in (petstore_dict, v2_dict)
+    ]
+    multi_middleware = falcon_oas.middlewares.MultiMiddleware(middlewares)
+
+    new_dict = copy.deepcopy(v2_dict)
+    new_dict['paths']['/v1/cats'] = new_dict['paths'].pop('/v1/pets')
+    middlewares[1].reload(create_spec_from_dict(new_dict))
+    table = multi_middleware._middlewares
+    assert table['/api/v2/v1/cats'] is middlewares[1]
+    # The removed path responds 404 Not Found by the middleware.
+    assert table['/api/v2/v1/pets'] is middlewares[1]
+
+    # The duplicate path rejects the reload.
+    new_dict['servers'] = [{'url': '/api'}]
+    with pytest.raises(ValueError):
+        middlewares[1].reload(create_spec_from_dict(new_dict))
+    assert table is multi_middleware._middlewares
+    assert ('/api/v2/v1/cats', 'get', None) in middlewares[1].operations
+
+
 def test_unmarshal_request(resource, petstore_dict):
     app = create_app(petstore_dict)
     app.add_route('/api/v1/pets/{pet_id}', resource)
@@ -197,6 +347,21 @@ def test_unmarshal_request(resource, petstore_dict):
     assert req.oas_media == {'name': 'momo'}
 
 
+def test_schema_unmarshaler_is_shared(resource, petstore_dict):
+    app = create_app(petstore_dict)
+    app.add_route('/api/v1/pets/{pet_id}', resource)
+
+    client = testing.TestClient(app)
+
+    schema_unmarshalers = set()
+    for pet_id in ('1', '2'):
+        client.simulate_get(path='/api/v1/pets/' + pet_id)
+        context = resource.captured_req.context['oas']
+        schema_unmarshalers.add(id(context.schema_unmarshaler))
+
+    assert len(schema_unmarshalers) == 1
+
+
 def test_unmarshal_request_error(resource, petstore_dict):
     app = create_app(petstore_dict)
     app.add_route('/api/v1/pets/{pet_id}', resource)
@@ -209,6 +374,249 @@ def test_unmarshal_request_error(resource, petstore_dict):
     assert resource.called is False
 
 
+def test_lazy_unmarshal_request(mocker, resource, petstore_dict):
+    unmarshal_parameters = mocker.patch(
+        'falcon_oas.middlewares.unmarshal_parameters',
+        wraps=oas.parameters.unmarshalers.unmarshal_parameters,
+    )
+    unmarshal_request_body = mocker.patch(
+        'falcon_oas.middlewares.unmarshal_request_body',
+        wraps=oas.request_body.unmarshalers.unmarshal_request_body,
+    )
+    app = create_app(petstore_dict, lazy=True)
+    app.add_route('/api/v1/pets/{pet_id}', resource)
+
+    client = testing.TestClient(app)
+
+    response = client.simulate_patch(
+        path='/api/v1/pets/42',
+        query_string=str('page=1'),
+        headers={'X-API-Version': str('v2'), 'Cookie': str('tracking=xxx')},
+        json={'name': 'momo'},
+    )
+
+    assert response.status == falcon.HTTP_OK
+    assert resource.captured_kwargs['pet_id'] == 42
+    # Only path parameters are unmarshaled before the responder.
+    assert unmarshal_parameters.call_count == 1
+    assert unmarshal_request_body.called is False
+
+    req = resource.captured_req
+    assert req.oas_query == {'page': 1}
+    assert req.oas_query == {'page': 1}
+    assert unmarshal_parameters.call_count == 2
+
+    assert req.oas_header == {'X-API-Version': 'v2'}
+    assert req.oas_cookie == {'tracking': 'xxx'}
+    assert req.oas_media == {'name': 'momo'}
+    assert req.oas_media == {'name': 'momo'}
+    assert unmarshal_request_body.call_count == 1
+
+
+def test_lazy_unmarshal_request_without_request_body(resource, petstore_dict):
+    app = create_app(petstore_dict, lazy=True)
+    app.add_route('/api/v1/pets/{pet_id}', resource)
+
+    client = testing.TestClient(app)
+    client.simulate_get(path='/api/v1/pets/42')
+
+    req = resource.captured_req
+    assert req.oas_query == {}
+    assert req.oas_media is None
+
+
+@pytest.mark.parametrize(
+    'kwargs,expected',
+    [
+        ({'query_string': str('page=x')}, 'parameters'),
+        ({'json': {'name': 42}}, 'request_body'),
+    ],
+)
+def test_lazy_unmarshal_request_error(
+    resource, petstore_dict, kwargs, expected
+):
+    kwargs.setdefault('json', {})
+    app = create_app(petstore_dict)
+    app.add_route('/api/v1/pets/{pet_id}', resource)
+    client = testing.TestClient(app)
+    with pytest.raises(UnmarshalError) as eager:
+        client.simulate_patch(path='/api/v1/pets/42', **kwargs)
+
+    app = create_app(petstore_dict, lazy=True)
+    app.add_route('/api/v1/pets/{pet_id}', resource)
+    client = testing.TestClient(app)
+    client.simulate_patch(path='/api/v1/pets/42', **kwargs)
+
+    req = resource.captured_req
+    with pytest.raises(UnmarshalError) as lazy:
+        req.oas_query
+        req.oas_media
+
+    assert list(lazy.value.to_dict()) == [expected]
+    assert lazy.value.to_dict() == eager.value.to_dict()
+    errors = lazy.value.parameter_errors or lazy.value.request_body_errors
+    eager_errors = (
+        eager.value.parameter_errors or eager.value.request_body_errors
+    )
+    assert [error.schema_path for error in errors] == [
+        error.schema_path for error in eager_errors
+    ]
+
+
+def test_lazy_unmarshal_path_parameters_error(resource, petstore_dict):
+    app = create_app(petstore_dict, lazy=True)
+    app.add_route('/api/v1/pets/{pet_id}', resource)
+
+    client = testing.TestClient(app)
+
+    with pytest.raises(UnmarshalError):
+        client.simulate_get(path='/api/v1/pets/xxx')
+
+    assert resource.called is False
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_converted_path_parameters(mocker, resource, petstore_dict, lazy):
+    path_item = petstore_dict['paths']['/v1/pets/{pet_id}']
+    # Put the path parameter before the others in the operation.
+    path_item['patch']['parameters'].insert(0, path_item['parameters'][0])
+    unmarshal_parameters = mocker.patch(
+        'falcon_oas.middlewares.unmarshal_parameters',
+        wraps=oas.parameters.unmarshalers.unmarshal_parameters,
+    )
+    app = create_app(petstore_dict, converters=True, lazy=lazy)
+    app.add_route('/api/v1/pets/{pet_id:int}', resource)
+
+    client = testing.TestClient(app)
+
+    response = client.simulate_patch(
+        path='/api/v1/pets/42',
+        query_string=str('page=1'),
+        json={'name': 'momo'},
+    )
+
+    assert response.status == falcon.HTTP_OK
+    req = resource.captured_req
+    assert req.context['oas'].parameters['path'] == {'pet_id': 42}
+    assert req.context['oas'].parameters['query'] == {'page': 1}
+    assert resource.captured_kwargs['pet_id'] == 42
+    for args, _ in unmarshal_parameters.call_args_list:
+        assert [p for p in args[2] if p['in'] == 'path'] == []
+
+    with pytest.raises(UnmarshalError) as e:
+        client.simulate_patch(
+            path='/api/v1/pets/42',
+            query_string=str('page=x'),
+            json={'name': 'momo'},
+        )
+        # Lazy parameters are unmarshaled on access.
+        resource.captured_req.context['oas'].parameters['query']
+
+    # The errors point to the parameters in the operation.
+    schema_paths = [
+        list(error.schema_path) for error in e.value.parameter_errors
+    ]
+    assert schema_paths == [['parameters', 1, 'schema', 'type']]
+
+
+class Recorder(object):
+    def __init__(self):
+        self.phases = []
+
+    def observe(self, uri_template, method, phase, duration_ns):
+        assert uri_template == '/api/v1/pets/{pet_id}'
+        assert method == 'patch'
+        assert duration_ns >= 0
+        self.phases.append(phase)
+
+
+@pytest.mark.parametrize(
+    'lazy,expected',
+    [
+        (False, ['lookup', 'security', 'parameters', 'request_body']),
+        (True, ['lookup', 'security', 'parameters']),
+    ],
+)
+def test_observer(resource, petstore_dict, lazy, expected):
+    recorder = Recorder()
+    app = create_app(petstore_dict, lazy=lazy, observer=recorder)
+    app.add_route('/api/v1/pets/{pet_id}', resource)
+
+    client = testing.TestClient(app)
+    client.simulate_patch(path='/api/v1/pets/42', json={'name': 'momo'})
+
+    assert recorder.phases == expected
+
+    resource.captured_req.oas_media
+    assert recorder.phases[len(expected) :] == ['request_body'] * lazy
+
+
+def test_observer_unmarshal_request_error(resource, petstore_dict):
+    kwargs = {'query_string': str('page=x'), 'json': {'name': 42}}
+    errors = []
+    for observer in (None, Recorder()):
+        app = create_app(petstore_dict, observer=observer)
+        app.add_route('/api/v1/pets/{pet_id}', resource)
+        client = testing.TestClient(app)
+
+        with pytest.raises(UnmarshalError) as exc_info:
+            client.simulate_patch(path='/api/v1/pets/42', **kwargs)
+        errors.append(exc_info.value.to_dict())
+
+    assert errors[0] == errors[1]
+
+
+@pytest.mark.parametrize('lazy', [False, True])
+def test_observer_disabled(mocker, resource, petstore_dict, lazy):
+    # The budget of the disabled path is no clock reads at all.
+    clock = mocker.patch(
+        'falcon_oas.instrumentation.clock', side_effect=AssertionError
+    )
+    app = create_app(petstore_dict, lazy=lazy)
+    app.add_route('/api/v1/pets/{pet_id}', resource)
+
+    client = testing.TestClient(app)
+    response = client.simulate_patch(
+        path='/api/v1/pets/42', json={'name': 'momo'}
+    )
+    resource.captured_req.oas_media
+
+    assert response.status == falcon.HTTP_OK
+    assert clock.called is False
+
+
+@pytest.mark.parametrize(
+    'options,extension,status',
+    [
+        ({}, None, falcon.HTTP_OK),
+        ({'max_content_length': 1024}, None, falcon.HTTP_OK),
+        ({'max_content_length': 16}, None, falcon.HTTP_413),
+        ({}, 16, falcon.HTTP_413),
+        ({'max_content_length': 16}, 1024, falcon.HTTP_OK),
+    ],
+)
+def test_max_content_length(
+    mocker, resource, petstore_dict, options, extension, status
+):
+    if extension is not None:
+        operation = petstore_dict['paths']['/v1/pets/{pet_id}']['patch']
+        operation['requestBody'][extensions.MAX_CONTENT_LENGTH] = extension
+    unmarshal_request = mocker.patch(
+        'falcon_oas.middlewares.unmarshal_request', wraps=oas.unmarshal_request
+    )
+    app = create_app(petstore_dict, **options)
+    app.add_route('/api/v1/pets/{pet_id}', resource)
+
+    client = testing.TestClient(app)
+    response = client.simulate_patch(
+        path='/api/v1/pets/42', json={'name': 'x' * 32}
+    )
+
+    assert response.status == status
+    assert resource.called is (status == falcon.HTTP_OK)
+    assert unmarshal_request.called is (status == falcon.HTTP_OK)
+
+
 def test_get_security_schemes(petstore_dict_with_implementation):
     spec_dict = petstore_dict_with_implementation
     security_schemes = spec_dict['components']['securitySchemes']
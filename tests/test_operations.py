@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import pytest
+from oas import create_spec_from_dict
+from oas.exceptions import UndocumentedMediaType
+
+from falcon_oas.operations import OperationTable
+
+
+@pytest.fixture
+def table(petstore_dict):
+    return OperationTable(create_spec_from_dict(petstore_dict))
+
+
+def test_operation_table(table):
+    assert set(table) == {
+        ('/api/v1/pets', 'get', None),
+        ('/api/v1/pets', 'post', 'application/json'),
+        ('/api/v1/pets/{pet_id}', 'get', None),
+        ('/api/v1/pets/{pet_id}', 'patch', 'application/json'),
+        ('/api/v1/pets/{pet_id}', 'delete', None),
+    }
+    assert set(table.iter_routes()) == {
+        ('/api/v1/pets', 'get'),
+        ('/api/v1/pets', 'post'),
+        ('/api/v1/pets/{pet_id}', 'get'),
+        ('/api/v1/pets/{pet_id}', 'patch'),
+        ('/api/v1/pets/{pet_id}', 'delete'),
+    }
+
+
+@pytest.mark.parametrize(
+    'uri_template,method,media_type',
+    [
+        ('/api/v1/pets', 'get', None),
+        ('/api/v1/pets', 'get', 'text/plain'),
+        ('/api/v1/pets', 'post', 'application/json'),
+        ('/api/v1/pets/{pet_id}', 'get', None),
+        ('/api/v1/pets/{pet_id}', 'patch', 'application/json'),
+        ('/api/v1/pets/{pet_id}', 'delete', None),
+    ],
+)
+def test_operation_table_getitem_equals_spec(
+    petstore_dict, table, uri_template, method, media_type
+):
+    spec = create_spec_from_dict(petstore_dict)
+    expected = spec.get_operation(uri_template, method, media_type)
+
+    assert table[uri_template, method, media_type] == expected
+
+
+def test_operation_table_getitem_returns_same_object(table):
+    operation = table['/api/v1/pets/{pet_id}', 'get', None]
+
+    assert table['/api/v1/pets/{pet_id}', 'get', 'text/plain'] is operation
+    assert ('/api/v1/pets/{pet_id}', 'get', 'text/plain') not in table
+
+
+@pytest.mark.parametrize(
+    'uri_template,method',
+    [('/api/v1/pets', 'delete'), ('/api/v1/owners', 'get'), ('/', 'get')],
+)
+def test_operation_table_getitem_undocumented(table, uri_template, method):
+    assert table[uri_template, method, None] is None
+
+
+@pytest.mark.parametrize('media_type', [None, 'text/plain'])
+def test_operation_table_getitem_undocumented_media_type(table, media_type):
+    with pytest.raises(UndocumentedMediaType):
+        table['/api/v1/pets', 'post', media_type]
+
+
+def test_operation_table_parameters_override():
+    spec = create_spec_from_dict(
+        {
+            'paths': {
+                '/users/{id}': {
+                    'parameters': [
+                        {'name': 'id', 'in': 'path', 'required': True},
+                        {'name': 'page', 'in': 'query'},
+                    ],
+                    'get': {
+                        'parameters': [
+                            {'name': 'id', 'in': 'path', 'schema': {}}
+                        ]
+                    },
+                }
+            },
+            'security': [{'api_key': []}],
+        }
+    )
+    table = OperationTable(spec)
+
+    operation = table['/users/{id}', 'get', None]
+    assert operation['parameters'] == [
+        {'name': 'id', 'in': 'path', 'schema': {}},
+        {'name': 'page', 'in': 'query'},
+    ]
+    assert operation['security'] == [{'api_key': []}]
+
+
+def test_operation_table_without_paths():
+    table = OperationTable(create_spec_from_dict({}))
+
+    assert len(table) == 0
+    assert table['/', 'get', None] is None
+
+
+def test_operation_table_previous(petstore_dict, table):
+    petstore_dict['paths']['/v1/pets']['get']['description'] = 'changed'
+    new_table = OperationTable(
+        create_spec_from_dict(petstore_dict), previous=table
+    )
+
+    # Unchanged
+    key = '/api/v1/pets/{pet_id}', 'get', None
+    assert new_table[key] is table[key]
+    key = '/api/v1/pets', 'post', 'application/json'
+    assert new_table[key] is table[key]
+
+    # Changed
+    key = '/api/v1/pets', 'get', None
+    assert new_table[key] is not table[key]
+    assert new_table[key]['description'] == 'changed'
+
+
+def test_operation_table_previous_recursive_schema(petstore_dict):
+    schemas = petstore_dict['components']['schemas']
+    schemas['PetUpdate']['properties']['parent'] = {
+        '$ref': '#/components/schemas/Pet'
+    }
+    table = OperationTable(create_spec_from_dict(petstore_dict))
+    new_table = OperationTable(
+        create_spec_from_dict(petstore_dict), previous=table
+    )
+
+    key = '/api/v1/pets/{pet_id}', 'get', None
+    assert new_table[key] is table[key]
@@ -4,14 +4,22 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import json
+
 import falcon
 import pytest
 from falcon import testing
 from oas.exceptions import UnmarshalError
 
+from falcon_oas.exceptions import RateLimitError
+from falcon_oas.problems import create_problem_serializer
 from falcon_oas.problems import http_error_handler
 from falcon_oas.problems import Problem
+from falcon_oas.problems import rate_limit_error_handler
+from falcon_oas.problems import security_error_handler
 from falcon_oas.problems import serialize_problem
+from falcon_oas.problems import StaticProblem
+from falcon_oas.problems import undocumented_media_type_handler
 from falcon_oas.problems import unmarshal_error_handler
 from falcon_oas.problems import UNMARSHAL_PROBLEM_TYPE_URI
 
@@ -53,7 +61,11 @@ def test_serialize_problem():
 
     serialize_problem(req, resp, problem)
 
-    assert resp.data == b'{"title": "Bad Request", "status": 400}'
+    # The encoder depends on the available JSON libraries.
+    assert json.loads(resp.data.decode('utf-8')) == {
+        'title': 'Bad Request',
+        'status': 400,
+    }
     assert resp.content_type == 'application/problem+json'
     assert resp.get_header('Vary') == 'Accept'
 
@@ -80,6 +92,48 @@ def test_serialize_problem_accept_html():
     assert resp.content_type == 'application/json'
 
 
+def test_create_problem_serializer(mocker):
+    dumps = mocker.Mock(return_value=b'{}')
+    serialize = create_problem_serializer(dumps=dumps)
+    req = falcon.Request(testing.create_environ())
+
+    for _ in range(2):
+        for problem in (
+            StaticProblem(falcon.HTTP_FORBIDDEN),
+            Problem(falcon.HTTP_BAD_REQUEST, title='Unmarshal Error'),
+        ):
+            resp = falcon.Response()
+            serialize(req, resp, problem)
+            assert resp.data == b'{}'
+            assert resp.content_type == 'application/problem+json'
+
+    # The static problem is encoded only once.
+    assert dumps.call_args_list == [
+        mocker.call({'title': 'Forbidden', 'status': 403}),
+        mocker.call({'title': 'Unmarshal Error', 'status': 400}),
+        mocker.call({'title': 'Unmarshal Error', 'status': 400}),
+    ]
+
+
+@pytest.mark.parametrize(
+    'handler,status',
+    [
+        (security_error_handler, falcon.HTTP_FORBIDDEN),
+        (undocumented_media_type_handler, falcon.HTTP_BAD_REQUEST),
+    ],
+)
+def test_static_problem_handlers(handler, status):
+    req = falcon.Request(testing.create_environ())
+
+    with pytest.raises(StaticProblem) as excinfo:
+        handler(Exception(), req, falcon.Response(), {})
+
+    assert excinfo.value.to_dict() == {
+        'title': status[4:],
+        'status': int(status[:3]),
+    }
+
+
 def test_http_error_handler():
     http_error = falcon.HTTPBadRequest()
     req = falcon.Request(testing.create_environ())
@@ -90,6 +144,20 @@ def test_http_error_handler():
         http_error_handler(http_error, req, resp, params)
 
 
+@pytest.mark.parametrize('retry_after,expected', [(0.1, '1'), (5.5, '6')])
+def test_rate_limit_error_handler(retry_after, expected):
+    req = falcon.Request(testing.create_environ())
+
+    with pytest.raises(Problem) as excinfo:
+        rate_limit_error_handler(
+            RateLimitError(retry_after), req, falcon.Response(), {}
+        )
+
+    assert excinfo.value.status == falcon.HTTP_429
+    assert excinfo.value.title == 'Too Many Requests'
+    assert excinfo.value.headers == {'Retry-After': expected}
+
+
 def test_unmarshal_error_handler():
     unmarshal_error = UnmarshalError()
     req = falcon.Request(testing.create_environ())
@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import threading
+
+import pytest
+
+from falcon_oas import extensions
+from falcon_oas.exceptions import RateLimitError
+from falcon_oas.ratelimits import default_key
+from falcon_oas.ratelimits import MemoryBackend
+from falcon_oas.ratelimits import RateLimiter
+
+
+class Timer(object):
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def timer():
+    return Timer()
+
+
+def test_memory_backend(timer):
+    backend = MemoryBackend(timer=timer)
+
+    assert backend.consume('a', 1, 2) == 0
+    assert backend.consume('a', 1, 2) == 0
+    assert backend.consume('a', 1, 2) == 1
+    # Other keys have their own buckets.
+    assert backend.consume('b', 1, 2) == 0
+
+    timer.now = 0.5
+    assert backend.consume('a', 1, 2) == 0.5
+
+    timer.now = 1
+    assert backend.consume('a', 1, 2) == 0
+    assert backend.consume('a', 1, 2) == 1
+
+
+def test_memory_backend_capacity(timer):
+    backend = MemoryBackend(timer=timer)
+    assert backend.consume('a', 1, 1) == 0
+
+    # The tokens do not exceed the capacity.
+    timer.now = 10
+    assert backend.consume('a', 1, 1) == 0
+    assert backend.consume('a', 1, 1) == 1
+
+
+def test_memory_backend_removes_full_buckets(timer):
+    backend = MemoryBackend(stripes=1, maxsize=2, timer=timer)
+    backend.consume('a', 1, 2)
+    backend.consume('b', 1, 2)
+    assert len(backend) == 2
+
+    timer.now = 1
+    backend.consume('c', 1, 2)
+    assert len(backend) == 1
+
+
+def test_memory_backend_threads():
+    backend = MemoryBackend(stripes=4)
+    results = []
+
+    def consume():
+        for _ in range(100):
+            results.append(backend.consume('a', 1e-9, 200))
+
+    threads = [threading.Thread(target=consume) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results.count(0) == 200
+
+
+def test_default_key(mocker):
+    req = mocker.Mock(remote_addr='127.0.0.1')
+    assert default_key(req, None) == '127.0.0.1'
+    assert default_key(req, 'alice') == 'alice'
+    assert default_key(req, 42) == 42
+    assert default_key(req, {'id': 42, 'name': 'alice'}) == 42
+    assert default_key(req, mocker.Mock(id=42)) == 42
+    # Users which cannot be identified
+    assert default_key(req, True) == '127.0.0.1'
+    assert default_key(req, {'name': 'alice'}) == '127.0.0.1'
+    assert default_key(req, object()) == '127.0.0.1'
+
+
+def test_rate_limiter_per_request_users(mocker, timer):
+    limiter = RateLimiter(MemoryBackend(timer=timer))
+    operation = {'security': None, extensions.RATE_LIMIT: {'limit': 2}}
+    limiter.compile('/pets', 'get', operation, None)
+    req = mocker.Mock(remote_addr='127.0.0.1')
+
+    # The users are created per request.
+    for _ in range(2):
+        limiter.check(req, operation, {'id': 42})
+    with pytest.raises(RateLimitError):
+        limiter.check(req, operation, {'id': 42})
+    limiter.check(req, operation, {'id': 43})
+
+
+def test_rate_limiter_unhashable_key(mocker, timer):
+    limiter = RateLimiter(
+        MemoryBackend(timer=timer), key=lambda req, user: user
+    )
+    operation = {'security': None, extensions.RATE_LIMIT: {'limit': 1}}
+    limiter.compile('/pets', 'get', operation, None)
+
+    limiter.check(mocker.Mock(), operation, {'name': 'alice'})
+    with pytest.raises(RateLimitError):
+        limiter.check(mocker.Mock(), operation, {'name': 'alice'})
+
+
+@pytest.mark.parametrize(
+    'options', [{'limit': 0}, {'limit': -1}, {'limit': 1, 'period': 0}]
+)
+def test_rate_limiter_invalid_limit(options):
+    limiter = RateLimiter()
+    operation = {'security': None, extensions.RATE_LIMIT: options}
+
+    with pytest.raises(ValueError):
+        limiter.compile('/pets', 'get', operation, None)
+
+
+@pytest.fixture
+def security_schemes():
+    return {
+        'api_key': {
+            'type': 'apiKey',
+            extensions.RATE_LIMIT: {'limit': 10, 'period': 60, 'burst': 1},
+        },
+        'session': {'type': 'apiKey'},
+    }
+
+
+def test_rate_limiter(mocker, timer, security_schemes):
+    limiter = RateLimiter(MemoryBackend(timer=timer))
+    operation = {
+        'security': [{'api_key': []}],
+        extensions.RATE_LIMIT: {'limit': 2},
+    }
+    limiter.compile('/pets', 'get', operation, security_schemes)
+    req = mocker.Mock(remote_addr='127.0.0.1')
+
+    limiter.check(req, operation, 'alice')
+    with pytest.raises(RateLimitError) as excinfo:
+        limiter.check(req, operation, 'alice')
+    assert excinfo.value.retry_after == 6
+
+    # Users have their own buckets.
+    limiter.check(req, operation, 'bob')
+
+
+def test_rate_limiter_shares_security_scheme(mocker, timer, security_schemes):
+    limiter = RateLimiter(MemoryBackend(timer=timer))
+    operations = [
+        {'security': [{'api_key': []}, {'api_key': [], 'session': []}]},
+        {'security': [{'api_key': []}]},
+    ]
+    for method, operation in zip(('get', 'post'), operations):
+        limiter.compile('/pets', method, operation, security_schemes)
+    req = mocker.Mock()
+
+    limiter.check(req, operations[0], 'alice')
+    with pytest.raises(RateLimitError):
+        limiter.check(req, operations[1], 'alice')
+
+
+def test_rate_limiter_without_limits(mocker, security_schemes):
+    backend = mocker.Mock()
+    limiter = RateLimiter(backend)
+    operation = {'security': [{'session': []}]}
+    limiter.compile('/pets', 'get', operation, security_schemes)
+    limiter.compile('/pets', 'post', {'security': None}, None)
+
+    limiter.check(mocker.Mock(), operation, None)
+    assert backend.consume.call_count == 0
+
+
+def test_rate_limiter_release(mocker):
+    backend = mocker.Mock()
+    backend.consume.return_value = 0
+    limiter = RateLimiter(backend)
+    operation = {'security': None, extensions.RATE_LIMIT: {'limit': 1}}
+    for _ in range(2):
+        limiter.compile('/pets', 'get', operation, None)
+
+    limiter.release(operation)
+    limiter.check(mocker.Mock(), operation, None)
+    assert backend.consume.call_count == 1
+
+    limiter.release(operation)
+    assert limiter._plans == {}
+    limiter.check(mocker.Mock(), operation, None)
+    assert backend.consume.call_count == 1
+
+
+def test_rate_limiter_key(mocker):
+    backend = mocker.Mock()
+    backend.consume.return_value = 0
+    limiter = RateLimiter(backend, key=lambda req, user: 'key')
+    operation = {
+        'security': None,
+        extensions.RATE_LIMIT: {'limit': 3, 'period': 2},
+    }
+    limiter.compile('/pets', 'get', operation, None)
+
+    limiter.check(mocker.Mock(), operation, None)
+    backend.consume.assert_called_once_with(('/pets', 'get', 'key'), 1.5, 3)
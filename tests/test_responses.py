@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import falcon
+import pytest
+from falcon import testing
+from oas import create_spec_from_dict
+
+import falcon_oas
+from falcon_oas.responses import ResponseValidator
+
+
+class Resource(object):
+    def __init__(self, status=falcon.HTTP_OK, media=None, **headers):
+        self.status = status
+        self.media = media
+        self.headers = headers
+
+    def on_get(self, req, resp, **params):
+        resp.status = self.status
+        resp.media = self.media
+        for name, value in self.headers.items():
+            resp.set_header(name, value)
+
+    def on_delete(self, req, resp, **params):
+        raise falcon.HTTPNotFound()
+
+
+class Executor(object):
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, fn, *args):
+        self.submitted.append((fn, args))
+
+
+def simulate(
+    spec_dict, resource, path='/api/v1/pets/42', converters=False, **options
+):
+    violations = []
+    response_validator = ResponseValidator(violations.append, **options)
+    spec = create_spec_from_dict(spec_dict)
+    app = falcon.API(
+        middleware=[
+            falcon_oas.Middleware(
+                spec,
+                response_validator=response_validator,
+                converters=converters,
+            )
+        ]
+    )
+    if converters:
+        app.add_route('/api/v1/pets/{pet_id:int}', resource)
+    else:
+        app.add_route('/api/v1/pets/{pet_id}', resource)
+    app.add_route('/api/v1/pets', resource)
+    app.add_route('/undocumented', resource)
+    testing.TestClient(app).simulate_get(path=path)
+    return violations
+
+
+def test_valid_response(petstore_dict):
+    resource = Resource(media={'id': 42, 'name': 'momo'})
+
+    assert simulate(petstore_dict, resource) == []
+
+
+def test_invalid_media(petstore_dict):
+    resource = Resource(media={'id': 'x'})
+
+    violations = simulate(petstore_dict, resource)
+
+    assert len(violations) == 1
+    assert violations[0].to_dict() == {
+        'uri_template': '/api/v1/pets/{pet_id}',
+        'method': 'get',
+        'status': 200,
+        'errors': [
+            {
+                'path': ['id'],
+                'validator': 'type',
+                'message': "'x' is not of type 'integer'",
+            },
+            {
+                'path': [],
+                'validator': 'required',
+                'message': "'name' is a required property",
+            },
+        ],
+    }
+
+
+@pytest.mark.parametrize('status', [falcon.HTTP_OK, falcon.HTTP_CONFLICT])
+def test_uri_template_with_converters(petstore_dict, status):
+    resource = Resource(status=status, media={'id': 'x'})
+
+    violations = simulate(petstore_dict, resource, converters=True)
+
+    assert violations[0].uri_template == '/api/v1/pets/{pet_id}'
+
+
+def test_undocumented_status(petstore_dict):
+    resource = Resource(status=falcon.HTTP_CONFLICT)
+
+    violations = simulate(petstore_dict, resource)
+
+    assert [error.validator for error in violations[0].errors] == ['responses']
+    assert violations[0].status == 409
+
+
+@pytest.mark.parametrize(
+    'key',
+    ['200', '2XX', 'default'],
+)
+def test_status_ranges(petstore_dict, key):
+    operation = petstore_dict['paths']['/v1/pets']['get']
+    operation['responses'] = {key: operation['responses']['200']}
+    resource = Resource(status=falcon.HTTP_OK, media=[{'id': 1}])
+
+    violations = simulate(petstore_dict, resource, path='/api/v1/pets')
+
+    assert [error.validator for error in violations[0].errors] == ['required']
+
+
+def test_undocumented_media_type(petstore_dict):
+    response = petstore_dict['paths']['/v1/pets/{pet_id}']['get']['responses']
+    content = response['200']['content']
+    content['application/hal+json'] = content.pop('application/json')
+    resource = Resource(media={'id': 42, 'name': 'momo'})
+
+    violations = simulate(petstore_dict, resource)
+
+    assert [error.validator for error in violations[0].errors] == ['content']
+
+
+def test_required_header(petstore_dict):
+    response = petstore_dict['paths']['/v1/pets/{pet_id}']['get']['responses']
+    response['200']['headers'] = {
+        'X-Rate-Limit': {'required': True, 'schema': {'type': 'integer'}},
+        'X-Optional': {'schema': {'type': 'integer'}},
+    }
+    media = {'id': 42, 'name': 'momo'}
+
+    violations = simulate(petstore_dict, Resource(media=media))
+    assert violations[0].to_dict()['errors'] == [
+        {
+            'path': ['headers', 'X-Rate-Limit'],
+            'validator': 'required',
+            'message': "'X-Rate-Limit' is a required header",
+        }
+    ]
+
+    resource = Resource(media=media, **{'X-Rate-Limit': str('1')})
+    assert simulate(petstore_dict, resource) == []
+
+
+def test_sample_rate(petstore_dict):
+    resource = Resource(media={'id': 'x'})
+
+    violations = simulate(
+        petstore_dict, resource, sample_rate=0.1, rand=lambda: 0.1
+    )
+    assert violations == []
+
+    violations = simulate(
+        petstore_dict, resource, sample_rate=0.1, rand=lambda: 0.09
+    )
+    assert len(violations) == 1
+
+
+def test_executor(petstore_dict):
+    executor = Executor()
+    resource = Resource(media={'id': 'x'})
+
+    violations = simulate(petstore_dict, resource, executor=executor)
+    assert violations == []
+    assert len(executor.submitted) == 1
+
+    fn, args = executor.submitted[0]
+    fn(*args)
+    assert len(violations) == 1
+
+
+def test_undocumented_request(petstore_dict):
+    resource = Resource(status=falcon.HTTP_CONFLICT)
+
+    assert simulate(petstore_dict, resource, path='/undocumented') == []
+
+
+def test_failed_request(petstore_dict):
+    violations = []
+    response_validator = ResponseValidator(violations.append)
+    spec = create_spec_from_dict(petstore_dict)
+    app = falcon.API(
+        middleware=[
+            falcon_oas.Middleware(spec, response_validator=response_validator)
+        ]
+    )
+    app.add_route('/api/v1/pets/{pet_id}', Resource())
+
+    client = testing.TestClient(app)
+    client.simulate_delete(
+        path='/api/v1/pets/42', headers={'Cookie': str('session=1')}
+    )
+
+    assert violations == []
@@ -4,14 +4,20 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import threading
+
+import falcon
+from falcon import testing
 from oas import create_spec_from_dict
 
 from falcon_oas import extensions
+from falcon_oas.routing import add_routes
 from falcon_oas.routing import generate_routes
 
 
 class Resource(object):
-    pass
+    def on_get(self, req, resp, **params):
+        resp.media = req.uri_template
 
 
 def test_generate_routes(petstore_dict):
@@ -21,3 +27,64 @@ def test_generate_routes(petstore_dict):
     spec = create_spec_from_dict(petstore_dict)
     routes = list(generate_routes(spec, base_module='tests'))
     assert routes == [('/api/v1/pets', Resource)]
+
+
+def test_generate_routes_with_converters(petstore_dict):
+    path_item = petstore_dict['paths']['/v1/pets/{pet_id}']
+    path_item[extensions.IMPLEMENTATION] = 'test_routing.Resource'
+
+    spec = create_spec_from_dict(petstore_dict)
+    routes = list(generate_routes(spec, base_module='tests', converters=True))
+    assert routes == [('/api/v1/pets/{pet_id:int}', Resource)]
+
+
+def test_add_routes():
+    api = falcon.API()
+    api.add_route('/pets/{pet_id}', Resource())
+    router = api._router
+
+    add_routes(api, [('/cats/{cat_id:int}', Resource())])
+
+    # The router is replaced with the copy.
+    assert api._router is not router
+    assert router.find('/cats/42') is None
+    client = testing.TestClient(api)
+    for path, uri_template in (
+        ('/pets/42', '/pets/{pet_id}'),
+        ('/cats/42', '/cats/{cat_id:int}'),
+    ):
+        assert client.simulate_get(path=path).json == uri_template
+
+
+def test_add_routes_concurrently():
+    api = falcon.API()
+    for i in range(50):
+        api.add_route('/pets{}/{{pet_id}}'.format(i), Resource())
+
+    stop = threading.Event()
+    results = []
+
+    def find():
+        while not stop.is_set():
+            # Route as ``falcon.API`` does without the overhead of the
+            # requests to interleave with adding the routes.
+            try:
+                route = api._router_search('/pets49/42', req=None)
+            except Exception as e:
+                results.append(repr(e))
+            else:
+                results.append(route and route[3])
+
+    threads = [threading.Thread(target=find) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    try:
+        for i in range(100):
+            add_routes(api, [('/cats{}/{{cat_id}}'.format(i), Resource())])
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    assert results
+    assert set(results) == {'/pets49/{pet_id}'}
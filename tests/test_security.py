@@ -6,6 +6,7 @@ from __future__ import unicode_literals
 
 import pytest
 
+from falcon_oas import extensions
 from falcon_oas.exceptions import SecurityError
 from falcon_oas.security import AccessControl
 
@@ -115,14 +116,241 @@ def test_unknown_security_scheme_name(mocker, access_control):
     assert access_control.handle(request, operation) is None
 
 
+def test_unsupported_security_scheme_type(mocker):
+    access_control = AccessControl({'test': ({'type': 'mutualTLS'}, None)})
+    request = mocker.MagicMock()
+    operation = {'security': [{'test': []}]}
+
+    assert access_control.handle(request, operation) is None
+
+
 @pytest.mark.parametrize(
-    'security_scheme_type', ['http', 'oauth2', 'openIdConnect']
+    'security_scheme,authorization,expected',
+    [
+        ({'type': 'http', 'scheme': 'bearer'}, 'Bearer token', 'token'),
+        ({'type': 'http', 'scheme': 'Bearer'}, 'bearer  token ', 'token'),
+        ({'type': 'http', 'scheme': 'bearer'}, 'Basic token', None),
+        ({'type': 'http', 'scheme': 'bearer'}, 'Bearer', None),
+        ({'type': 'http', 'scheme': 'bearer'}, None, None),
+        (
+            {'type': 'http', 'scheme': 'basic'},
+            'Basic dXNlcjpwYXNzOndvcmQ=',
+            ('user', 'pass:word'),
+        ),
+        ({'type': 'http', 'scheme': 'basic'}, 'Basic dXNlcg==', None),
+        ({'type': 'http', 'scheme': 'basic'}, 'Basic !', None),
+        ({'type': 'http', 'scheme': 'basic'}, 'Bearer token', None),
+        ({'type': 'http', 'scheme': 'basic'}, None, None),
+        ({'type': 'http', 'scheme': 'digest'}, 'Digest a=1', 'a=1'),
+        ({'type': 'oauth2', 'flows': {}}, 'Bearer token', 'token'),
+        ({'type': 'oauth2', 'flows': {}}, None, None),
+        (
+            {'type': 'openIdConnect', 'openIdConnectUrl': ''},
+            'Bearer token',
+            'token',
+        ),
+    ],
 )
-def test_unsupported_security_scheme_type(mocker, security_scheme_type):
+def test_authorization(mocker, security_scheme, authorization, expected):
+    satisfy = mocker.Mock(return_value=True)
+    access_control = AccessControl({'test': (security_scheme, satisfy)})
+    header = {} if authorization is None else {'Authorization': authorization}
+    request = mocker.MagicMock(header=header)
+    operation = {'security': [{'test': ['read']}]}
+
+    if expected is None:
+        with pytest.raises(SecurityError):
+            access_control.handle(request, operation)
+        assert satisfy.called is False
+    else:
+        assert access_control.handle(request, operation) is None
+        satisfy.assert_called_once_with(expected, ['read'], request)
+
+
+def test_cache(mocker):
+    loader = mocker.Mock(side_effect=session_user_loader)
+    security_scheme = {
+        'type': 'apiKey',
+        'name': 'session',
+        'in': 'cookie',
+        extensions.CACHE: {'ttl': 60, 'negativeTtl': 5},
+    }
+    access_control = AccessControl({'session': (security_scheme, loader)})
+    operation = {'security': [{'session': []}]}
+
+    for _ in range(2):
+        request = mocker.MagicMock(cookie={'session': 'user'})
+        assert access_control.handle(request, operation) is user
+    assert loader.call_count == 1
+
+    for _ in range(2):
+        request = mocker.MagicMock(cookie={'session': '0'})
+        with pytest.raises(SecurityError):
+            access_control.handle(request, operation)
+    assert loader.call_count == 2
+
+    assert access_control.cache_info() == {
+        'session': {'hits': 2, 'misses': 2, 'size': 2}
+    }
+
+    access_control.invalidate('session', 'user')
+    assert access_control.cache_info()['session']['size'] == 1
+
+    request = mocker.MagicMock(cookie={'session': 'user'})
+    assert access_control.handle(request, operation) is user
+    assert loader.call_count == 3
+
+    access_control.invalidate('session')
+    assert access_control.cache_info()['session']['size'] == 0
+
+
+def test_cache_reused_by_next_access_control(mocker):
+    loader = mocker.Mock(side_effect=session_user_loader)
+    security_scheme = {
+        'type': 'apiKey',
+        'name': 'session',
+        'in': 'cookie',
+        extensions.CACHE: {'ttl': 60},
+    }
+    access_control = AccessControl({'session': (security_scheme, loader)})
+    operation = {'security': [{'session': []}]}
+    request = mocker.MagicMock(cookie={'session': 'user'})
+    access_control.handle(request, operation)
+
+    security_scheme = dict(security_scheme, name='sid')
     access_control = AccessControl(
-        {'test': ({'type': security_scheme_type}, None)}
+        {'session': (security_scheme, loader)}, previous=access_control
     )
-    request = mocker.MagicMock()
-    operation = {'security': [{'test': []}]}
+    request = mocker.MagicMock(cookie={'sid': 'user'})
+    assert access_control.handle(request, operation) is user
+    assert loader.call_count == 1
+
+    # The cache of the other implementation or options is not reused.
+    for new_loader, options in ((mocker.Mock(), {'ttl': 60}), (loader, {})):
+        security_scheme = dict(security_scheme, **{extensions.CACHE: options})
+        next_access_control = AccessControl(
+            {'session': (security_scheme, new_loader)}, previous=access_control
+        )
+        assert next_access_control.cache_info()['session']['size'] == 0
+
+
+def test_cache_by_scopes(mocker):
+    validator = mocker.Mock(side_effect=api_key_validator)
+    security_scheme = {
+        'type': 'apiKey',
+        'name': 'X-API-Key',
+        'in': 'header',
+        extensions.CACHE: {},
+    }
+    access_control = AccessControl({'api_key': (security_scheme, validator)})
+    request = mocker.MagicMock(header={'X-API-Key': 'secret'})
 
+    for scopes in (['read'], ['write'], ['read']):
+        operation = {'security': [{'api_key': scopes}]}
+        assert access_control.handle(request, operation) is None
+    assert validator.call_count == 2
+
+
+def test_cache_unhashable_credential(mocker):
+    validator = mocker.Mock(return_value=False)
+    security_scheme = {
+        'type': 'apiKey',
+        'name': 'key',
+        'in': 'query',
+        extensions.CACHE: {},
+    }
+    access_control = AccessControl({'api_key': (security_scheme, validator)})
+    operation = {'security': [{'api_key': []}]}
+    memo = {}
+
+    # Repeated query parameters, e.g. ``?key=a&key=b``.
+    request = mocker.MagicMock(query={'key': ['a', 'b']})
+    for _ in range(2):
+        with pytest.raises(SecurityError):
+            access_control.handle(request, operation, memo=memo)
+    validator.assert_called_with(['a', 'b'], [], request)
+    assert validator.call_count == 2
+    assert memo == {}
+    assert access_control.cache_info()['api_key']['size'] == 0
+
+
+def test_cache_without_extension(mocker):
+    access_control = AccessControl(security_schemes)
+
+    assert access_control.cache_info() == {}
+    with pytest.raises(KeyError):
+        access_control.invalidate('session')
+
+
+def test_plan(mocker):
+    loader = mocker.Mock(side_effect=session_user_loader)
+    validator = mocker.Mock(side_effect=api_key_validator)
+    access_control = AccessControl(
+        {
+            'session': security_schemes['session'][:1] + (loader,),
+            'api_key': security_schemes['api_key'][:1] + (validator,),
+        }
+    )
+    operation = {
+        'security': [
+            {'session': [], 'api_key': []},
+            {'api_key': []},
+            {'session': []},
+        ]
+    }
+    access_control.compile(operation['security'])
+
+    # The result of ``api_key`` is reused and ``session`` is not called
+    # without the credential.
+    request = mocker.MagicMock(cookie={}, header={'X-API-Key': 'bad'})
+    with pytest.raises(SecurityError):
+        access_control.handle(request, operation)
+    assert loader.call_count == 0
+    assert validator.call_count == 1
+    assert access_control.call_info() == {'calls': 1, 'avoided_calls': 2}
+
+    # The result of ``session`` is reused.
+    request = mocker.MagicMock(
+        cookie={'session': '0'}, header={'X-API-Key': 'secret'}
+    )
     assert access_control.handle(request, operation) is None
+    assert loader.call_count == 1
+    assert validator.call_count == 2
+
+
+def test_plan_user_of_requirement(mocker):
+    access_control = AccessControl(security_schemes)
+    request = mocker.MagicMock(
+        cookie={'session': 'user'}, header={'X-API-Key': 'secret'}
+    )
+
+    for security in (
+        [{'session': [], 'api_key': []}],
+        [{'api_key': [], 'session': []}],
+    ):
+        operation = {'security': security}
+        access_control.compile(security)
+        assert access_control.handle(request, operation) is user
+
+
+def test_compile_without_security_schemes():
+    access_control = AccessControl(None)
+    access_control.compile([{'api_key': []}])
+
+    assert access_control.handle(None, {'security': [{'api_key': []}]}) is None
+
+
+def test_memo(mocker):
+    loader = mocker.Mock(side_effect=session_user_loader)
+    access_control = AccessControl(
+        {'session': security_schemes['session'][:1] + (loader,)}
+    )
+    operation = {'security': [{'session': []}]}
+    memo = {}
+
+    for value in ('user', 'user', '1'):
+        request = mocker.MagicMock(cookie={'session': value})
+        access_control.handle(request, operation, memo=memo)
+
+    assert loader.call_count == 2
+    assert memo == {('session', 'user', ()): user, ('session', '1', ()): True}
@@ -0,0 +1,334 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import datetime
+import json
+import uuid
+
+import falcon
+import pytest
+from falcon import testing
+from oas import create_spec_from_dict
+
+import falcon_oas
+from falcon_oas.responses import ResponseValidator
+from falcon_oas.serializers import compile_serializer
+from falcon_oas.serializers import ResponseSerializer
+from falcon_oas.serializers import SUPPORTED
+
+requires_falcon2 = pytest.mark.skipif(
+    not SUPPORTED, reason='Falcon 1 serializes resp.media on assignment'
+)
+
+
+class UTC(datetime.tzinfo):
+    def utcoffset(self, dt):
+        return datetime.timedelta(0)
+
+    def dst(self, dt):
+        return datetime.timedelta(0)
+
+    def tzname(self, dt):
+        return 'UTC'
+
+
+BORN = datetime.date(2019, 1, 2)
+CREATED = datetime.datetime(2019, 1, 2, 3, 4, 5, tzinfo=UTC())
+UUID = uuid.UUID('12345678-1234-5678-1234-567812345678')
+
+pet_schema = {
+    'type': 'object',
+    'properties': {
+        'id': {'type': 'string', 'format': 'uuid'},
+        'name': {'type': 'string'},
+        'password': {'type': 'string', 'writeOnly': True},
+        'born': {'type': 'string', 'format': 'date'},
+        'created': {'type': 'string', 'format': 'date-time'},
+        'tags': {'type': 'array', 'items': {'type': 'string'}},
+        'owner': {
+            'type': 'object',
+            'nullable': True,
+            'properties': {'name': {'type': 'string'}},
+        },
+        'extra': {},
+    },
+}
+
+pet = {
+    'id': UUID,
+    'name': 'momo',
+    'password': 'secret',
+    'born': BORN,
+    'created': CREATED,
+    'tags': ['cat'],
+    'owner': {'name': 'alice', 'secret': 'x'},
+    'extra': {'at': BORN},
+    'undeclared': 1,
+}
+
+expected_pet = {
+    'id': '12345678-1234-5678-1234-567812345678',
+    'name': 'momo',
+    'born': '2019-01-02',
+    'created': '2019-01-02T03:04:05+00:00',
+    'tags': ['cat'],
+    'owner': {'name': 'alice'},
+    'extra': {'at': '2019-01-02'},
+}
+
+
+def test_compile_serializer():
+    serialize = compile_serializer(pet_schema)
+
+    assert serialize(pet) == expected_pet
+    assert serialize({'name': 'momo', 'owner': None}) == {
+        'name': 'momo',
+        'owner': None,
+    }
+
+
+def test_compile_serializer_array():
+    serialize = compile_serializer({'type': 'array', 'items': pet_schema})
+
+    assert serialize([pet, pet]) == [expected_pet, expected_pet]
+    assert serialize(({'name': 'momo'},)) == [{'name': 'momo'}]
+
+
+@pytest.mark.parametrize(
+    'schema,instance,expected',
+    [
+        ({'type': 'string', 'format': 'uuid'}, UUID, str(UUID)),
+        ({'type': 'string', 'format': 'date'}, 'x', 'x'),
+        ({'type': 'object'}, {'a': BORN}, {'a': '2019-01-02'}),
+        ({'type': 'array', 'items': {}}, None, None),
+        (pet_schema, 'x', 'x'),
+        (
+            {'oneOf': [pet_schema, {'type': 'string'}]},
+            {'a': 1},
+            {'a': 1},
+        ),
+    ],
+)
+def test_compile_serializer_fallback(schema, instance, expected):
+    assert compile_serializer(schema)(instance) == expected
+
+
+@pytest.mark.parametrize(
+    'schema',
+    [
+        {'type': 'string', 'format': 'date-time'},
+        {'type': 'object', 'properties': {'a': {}}},
+        {},
+    ],
+)
+def test_compile_serializer_naive_datetime(schema):
+    naive = datetime.datetime(2019, 1, 2, 3, 4, 5)
+    instance = naive if 'properties' not in schema else {'a': naive}
+
+    with pytest.raises(ValueError):
+        compile_serializer(schema)(instance)
+
+
+def test_compile_serializer_all_of():
+    schema = {
+        'allOf': [
+            {'type': 'object', 'properties': {'id': {'type': 'integer'}}},
+            {
+                'allOf': [
+                    {
+                        'type': 'object',
+                        'properties': {
+                            'name': {'type': 'string'},
+                            'password': {'type': 'string', 'writeOnly': True},
+                        },
+                    }
+                ]
+            },
+        ]
+    }
+    serialize = compile_serializer(schema)
+
+    assert serialize(
+        {'id': 1, 'name': 'momo', 'password': 'x', 'undeclared': 1}
+    ) == {'id': 1, 'name': 'momo'}
+
+
+@pytest.mark.parametrize(
+    'additional_properties,expected',
+    [
+        (True, {'id': 1, 'a': '2019-01-02'}),
+        ({'type': 'string', 'format': 'date'}, {'id': 1, 'a': '2019-01-02'}),
+        (False, {'id': 1}),
+    ],
+)
+def test_compile_serializer_additional_properties(
+    additional_properties, expected
+):
+    schema = {
+        'type': 'object',
+        'properties': {'id': {'type': 'integer'}},
+        'additionalProperties': additional_properties,
+    }
+    serialize = compile_serializer(schema)
+
+    assert serialize({'id': 1, 'a': BORN}) == expected
+
+
+def test_compile_serializer_recursive_schema():
+    schema = {'type': 'object', 'properties': {'name': {'type': 'string'}}}
+    schema['properties']['children'] = {'type': 'array', 'items': schema}
+    serialize = compile_serializer(schema)
+
+    tree = {'name': 'a', 'x': 1, 'children': [{'name': 'b', 'children': []}]}
+    assert serialize(tree) == {
+        'name': 'a',
+        'children': [{'name': 'b', 'children': []}],
+    }
+
+
+class Resource(object):
+    def __init__(self, status=falcon.HTTP_OK, media=None, content_type=None):
+        self.status = status
+        self.media = media
+        self.content_type = content_type
+
+    def on_get(self, req, resp, **params):
+        resp.status = self.status
+        resp.media = self.media
+        if self.content_type is not None:
+            resp.content_type = self.content_type
+
+
+def simulate(spec_dict, resource, path='/api/v1/pets/42', **options):
+    spec = create_spec_from_dict(spec_dict)
+    response_serializer = ResponseSerializer(
+        dumps=lambda obj: json.dumps(obj).encode('utf-8')
+    )
+    app = falcon.API(
+        middleware=[
+            falcon_oas.Middleware(
+                spec, response_serializer=response_serializer, **options
+            )
+        ]
+    )
+    app.add_route('/api/v1/pets/{pet_id}', resource)
+    app.add_route('/undocumented', resource)
+    return testing.TestClient(app).simulate_get(path=path)
+
+
+@pytest.fixture
+def spec_dict(petstore_dict):
+    properties = petstore_dict['components']['schemas']['PetUpdate'][
+        'properties'
+    ]
+    properties['born'] = {'type': 'string', 'format': 'date'}
+    properties['password'] = {'type': 'string', 'writeOnly': True}
+    return petstore_dict
+
+
+@requires_falcon2
+def test_response_serializer(spec_dict):
+    response = simulate(
+        spec_dict,
+        Resource(media={'id': 42, 'name': 'momo', 'born': BORN, 'x': 1}),
+    )
+
+    assert response.status == falcon.HTTP_OK
+    assert response.headers['Content-Type'] == 'application/json'
+    assert response.json == {'id': 42, 'name': 'momo', 'born': '2019-01-02'}
+
+
+@requires_falcon2
+def test_response_serializer_with_response_validator(spec_dict):
+    violations = []
+    response_validator = ResponseValidator(violations.append)
+    media = {'id': 42, 'name': 'momo', 'born': BORN, 'password': 'secret'}
+
+    response = simulate(
+        spec_dict, Resource(media=media), response_validator=response_validator
+    )
+
+    assert response.json == {'id': 42, 'name': 'momo', 'born': '2019-01-02'}
+    # The converted instance is validated.
+    assert violations == []
+
+    simulate(
+        spec_dict,
+        Resource(media={'id': 'x', 'name': 'momo'}),
+        response_validator=response_validator,
+    )
+    assert len(violations) == 1
+
+
+@requires_falcon2
+@pytest.mark.parametrize(
+    'resource,path',
+    [
+        # Undocumented status code
+        (Resource(status=falcon.HTTP_CONFLICT), '/api/v1/pets/42'),
+        # Response Object without content
+        (Resource(status=falcon.HTTP_NOT_FOUND), '/api/v1/pets/42'),
+        (Resource(), '/undocumented'),
+    ],
+)
+def test_response_serializer_skips(spec_dict, resource, path):
+    resource.media = {'id': 42, 'x': 1}
+
+    response = simulate(spec_dict, resource, path=path)
+
+    assert response.json == {'id': 42, 'x': 1}
+
+
+@requires_falcon2
+def test_response_serializer_content_type_parameters(spec_dict):
+    content_type = str('application/json; charset=UTF-8')
+    response = simulate(
+        spec_dict,
+        Resource(media={'id': 42, 'x': 1}, content_type=content_type),
+    )
+
+    assert response.headers['Content-Type'] == content_type
+    assert response.json == {'id': 42}
+
+
+@requires_falcon2
+def test_response_serializer_without_media(spec_dict):
+    response = simulate(spec_dict, Resource())
+
+    assert response.content == b''
+
+
+@requires_falcon2
+def test_response_serializer_release_operation():
+    schema = {'type': 'object', 'properties': {'id': {'type': 'integer'}}}
+    operations = [
+        {
+            'responses': {
+                '200': {'content': {'application/json': {'schema': schema}}}
+            }
+        }
+        for _ in range(2)
+    ]
+    response_serializer = ResponseSerializer()
+    for operation in operations + operations[:1]:
+        response_serializer.compile_operation(operation)
+    assert len(response_serializer._serializers) == 1
+
+    response_serializer.release_operation(operations[0])
+    response_serializer.release_operation(operations[1])
+    assert len(response_serializer._plans) == 1
+    assert len(response_serializer._serializers) == 1
+
+    response_serializer.release_operation(operations[0])
+    assert response_serializer._plans == {}
+    assert response_serializer._serializers == {}
+
+
+def test_response_serializer_with_falcon1(mocker):
+    mocker.patch('falcon_oas.serializers.SUPPORTED', False)
+
+    with pytest.raises(RuntimeError):
+        ResponseSerializer()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import json
+import os
+
+import pytest
+from oas import create_spec_from_dict
+
+from falcon_oas import specs
+from falcon_oas.exceptions import SpecCacheError
+
+PETSTORE_PATH = os.path.join(os.path.dirname(__file__), 'petstore.yaml')
+
+
+@pytest.fixture
+def cache_path(tmpdir):
+    return str(tmpdir.join('spec.cache'))
+
+
+def test_compile_spec(petstore_dict, cache_path):
+    spec = specs.compile_spec(PETSTORE_PATH, cache_path)
+
+    expected = create_spec_from_dict(petstore_dict).data
+    assert spec.data == expected
+
+    loaded = specs.load_spec(cache_path, source=PETSTORE_PATH)
+    assert loaded.data == expected
+    assert loaded.base_path == '/api'
+    assert loaded.get_operation('/api/v1/pets', 'get', None) is not None
+
+
+def test_compile_spec_json(petstore_dict, tmpdir, cache_path):
+    source = tmpdir.join('spec.json')
+    source.write(json.dumps(petstore_dict))
+
+    specs.compile_spec(str(source), cache_path)
+
+    spec = specs.load_spec(cache_path, source=str(source))
+    assert spec.data == create_spec_from_dict(petstore_dict).data
+
+
+def test_load_spec_stale(petstore_dict, tmpdir, cache_path):
+    source = tmpdir.join('spec.json')
+    source.write(json.dumps(petstore_dict))
+    specs.compile_spec(str(source), cache_path)
+
+    petstore_dict['info']['version'] = '0.2.0'
+    source.write(json.dumps(petstore_dict))
+
+    with pytest.raises(SpecCacheError):
+        specs.load_spec(cache_path, source=str(source))
+    # The source is not checked unless given.
+    assert specs.load_spec(cache_path) is not None
+
+
+@pytest.mark.parametrize(
+    'corrupt',
+    [
+        lambda data: b'x' + data,
+        lambda data: data.replace(b'"format": 1', b'"format": 0'),
+        lambda data: data.replace(b'{', b'[', 1),
+        lambda data: data[:-1],
+    ],
+)
+def test_load_spec_invalid(cache_path, corrupt):
+    specs.compile_spec(PETSTORE_PATH, cache_path)
+    with open(cache_path, 'rb') as f:
+        data = f.read()
+    with open(cache_path, 'wb') as f:
+        f.write(corrupt(data))
+
+    with pytest.raises(SpecCacheError):
+        specs.load_spec(cache_path)
+
+
+def test_load_spec_incompatible_version(mocker, cache_path):
+    specs.compile_spec(PETSTORE_PATH, cache_path)
+    mocker.patch.object(specs, '__version__', '0.0.0')
+
+    with pytest.raises(SpecCacheError):
+        specs.load_spec(cache_path)
+
+
+def test_load_spec_dict(petstore_dict):
+    assert specs.load_spec_dict(PETSTORE_PATH) == petstore_dict
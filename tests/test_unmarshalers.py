@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import division
+from __future__ import print_function
+from __future__ import unicode_literals
+
+import falcon
+import pytest
+from falcon import testing
+from oas import create_spec_from_dict
+from oas.exceptions import ValidationError
+from oas.schema.unmarshalers import SchemaUnmarshaler
+
+import falcon_oas
+from falcon_oas.unmarshalers import compile_schema
+from falcon_oas.unmarshalers import CompiledSchemaUnmarshaler
+from falcon_oas.unmarshalers import UnsupportedSchema
+
+pet_schema = {
+    'type': 'object',
+    'required': ['id', 'name'],
+    'properties': {
+        'id': {'type': 'integer', 'format': 'int32', 'minimum': 1},
+        'name': {'type': 'string', 'minLength': 1, 'maxLength': 8},
+        'tag': {'type': 'string', 'nullable': True, 'pattern': '^[a-z]+$'},
+        'kind': {'type': 'string', 'enum': ['cat', 'dog'], 'default': 'cat'},
+        'born': {'type': 'string', 'format': 'date'},
+    },
+    'additionalProperties': False,
+}
+
+conformance_cases = [
+    ({'type': 'integer'}, [1, -1, 1.0, True, '1', None]),
+    ({'type': 'number'}, [1, 1.5, False, '1.5', None]),
+    ({'type': 'string'}, ['', 'a', 1, None]),
+    ({'type': 'boolean'}, [True, False, 0, 'true']),
+    ({'type': 'array', 'items': {}}, [[], [1], {}, 'a']),
+    ({'type': 'object'}, [{}, {'a': 1}, [], None]),
+    ({'type': 'string', 'nullable': True}, ['a', None, 1]),
+    ({'enum': [1, 'a', None]}, [1, 'a', None, True, 1.0, 2]),
+    ({'enum': [True]}, [True, 1, 1.0]),
+    ({'enum': [0]}, [0, False, 0.0]),
+    ({'enum': [{'a': 1}, [1]]}, [{'a': 1}, [1], {'a': 2}]),
+    ({'type': 'string', 'enum': ['a'], 'nullable': True}, ['a', 'b', None]),
+    ({'minimum': 1, 'maximum': 3}, [0, 1, 3, 4, 'x', True]),
+    (
+        {
+            'type': 'number',
+            'minimum': 1,
+            'maximum': 3,
+            'exclusiveMinimum': True,
+            'exclusiveMaximum': True,
+        },
+        [1, 1.5, 3],
+    ),
+    ({'type': 'integer', 'minimum': 0, 'nullable': True}, [0, -1, None]),
+    ({'minLength': 1, 'maxLength': 2}, ['', 'a', 'abc', 5]),
+    ({'pattern': '^a'}, ['abc', 'bac', 1]),
+    ({'minItems': 1, 'maxItems': 2}, [[], [1], [1, 2, 3], 'a']),
+    (
+        {'type': 'array', 'items': {'type': 'integer', 'maximum': 9}},
+        [[], [1, 2], [1, 'a'], [1, 10]],
+    ),
+    (
+        {'type': 'array', 'items': {'type': 'array', 'items': {}}},
+        [[[]], [[1, 'a']], [1]],
+    ),
+    (
+        {'minProperties': 1, 'maxProperties': 1},
+        [{}, {'a': 1}, {'a': 1, 'b': 2}],
+    ),
+    ({'required': ['a']}, [{'a': 1}, {}, 'a']),
+    (
+        {'properties': {'a': {'type': 'integer'}}},
+        [{'a': 1}, {'a': 'x'}, {}, 1],
+    ),
+    (
+        {'properties': {'a': {}}, 'additionalProperties': False},
+        [{'a': 1}, {'b': 1}],
+    ),
+    (
+        {'additionalProperties': {'type': 'integer'}},
+        [{'a': 1}, {'a': 'x'}],
+    ),
+    ({'additionalProperties': {}}, [{'a': 1}]),
+    (
+        {'allOf': [{'type': 'object'}, {'required': ['a']}]},
+        [{'a': 1}, {}, []],
+    ),
+    (
+        {
+            'allOf': [
+                {'type': 'object', 'properties': {'a': {'type': 'string'}}},
+                {'type': 'object', 'required': ['a']},
+            ]
+        },
+        [{'a': 'x'}, {'a': 1}, {}],
+    ),
+    ({'type': 'string', 'format': 'date'}, ['2020-01-01', '2020-13-01', 1]),
+    ({'type': 'integer', 'format': 'int32'}, [1, 2 ** 31]),
+    ({'type': 'object', 'description': 'x', 'x-foo': 1}, [{}, 1]),
+    (
+        pet_schema,
+        [
+            {'id': 1, 'name': 'momo'},
+            {'id': 1, 'name': 'momo', 'tag': None, 'kind': 'dog'},
+            {'id': 1, 'name': 'momo', 'born': '2020-01-01'},
+            {'id': 0, 'name': ''},
+            {'id': 2 ** 31, 'name': 'momo'},
+            {'id': 1, 'name': 'momo', 'tag': 'A', 'kind': 'bird'},
+            {'id': 1, 'name': 'momo', 'born': 'yesterday'},
+            {'id': 1, 'name': 'momo', 'extra': True},
+            {'name': 42},
+            [],
+        ],
+    ),
+]
+
+
+def unmarshal(schema_unmarshaler, instance, schema):
+    try:
+        return 'ok', schema_unmarshaler.unmarshal(instance, schema)
+    except ValidationError as e:
+        return (
+            'error',
+            [
+                (list(error.path), error.validator, error.message)
+                for error in e.errors
+            ],
+        )
+
+
+@pytest.mark.parametrize(
+    'schema,instance',
+    [
+        (schema, instance)
+        for schema, instances in conformance_cases
+        for instance in instances
+    ],
+)
+def test_conformance(schema, instance):
+    interpreter = SchemaUnmarshaler()
+    compiled = CompiledSchemaUnmarshaler()
+    assert compiled.compile(schema)
+
+    expected = unmarshal(interpreter, instance, schema)
+    assert unmarshal(compiled, instance, schema) == expected
+
+    is_valid = compile_schema(
+        schema, format_checker=compiled._formats.format_checker
+    )
+    assert is_valid(instance) is (expected[0] == 'ok')
+
+
+@pytest.mark.parametrize(
+    'schema',
+    [
+        {'oneOf': [{'type': 'string'}]},
+        {'anyOf': [{'type': 'string'}]},
+        {'not': {'type': 'string'}},
+        {'type': 'array', 'items': [{'type': 'string'}]},
+        {'properties': {'a': {'uniqueItems': True}}},
+        {'pattern': '('},
+        {'type': 'file'},
+        {'type': ['string', 'integer']},
+    ],
+)
+def test_compile_schema_unsupported(schema):
+    with pytest.raises(UnsupportedSchema):
+        compile_schema(schema)
+
+
+def test_compiled_schema_unmarshaler_unsupported_falls_back():
+    schema = {'oneOf': [{'type': 'string'}, {'type': 'integer'}]}
+    compiled = CompiledSchemaUnmarshaler()
+
+    assert compiled.compile(schema) is False
+    assert compiled.unmarshal(1, schema) == 1
+    with pytest.raises(ValidationError):
+        compiled.unmarshal(1.5, schema)
+
+
+def test_compiled_schema_unmarshaler_not_compiled():
+    compiled = CompiledSchemaUnmarshaler()
+
+    assert compiled.unmarshal('1', {'type': 'string'}) == '1'
+    with pytest.raises(ValidationError):
+        compiled.unmarshal(1, {'type': 'string'})
+
+
+def test_compile_recursive_schema():
+    schema = {'type': 'object', 'properties': {}}
+    schema['properties']['children'] = {'type': 'array', 'items': schema}
+
+    is_valid = compile_schema(schema)
+
+    assert is_valid({'children': [{'children': []}]})
+    assert not is_valid({'children': [{'children': [1]}]})
+
+
+def test_compile_operation(petstore_dict):
+    spec = create_spec_from_dict(petstore_dict)
+    operation = spec.get_operation(
+        '/api/v1/pets/{pet_id}', 'patch', 'application/json'
+    )
+    compiled = CompiledSchemaUnmarshaler(spec=spec)
+    compiled.compile_operation(operation)
+
+    for parameter_spec_dict in operation['parameters']:
+        assert id(parameter_spec_dict['schema']) in compiled._compiled
+    content = operation['requestBody']['content']
+    assert id(content['application/json']['schema']) in compiled._compiled
+
+
+def test_compile_equal_schemas_once():
+    schemas = [{'type': 'string', 'minLength': 1} for _ in range(3)]
+    schemas.append({'minLength': 1, 'type': 'string'})
+    compiled = CompiledSchemaUnmarshaler()
+
+    for schema in schemas:
+        assert compiled.compile(schema) is True
+
+    functions = set(compiled._compiled[id(schema)][1] for schema in schemas)
+    assert len(functions) == 1
+    assert len(compiled.schema_report()) == 1
+
+
+def test_compile_equal_recursive_schemas():
+    schemas = []
+    for _ in range(2):
+        schema = {'type': 'object', 'properties': {}}
+        schema['properties']['children'] = {'type': 'array', 'items': schema}
+        schemas.append(schema)
+    compiled = CompiledSchemaUnmarshaler()
+
+    for schema in schemas:
+        assert compiled.compile(schema) is True
+    assert len(compiled.schema_report()) == 2
+
+
+def test_compile_operation_units():
+    operations = [
+        {
+            'parameters': [
+                {'name': 'id', 'in': 'path', 'schema': {'type': 'integer'}}
+            ]
+        }
+        for _ in range(2)
+    ]
+    compiled = CompiledSchemaUnmarshaler()
+
+    # The units are compiled in any order and merged in order.
+    units = [compiled.compile_operation_unit(op) for op in operations[::-1]]
+    assert compiled._compiled == {}
+    assert compiled.schema_report() == []
+    for unit in units[::-1]:
+        compiled.merge_operation(unit)
+
+    schemas = [op['parameters'][0]['schema'] for op in operations]
+    assert schemas[0] is not schemas[1]
+    # The function of the unit merged first wins.
+    function = units[1][1][0][2]
+    assert compiled._compiled[id(schemas[0])][1] is function
+    assert compiled._compiled[id(schemas[1])][1] is function
+
+    ((schema, seconds),) = compiled.schema_report()
+    assert schema == {'type': 'integer'}
+    assert seconds > 0
+
+
+def test_compile_operations():
+    operations = [
+        {
+            'parameters': [
+                {'name': 'id', 'in': 'path', 'schema': {'type': 'integer'}}
+            ]
+        }
+        for _ in range(3)
+    ]
+    compiled = CompiledSchemaUnmarshaler()
+    schemas = []
+
+    def map_(fn, iterable):
+        schemas.extend(iterable)
+        return [fn(schema) for schema in schemas]
+
+    durations = compiled.compile_operations(operations, map=map_)
+
+    # The equal schemas are compiled once.
+    assert schemas == [{'type': 'integer'}]
+    assert schemas[0] is operations[0]['parameters'][0]['schema']
+    assert len(durations) == 3
+    functions = set(
+        compiled._compiled[id(op['parameters'][0]['schema'])][1]
+        for op in operations
+    )
+    assert len(functions) == 1
+    assert None not in functions
+
+    # The compiled schemas are not compiled again.
+    compiled.compile_operations(operations, map=map_)
+    assert len(schemas) == 1
+    ((schema, seconds),) = compiled.schema_report()
+    assert schema == {'type': 'integer'}
+
+
+def test_release_operation():
+    schema = {'type': 'integer'}
+    operations = [
+        {'parameters': [{'name': 'id', 'in': 'path', 'schema': schema}]},
+        {'parameters': [{'name': 'id', 'in': 'path', 'schema': {}}]},
+    ]
+    operations[1]['parameters'][0]['schema'].update(schema)
+    compiled = CompiledSchemaUnmarshaler()
+    for operation in operations + operations[:1]:
+        compiled.compile_operation(operation)
+
+    # The schemas are referred to by the other operations.
+    compiled.release_operation(operations[0])
+    compiled.release_operation(operations[1])
+    assert id(schema) in compiled._compiled
+    assert len(compiled.schema_report()) == 1
+
+    compiled.release_operation(operations[0])
+    assert compiled._compiled == {}
+    assert compiled._functions == {}
+    assert compiled.schema_report() == []
+    assert compiled.unmarshal(42, schema) == 42
+
+
+@pytest.mark.parametrize(
+    'method,path,kwargs',
+    [
+        ('GET', '/api/v1/pets/42', {}),
+        ('GET', '/api/v1/pets/xxx', {}),
+        (
+            'PATCH',
+            '/api/v1/pets/42',
+            {
+                'query_string': str('page=1'),
+                'headers': {'X-API-Version': str('v2')},
+                'json': {'name': 'momo'},
+            },
+        ),
+        (
+            'PATCH',
+            '/api/v1/pets/42',
+            {'query_string': str('page=x'), 'json': {'name': 42}},
+        ),
+        ('POST', '/api/v1/pets', {'json': {'name': 'momo', 'x': 1}}),
+        ('POST', '/api/v1/pets', {'json': {}}),
+        ('POST', '/api/v1/pets', {}),
+    ],
+)
+def test_conformance_api(petstore_dict, method, path, kwargs):
+    class Resource(object):
+        def on_get(self, req, resp, **params):
+            resp.media = {
+                'params': params,
+                'parameters': req.context['oas'].parameters,
+                'request_body': req.context['oas'].request_body,
+            }
+
+        on_patch = on_post = on_get
+
+    results = []
+    for compiled in (False, True):
+        oas = falcon_oas.OAS(petstore_dict, compiled=compiled)
+        oas.resolve_path_item('/v1/pets', Resource())
+        oas.resolve_path_item('/v1/pets/{pet_id}', Resource())
+        client = testing.TestClient(oas.create_api())
+        response = client.simulate_request(method=method, path=path, **kwargs)
+        results.append((response.status, response.json))
+
+    assert results[0] == results[1]
+    assert results[0][0] in (falcon.HTTP_OK, falcon.HTTP_BAD_REQUEST)
@@ -4,7 +4,13 @@ from __future__ import division
 from __future__ import print_function
 from __future__ import unicode_literals
 
+import importlib
+
+from falcon_oas.utils import clear_import_cache
+from falcon_oas.utils import digest
+from falcon_oas.utils import import_report
 from falcon_oas.utils import import_string
+from falcon_oas.utils import ReferenceCounter
 
 OBJECT = object()
 
@@ -29,3 +35,80 @@ def test_import_string_with_callable():
         return
 
     assert import_string(func) is func
+
+
+def test_import_string_is_cached(mocker):
+    clear_import_cache()
+    import_module = mocker.spy(importlib, 'import_module')
+
+    for _ in range(2):
+        assert (
+            import_string('test_utils.OBJECT', base_module='tests') is OBJECT
+        )
+        assert import_string('tests.test_utils.OBJECT') is OBJECT
+
+    assert import_module.call_count == 2
+
+
+def test_import_report(mocker):
+    clear_import_cache()
+    mocker.patch(
+        'falcon_oas.utils.clock', side_effect=[0, 3000000, 0, 0, 10, 20]
+    )
+
+    import_string('tests.test_utils.OBJECT')
+    import_string('tests.test_utils.import_string')
+    import_string('tests.conftest.petstore_dict')
+
+    assert import_report() == [
+        ('tests.test_utils', 0.003),
+        ('tests.conftest', 1e-08),
+    ]
+
+    clear_import_cache()
+    assert import_report() == []
+
+
+def test_import_string_while_importing(monkeypatch, tmpdir):
+    clear_import_cache()
+    # The implementation module resolves another implementation when it
+    # is imported.
+    tmpdir.join('nested_implementation.py').write(
+        'from falcon_oas.utils import import_string\n'
+        "OBJECT = import_string('tests.test_utils.OBJECT')\n"
+    )
+    monkeypatch.syspath_prepend(str(tmpdir))
+
+    assert import_string('nested_implementation.OBJECT') is OBJECT
+
+
+def test_reference_counter():
+    counter = ReferenceCounter()
+    obj = {}
+
+    assert counter.acquire(obj)
+    assert not counter.acquire(obj)
+    assert not counter.release(obj)
+    assert counter.release(obj)
+    assert len(counter) == 0
+    # Objects which are not referenced are not released again.
+    assert not counter.release(obj)
+
+
+def test_digest():
+    assert digest({'a': [1, {'b': 2}]}) == digest({'a': [1, {'b': 2}]})
+    assert digest({'a': [1]}) != digest({'a': [2]})
+    assert digest({'a': [1]}) != digest({'a': ['list', [1]]})
+
+
+def test_digest_recursive():
+    objs = []
+    for _ in range(2):
+        obj = {'type': 'object', 'properties': {}}
+        obj['properties']['child'] = obj
+        objs.append(obj)
+    other = {'type': 'object', 'properties': {}}
+    other['properties']['child'] = {'type': 'object', 'properties': other}
+
+    assert digest(objs[0]) == digest(objs[1])
+    assert digest(objs[0]) != digest(other)